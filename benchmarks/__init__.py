@@ -0,0 +1 @@
+"""Throughput benchmarks run against a local WebHDFS stand-in."""
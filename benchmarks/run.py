@@ -0,0 +1,237 @@
+"""Throughput benchmarks of the client's hot paths.
+
+Runs against the local :class:`~webhdfspy.emulator.WebHDFSEmulator`, so
+the numbers measure the client and the HTTP stack rather than a cluster,
+unless latency or bandwidth limits are set to model one::
+
+    $ python -m benchmarks.run --output baseline.json
+    $ python -m benchmarks.run --output current.json --baseline baseline.json
+
+With ``--baseline`` every benchmark is compared with the stored run and
+the command exits with status 1 if one of them got slower than
+``--threshold``.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import requests
+
+from webhdfspy import WebHDFSClient
+from webhdfspy.emulator import WebHDFSEmulator
+
+MB = 1024 * 1024
+
+
+def _timed(func: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def _concurrently(func: Callable[[int], Any], count: int,
+                  concurrency: int) -> None:
+    if concurrency == 1:
+        for i in range(count):
+            func(i)
+        return
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in pool.map(func, range(count)):
+            pass
+
+
+def bench_listdir(client: WebHDFSClient, hdfs: WebHDFSEmulator,
+                  config: argparse.Namespace) -> dict[str, Any]:
+    for i in range(config.list_size):
+        hdfs.write(f"/listdir/file-{i:07d}", b"")
+    calls = config.list_calls
+    seconds = _timed(lambda: _concurrently(
+        lambda _: client.listdir("/listdir"), calls, config.concurrency
+    ))
+    return {"seconds": seconds, "ops": calls,
+            "entries_per_sec": calls * config.list_size / seconds}
+
+
+def bench_status(client: WebHDFSClient, hdfs: WebHDFSEmulator,
+                 config: argparse.Namespace) -> dict[str, Any]:
+    hdfs.write("/status/file", b"x")
+    calls = config.status_calls
+    seconds = _timed(lambda: _concurrently(
+        lambda _: client.status("/status/file"), calls, config.concurrency
+    ))
+    return {"seconds": seconds, "ops": calls}
+
+
+def bench_create_small(client: WebHDFSClient, hdfs: WebHDFSEmulator,
+                       config: argparse.Namespace) -> dict[str, Any]:
+    data = b"x" * config.small_size
+    count = config.small_files
+    seconds = _timed(lambda: _concurrently(
+        lambda i: client.create(f"/small/file-{i}", data, overwrite=True),
+        count, config.concurrency,
+    ))
+    return {"seconds": seconds, "ops": count, "bytes": count * len(data)}
+
+
+def bench_create_large(client: WebHDFSClient, hdfs: WebHDFSEmulator,
+                       config: argparse.Namespace) -> dict[str, Any]:
+    data = b"x" * config.large_size
+    seconds = _timed(
+        lambda: client.create("/large/file", data, overwrite=True)
+    )
+    return {"seconds": seconds, "ops": 1, "bytes": len(data)}
+
+
+def bench_open(client: WebHDFSClient, hdfs: WebHDFSEmulator,
+               config: argparse.Namespace) -> dict[str, Any]:
+    hdfs.write("/open/file", b"x" * config.large_size)
+    seconds = _timed(lambda: client.read_bytes("/open/file"))
+    return {"seconds": seconds, "ops": 1, "bytes": config.large_size}
+
+
+def bench_iter_bytes(client: WebHDFSClient, hdfs: WebHDFSEmulator,
+                     config: argparse.Namespace) -> dict[str, Any]:
+    hdfs.write("/open/file", b"x" * config.large_size)
+
+    def consume() -> None:
+        for _ in client.iter_bytes("/open/file"):
+            pass
+
+    seconds = _timed(consume)
+    return {"seconds": seconds, "ops": 1, "bytes": config.large_size}
+
+
+def bench_get_checksum(client: WebHDFSClient, hdfs: WebHDFSEmulator,
+                       config: argparse.Namespace) -> dict[str, Any]:
+    hdfs.write("/checksum/file", b"x" * config.small_size)
+    calls = config.checksum_calls
+    seconds = _timed(lambda: _concurrently(
+        lambda _: client.get_checksum("/checksum/file"), calls,
+        config.concurrency,
+    ))
+    return {"seconds": seconds, "ops": calls}
+
+
+BENCHMARKS: dict[str, Callable[..., dict[str, Any]]] = {
+    "listdir": bench_listdir,
+    "status": bench_status,
+    "create_small": bench_create_small,
+    "create_large": bench_create_large,
+    "open": bench_open,
+    "iter_bytes": bench_iter_bytes,
+    "get_checksum": bench_get_checksum,
+}
+
+
+def run(config: argparse.Namespace) -> dict[str, Any]:
+    """Run the selected benchmarks and return the results document."""
+    results = {}
+    for name in config.only or BENCHMARKS:
+        best: dict[str, Any] | None = None
+        for _ in range(config.repeat):
+            with WebHDFSEmulator(
+                datanodes=config.datanodes,
+                namenode_latency=config.namenode_latency,
+                datanode_latency=config.datanode_latency,
+                datanode_bandwidth=config.bandwidth,
+            ) as hdfs, hdfs.client(
+                "bench", pool_maxsize=max(config.concurrency, 1),
+            ) as client:
+                result = BENCHMARKS[name](client, hdfs, config)
+            if best is None or result["seconds"] < best["seconds"]:
+                best = result
+        assert best is not None
+        best["ops_per_sec"] = best["ops"] / best["seconds"]
+        if "bytes" in best:
+            best["mb_per_sec"] = best["bytes"] / MB / best["seconds"]
+        results[name] = best
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "requests": requests.__version__,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "config": {key: value for key, value in vars(config).items()
+                       if key not in ("output", "baseline")},
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any],
+            threshold: float) -> list[str]:
+    """Print the change of every benchmark and return the regressed ones."""
+    regressions = []
+    for name, result in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            print(f"{name:<14} {result['ops_per_sec']:>12.1f} ops/s   (new)")
+            continue
+        metric = "mb_per_sec" if "mb_per_sec" in result else "ops_per_sec"
+        change = result[metric] / old[metric] - 1
+        unit = "MB/s" if metric == "mb_per_sec" else "ops/s"
+        flag = ""
+        if change < -threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<14} {result[metric]:>12.1f} {unit:<5} "
+              f"{change:+7.1%}{flag}")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS),
+                        help="benchmarks to run, all by default")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON results to compare with")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="relative slowdown reported as a regression")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="runs per benchmark, the fastest is kept")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="client threads for the per-request benchmarks")
+    parser.add_argument("--datanodes", type=int, default=3,
+                        help="emulated DataNodes")
+    parser.add_argument("--namenode-latency", type=float, default=0.0,
+                        help="seconds added to every NameNode request")
+    parser.add_argument("--datanode-latency", type=float, default=0.0,
+                        help="seconds added to every DataNode request")
+    parser.add_argument("--bandwidth", type=float,
+                        help="bytes per second of each DataNode")
+    parser.add_argument("--list-size", type=int, default=5000,
+                        help="entries of the listed directory")
+    parser.add_argument("--list-calls", type=int, default=20)
+    parser.add_argument("--status-calls", type=int, default=2000)
+    parser.add_argument("--checksum-calls", type=int, default=500)
+    parser.add_argument("--small-files", type=int, default=500)
+    parser.add_argument("--small-size", type=int, default=4096,
+                        help="bytes per small file")
+    parser.add_argument("--large-size", type=int, default=64 * MB,
+                        help="bytes of the large file")
+    config = parser.parse_args(argv)
+
+    current = run(config)
+    if config.output:
+        with open(config.output, "w") as writer:
+            json.dump(current, writer, indent=2)
+    if config.baseline:
+        with open(config.baseline) as reader:
+            baseline = json.load(reader)
+        return 1 if compare(current, baseline, config.threshold) else 0
+    for name, result in current["results"].items():
+        rate = (f"{result['mb_per_sec']:.1f} MB/s" if "mb_per_sec" in result
+                else f"{result['ops_per_sec']:.1f} ops/s")
+        print(f"{name:<14} {rate}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+"""Unit tests for the asyncio client using ``httpx.MockTransport``."""
+import asyncio
+import json
+
+import pytest
+
+from webhdfspy import (
+    AsyncWebHDFSClient,
+    WebHDFSConnectionError,
+    WebHDFSException,
+    WebHDFSRemoteException,
+)
+
+httpx = pytest.importorskip("httpx")
+
+BASE = "http://localhost:50070/webhdfs/v1"
+DATANODE = "http://datanode:50075/webhdfs/v1"
+
+NOT_FOUND = {
+    "RemoteException": {
+        "exception": "FileNotFoundException",
+        "javaClassName": "java.io.FileNotFoundException",
+        "message": "/missing does not exist",
+    }
+}
+
+
+def run(handler, coro_func):
+    """Run ``coro_func(client)`` against a mocked transport."""
+    async def main():
+        async with AsyncWebHDFSClient("localhost", 50070, username="testuser") as c:
+            await c._client.aclose()
+            c._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            return await coro_func(c)
+
+    return asyncio.run(main())
+
+
+class TestMetadata:
+    def test_listdir(self):
+        requests_seen = []
+
+        def handler(request):
+            requests_seen.append(request)
+            payload = {"FileStatuses": {"FileStatus": [{"pathSuffix": "foo"}]}}
+            return httpx.Response(200, json=payload)
+
+        result = run(handler, lambda c: c.listdir("/"))
+        assert result == [{"pathSuffix": "foo"}]
+        assert requests_seen[0].url.params["op"] == "LISTSTATUS"
+        assert requests_seen[0].url.params["user.name"] == "testuser"
+
+    def test_remote_exception(self):
+        def handler(request):
+            return httpx.Response(404, json=NOT_FOUND)
+
+        with pytest.raises(WebHDFSRemoteException) as exc_info:
+            run(handler, lambda c: c.status("/missing"))
+        assert exc_info.value.status_code == 404
+        assert exc_info.value.java_class_name == "java.io.FileNotFoundException"
+
+    def test_bool_params_encoded_like_requests(self):
+        requests_seen = []
+
+        def handler(request):
+            requests_seen.append(request)
+            return httpx.Response(200, json={"boolean": True})
+
+        assert run(handler, lambda c: c.remove("/dir", recursive=True)) is True
+        assert requests_seen[0].url.params["recursive"] == "True"
+
+    def test_connection_error(self):
+        def handler(request):
+            raise httpx.ConnectError("refused")
+
+        with pytest.raises(WebHDFSConnectionError):
+            run(handler, lambda c: c.listdir("/"))
+
+    def test_concurrent_calls(self):
+        def handler(request):
+            length = int(request.url.path.rsplit("/", 1)[-1])
+            return httpx.Response(200, json={"FileStatus": {"length": length}})
+
+        async def many(c):
+            return await asyncio.gather(*(c.status(f"/{i}") for i in range(50)))
+
+        result = run(handler, many)
+        assert [s["length"] for s in result] == list(range(50))
+
+
+class TestRedirects:
+    def test_create(self):
+        bodies = []
+
+        def handler(request):
+            if request.url.host == "localhost":
+                assert request.url.params["op"] == "CREATE"
+                return httpx.Response(
+                    307, headers={"Location": f"{DATANODE}/new.txt"}
+                )
+            bodies.append(request.content)
+            return httpx.Response(201)
+
+        assert run(handler, lambda c: c.create("/new.txt", b"data")) is True
+        assert bodies == [b"data"]
+
+    def test_create_missing_redirect(self):
+        def handler(request):
+            return httpx.Response(307)
+
+        with pytest.raises(WebHDFSException, match="did not return a redirect"):
+            run(handler, lambda c: c.create("/new.txt", b"data"))
+
+    def test_append(self):
+        def handler(request):
+            if request.url.host == "localhost":
+                return httpx.Response(307, headers={"Location": f"{DATANODE}/f"})
+            assert "op=APPEND" not in str(request.url)
+            return httpx.Response(200)
+
+        assert run(handler, lambda c: c.append("/f", b"more")) is True
+
+    def test_copyfromlocal(self, tmp_path):
+        local = tmp_path / "data.bin"
+        local.write_bytes(b"abcdefghij")
+        bodies = []
+
+        def handler(request):
+            if request.url.host == "localhost":
+                assert request.url.params["op"] == "CREATE"
+                return httpx.Response(307, headers={"Location": f"{DATANODE}/d"})
+            bodies.append(request.content)
+            return httpx.Response(201)
+
+        assert run(handler, lambda c: c.copyfromlocal(
+            str(local), "/data.bin", chunk_size=3
+        )) is True
+        assert bodies == [b"abcdefghij"]
+
+    def test_copyfromlocal_missing_file(self, tmp_path):
+        with pytest.raises(WebHDFSException, match="doesn't exist"):
+            run(lambda request: httpx.Response(500), lambda c: c.copyfromlocal(
+                str(tmp_path / "missing"), "/data.bin"
+            ))
+
+    def test_get_checksum(self):
+        checksum = {"algorithm": "MD5-of-1MD5-of-512CRC32C", "length": 28}
+
+        def handler(request):
+            if request.url.host == "localhost":
+                return httpx.Response(307, headers={"Location": f"{DATANODE}/f"})
+            return httpx.Response(200, json={"FileChecksum": checksum})
+
+        assert run(handler, lambda c: c.get_checksum("/f")) == checksum
+
+    def test_open_follows_redirect(self):
+        def handler(request):
+            if request.url.host == "localhost":
+                return httpx.Response(307, headers={"Location": f"{DATANODE}/f"})
+            return httpx.Response(200, content=b"hello world")
+
+        assert run(handler, lambda c: c.open("/f")) == "hello world"
+
+    def test_iter_bytes(self):
+        def handler(request):
+            if request.url.host == "localhost":
+                return httpx.Response(307, headers={"Location": f"{DATANODE}/f"})
+            return httpx.Response(200, content=b"abcdefghij")
+
+        async def collect(c):
+            return [chunk async for chunk in c.iter_bytes("/f", chunk_size=4)]
+
+        assert run(handler, collect) == [b"abcd", b"efgh", b"ij"]
+
+    def test_iter_bytes_error(self):
+        def handler(request):
+            return httpx.Response(404, content=json.dumps(NOT_FOUND).encode())
+
+        async def collect(c):
+            return [chunk async for chunk in c.iter_bytes("/missing")]
+
+        with pytest.raises(WebHDFSRemoteException):
+            run(handler, collect)
+
+
+class TestConcat:
+    def test_concat(self):
+        requests_seen = []
+
+        def handler(request):
+            requests_seen.append(request)
+            return httpx.Response(200)
+
+        assert run(handler, lambda c: c.concat("/all", ["/a", "/b"])) is True
+        assert requests_seen[0].method == "POST"
+        assert requests_seen[0].url.params["op"] == "CONCAT"
+        assert requests_seen[0].url.params["sources"] == "/a,/b"
+
+
+class TestDelegationTokens:
+    def test_renew(self):
+        def handler(request):
+            return httpx.Response(200, json={"long": 1609459200000})
+
+        assert run(handler, lambda c: c.renew_delegation_token("t")) == 1609459200000
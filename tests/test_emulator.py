@@ -0,0 +1,260 @@
+"""Tests running the real client against the local WebHDFS emulator."""
+import gzip
+import io
+import time
+
+import pytest
+
+from webhdfspy import (
+    NamespaceIndex,
+    RetryPolicy,
+    WebHDFSConnectionError,
+    WebHDFSRemoteException,
+)
+from webhdfspy.emulator import WebHDFSEmulator
+
+
+@pytest.fixture()
+def hdfs():
+    with WebHDFSEmulator(datanodes=3, ls_limit=4, seed=0) as emulator:
+        yield emulator
+
+
+@pytest.fixture()
+def client(hdfs):
+    with hdfs.client() as c:
+        yield c
+
+
+class TestNamespace:
+    def test_create_and_read(self, hdfs, client):
+        assert client.create("/data/f.txt", b"hello world") is True
+        assert hdfs.read("/data/f.txt") == b"hello world"
+        assert client.read_bytes("/data/f.txt", offset=6, length=5) == b"world"
+        status = client.status("/data/f.txt")
+        assert status["type"] == "FILE"
+        assert status["length"] == 11
+        assert status["owner"] == "webhdfs"
+
+    def test_create_existing(self, hdfs, client):
+        hdfs.write("/f", b"old")
+        with pytest.raises(WebHDFSRemoteException) as exc_info:
+            client.create("/f", b"new")
+        assert exc_info.value.exception == "FileAlreadyExistsException"
+        client.create("/f", b"new", overwrite=True)
+        assert hdfs.read("/f") == b"new"
+
+    def test_missing_file(self, client):
+        with pytest.raises(WebHDFSRemoteException) as exc_info:
+            client.read_bytes("/missing")
+        assert exc_info.value.status_code == 404
+
+    def test_listing_and_batches(self, hdfs, client):
+        names = [f"f{i:02d}" for i in range(10)]
+        for name in names:
+            hdfs.write(f"/dir/{name}", b"")
+        hdfs.mkdirs("/dir/sub")
+        assert [e["pathSuffix"] for e in client.listdir("/dir")] == names + ["sub"]
+        assert [e["pathSuffix"] for e in client.iterdir("/dir")] == names + ["sub"]
+        assert hdfs.counts[("namenode", "LISTSTATUS_BATCH")] == 3
+
+    def test_append_and_concat(self, hdfs, client):
+        hdfs.write("/a", b"aa")
+        hdfs.write("/b", b"bb")
+        hdfs.write("/c", b"cc")
+        client.append("/a", b"!")
+        client.concat("/a", ["/b", "/c"])
+        assert hdfs.read("/a") == b"aa!bbcc"
+        assert [e["pathSuffix"] for e in client.listdir("/")] == ["a"]
+
+    def test_metadata_operations(self, hdfs, client):
+        hdfs.write("/d/f", b"x" * 10)
+        assert client.rename("/d/f", "/d/g") is True
+        assert client.rename("/missing", "/d/h") is False
+        client.chmod("/d/g", "600")
+        client.set_owner("/d/g", owner="etl", group="etl")
+        client.set_replication("/d/g", 2)
+        client.set_times("/d/g", modificationtime=1000)
+        status = client.status("/d/g")
+        assert (status["permission"], status["owner"], status["group"],
+                status["replication"], status["modificationTime"]) == (
+            "600", "etl", "etl", 2, 1000
+        )
+        summary = client.get_content_summary("/")
+        assert (summary["directoryCount"], summary["fileCount"],
+                summary["length"]) == (2, 1, 10)
+        with pytest.raises(WebHDFSRemoteException):
+            client.remove("/d")
+        assert client.remove("/d", recursive=True) is True
+        assert client.listdir("/") == []
+
+    def test_checksum_matches_local(self, hdfs, client, tmp_path):
+        data = bytes(range(256)) * 40
+        local = tmp_path / "data.bin"
+        local.write_bytes(data)
+        client.copyfromlocal(str(local), "/data.bin")
+        assert client.verify(str(local), "/data.bin") is True
+        local.write_bytes(data[:-1] + b"?")
+        assert client.verify(str(local), "/data.bin") is False
+
+    def test_delegation_tokens(self, client):
+        token = client.get_delegation_token("me")["urlString"]
+        assert client.renew_delegation_token(token) > time.time() * 1000
+        assert client.cancel_delegation_token(token) is True
+        with pytest.raises(WebHDFSRemoteException):
+            client.renew_delegation_token(token)
+
+
+    def test_parent_modification_time(self, hdfs, client):
+        hdfs.mkdirs("/a")
+        hdfs.mkdirs("/b")
+
+        def changed(change):
+            before = {p: client.status(p)["modificationTime"] for p in "/a /b".split()}
+            time.sleep(0.002)
+            change()
+            return {p for p in before
+                    if client.status(p)["modificationTime"] > before[p]}
+
+        assert changed(lambda: client.create("/a/f", b"x")) == {"/a"}
+        assert changed(lambda: client.rename("/a/f", "/b/f")) == {"/a", "/b"}
+        assert changed(lambda: client.remove("/b/f")) == {"/b"}
+
+    def test_incremental_index_refresh(self, hdfs, client, tmp_path):
+        hdfs.write("/w/a/f1", b"1")
+        hdfs.write("/w/b/g", b"2")
+        with NamespaceIndex(client, str(tmp_path / "ns.db")) as index:
+            index.refresh("/w")
+            time.sleep(0.002)
+            client.create("/w/a/f2", b"22")
+            counts = index.refresh("/w")
+            assert counts["listed"] == 1
+            paths = [r["path"] for r in index.query(file_type="FILE")]
+            assert paths == ["/w/a/f1", "/w/a/f2", "/w/b/g"]
+
+
+class TestRedirects:
+    def test_files_spread_over_datanodes(self, hdfs, client):
+        for i in range(6):
+            client.create(f"/f{i}", b"data")
+        assert hdfs.counts[("datanode", "CREATE")] == 6
+        hosts = client.connection_stats()["hosts"]
+        ports = {int(address.rsplit(":", 1)[1]) for address in hosts}
+        assert set(hdfs.datanode_ports) <= ports
+
+    def test_noredirect(self, hdfs, client):
+        results = client.create_many(
+            ((f"/f{i}", b"x") for i in range(4)), prefetch=2
+        )
+        assert all(result is True for result in results.values())
+        assert hdfs.counts[("namenode", "CREATE")] == 4
+
+    def test_parallel_download(self, hdfs, client, tmp_path):
+        data = bytes(range(256)) * 1000
+        hdfs.write("/big", data)
+        local = tmp_path / "big"
+        client.copytolocal("/big", str(local), workers=4, chunk_size=50000)
+        assert local.read_bytes() == data
+        assert hdfs.counts[("datanode", "OPEN")] == 6
+
+
+class TestShaping:
+    def test_latency(self):
+        with WebHDFSEmulator(datanodes=1, namenode_latency=0.05,
+                             datanode_latency=0.05) as hdfs:
+            with hdfs.client() as client:
+                start = time.perf_counter()
+                client.create("/f", b"x")
+                assert time.perf_counter() - start >= 0.1
+
+    def test_bandwidth(self):
+        with WebHDFSEmulator(datanodes=1, datanode_bandwidth=1000000) as hdfs:
+            hdfs.write("/f", b"x" * 200000)
+            with hdfs.client() as client:
+                start = time.perf_counter()
+                client.read_bytes("/f")
+                assert time.perf_counter() - start >= 0.15
+
+
+class TestCompression:
+    DATA = b"".join(b"record %d\n" % i for i in range(5000))
+
+    def test_create_and_read(self, hdfs, client):
+        client.create("/c/f.gz", io.BytesIO(self.DATA), compression="auto")
+        stored = hdfs.read("/c/f.gz")
+        assert len(stored) < len(self.DATA)
+        assert gzip.decompress(stored) == self.DATA
+        assert client.read_bytes("/c/f.gz", compression="auto") == self.DATA
+        assert client.read_bytes("/c/f.gz") == stored
+        assert client.open("/c/f.gz", compression="gzip") == self.DATA.decode()
+        chunks = list(client.iter_bytes("/c/f.gz", chunk_size=1000,
+                                        compression="auto"))
+        assert max(len(chunk) for chunk in chunks) <= 1000
+        assert b"".join(chunks) == self.DATA
+
+    def test_append(self, hdfs, client):
+        client.create("/c/f.bz2", b"one\n", compression="auto")
+        client.append("/c/f.bz2", b"two\n", compression="auto")
+        assert client.read_bytes("/c/f.bz2", compression="auto") == b"one\ntwo\n"
+
+    def test_auto_without_codec(self, hdfs, client):
+        client.create("/c/f.txt", b"plain", compression="auto")
+        assert hdfs.read("/c/f.txt") == b"plain"
+        assert client.read_bytes("/c/f.txt", compression="auto") == b"plain"
+
+
+def count_fields(records):
+    return sum(len(record.split(",")) for record in records)
+
+
+class TestMapSplits:
+    def test_process_pool(self, hdfs, client):
+        lines = [",".join(["f"] * (i % 5 + 1)) for i in range(3000)]
+        hdfs.write("/big.csv", "\n".join(lines).encode())
+        results = client.map_splits("/big.csv", count_fields, workers=2,
+                                    split_size=4096, probe_size=64)
+        assert len(results) > 4
+        assert sum(results) == sum(i % 5 + 1 for i in range(3000))
+
+    def test_remote_errors(self, hdfs, client):
+        hdfs.write("/f", b"a\nb\n")
+        hdfs.inject_fault("AccessControlException", ops={"OPEN"}, count=None)
+        with pytest.raises(WebHDFSRemoteException) as exc_info:
+            client.map_splits("/f", count_fields, workers=1)
+        assert exc_info.value.exception == "AccessControlException"
+
+
+class TestFaults:
+    def test_retriable_exception_retried(self, hdfs):
+        hdfs.inject_fault("RetriableException", ops={"GETFILESTATUS"}, count=2)
+        hdfs.mkdirs("/d")
+        with hdfs.client(retry=RetryPolicy(backoff=0.001)) as client:
+            assert client.status("/d")["type"] == "DIRECTORY"
+            assert client.metrics.snapshot()["GETFILESTATUS"]["retries"] == 2
+
+    def test_standby_exception(self, hdfs, client):
+        hdfs.inject_fault("StandbyException", count=None)
+        with pytest.raises(WebHDFSRemoteException) as exc_info:
+            client.listdir("/")
+        assert exc_info.value.java_class_name == (
+            "org.apache.hadoop.ipc.StandbyException"
+        )
+        hdfs.clear_faults()
+        assert client.listdir("/") == []
+
+    def test_dropped_datanode_connection(self, hdfs, client):
+        hdfs.write("/f", b"data")
+        hdfs.inject_fault("drop", hop="datanode", ops={"OPEN"})
+        with pytest.raises(WebHDFSConnectionError):
+            client.read_bytes("/f")
+        assert client.read_bytes("/f") == b"data"
+
+    def test_probability(self, hdfs, client):
+        hdfs.inject_fault("RetriableException", count=None, probability=0.5)
+        failures = 0
+        for _ in range(40):
+            try:
+                client.listdir("/")
+            except WebHDFSRemoteException:
+                failures += 1
+        assert 5 < failures < 35
@@ -1,16 +1,34 @@
 """Unit tests for webhdfspy using the ``responses`` library to mock HTTP."""
+import hashlib
+import io
 import json
+import pickle
+import struct
+import zlib
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
 
 import pytest
+import requests
 import responses
 from responses import matchers
 
+from webhdfspy import checksum, compression, trace
 from webhdfspy import (
+    Metrics,
+    NamespaceIndex,
+    RetryPolicy,
+    TraceRecorder,
     WebHDFSClient,
     WebHDFSConnectionError,
     WebHDFSException,
+    WebHDFSFile,
     WebHDFSRemoteException,
 )
+from webhdfspy.webhdfspy import _MetadataCache
 
 BASE = "http://localhost:50070/webhdfs/v1"
 DATANODE = "http://datanode:50075/webhdfs/v1"
@@ -22,6 +40,31 @@ def client():
         yield c
 
 
+def not_found(path):
+    """Return the RemoteException payload of a missing ``path``."""
+    return {
+        "RemoteException": {
+            "exception": "FileNotFoundException",
+            "javaClassName": "java.io.FileNotFoundException",
+            "message": f"{path} does not exist",
+        }
+    }
+
+
+def add_file(path, data):
+    """Serve ``data`` at ``path`` for GETFILESTATUS and ranged OPEN requests."""
+    def callback(request):
+        query = parse_qs(urlparse(request.url).query)
+        if query["op"][0] == "GETFILESTATUS":
+            body = {"FileStatus": {"type": "FILE", "length": len(data)}}
+            return 200, {}, json.dumps(body)
+        offset = int(query.get("offset", ["0"])[0])
+        length = int(query.get("length", [str(len(data))])[0])
+        return 200, {}, data[offset:offset + length]
+
+    responses.add_callback(responses.GET, f"{BASE}{path}", callback=callback)
+
+
 @pytest.fixture()
 def anon_client():
     """Client with no username."""
@@ -54,6 +97,67 @@ class TestInit:
             assert c._session is not None
 
 
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = json.dumps({"FileStatuses": {"FileStatus": []}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def local_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+class TestConnectionPool:
+    def test_pool_options(self):
+        with WebHDFSClient("host", 9870, pool_connections=200,
+                           pool_maxsize=4, pool_block=True) as c:
+            assert c._adapter._pool_connections == 200
+            assert c._adapter._pool_maxsize == 4
+            assert c._adapter._pool_block is True
+            assert c._session.get_adapter("https://dn:9865") is c._adapter
+
+    def test_connection_reuse_stats(self, local_server):
+        with WebHDFSClient("127.0.0.1", local_server) as c:
+            for _ in range(3):
+                c.listdir("/")
+            stats = c.connection_stats()
+        assert stats["connections"] == 1
+        assert stats["requests"] == 3
+        assert stats["reused"] == 2
+        assert stats["hosts"][f"127.0.0.1:{local_server}"]["requests"] == 3
+
+    def test_prewarm(self, local_server):
+        with WebHDFSClient("127.0.0.1", local_server) as c:
+            assert c.prewarm([f"127.0.0.1:{local_server}"], connections=2) == 2
+            c.listdir("/")
+            stats = c.connection_stats()
+        assert stats["connections"] <= 2
+        assert stats["reused"] >= 1
+
+    def test_prewarm_failure_counted(self):
+        with WebHDFSClient("host", 9870) as c:
+            assert c.prewarm(["nonexistent.invalid:1"]) == 0
+
+
 # ------------------------------------------------------------------
 # user.name parameter handling
 # ------------------------------------------------------------------
@@ -118,6 +222,437 @@ class TestListdir:
         assert exc_info.value.exception == "FileNotFoundException"
 
 
+class FakeNamespace:
+    """Mutable in-memory namespace served through ``responses`` callbacks."""
+
+    def __init__(self, page_size=None):
+        self.statuses = {"/": {"type": "DIRECTORY", "modificationTime": 1}}
+        self.data = {}
+        # Entries per LISTSTATUS_BATCH page, all of them when None
+        self.page_size = page_size
+
+    @classmethod
+    def from_tree(cls, tree, page_size=None):
+        """Build a namespace from ``{dir_path: {name: "FILE" | "DIRECTORY"}}``."""
+        ns = cls(page_size)
+        for directory, entries in tree.items():
+            if directory != "/":
+                ns.add(directory, type="DIRECTORY")
+            for name, kind in entries.items():
+                path = directory.rstrip("/") + "/" + name
+                if path not in ns.statuses:
+                    ns.add(path, type=kind)
+        return ns
+
+    def add(self, path, type="FILE", length=0, owner="hdfs", mtime=1, data=None):
+        if data is not None:
+            self.data[path] = data
+            length = len(data)
+        parent = path.rsplit("/", 1)[0] or "/"
+        if parent not in self.statuses:
+            self.add(parent, type="DIRECTORY")
+        self.statuses[path] = {
+            "type": type, "length": length, "owner": owner, "group": "supergroup",
+            "permission": "644", "modificationTime": mtime, "replication": 3,
+        }
+        self.statuses[parent]["modificationTime"] += 1
+
+    def remove(self, path):
+        for p in [p for p in self.statuses if p == path or p.startswith(path + "/")]:
+            del self.statuses[p]
+            self.data.pop(p, None)
+        parent = path.rsplit("/", 1)[0] or "/"
+        self.statuses[parent]["modificationTime"] += 1
+
+    def callback(self, request):
+        url = urlparse(request.url)
+        query = parse_qs(url.query)
+        path = url.path[len("/webhdfs/v1"):] or "/"
+        if url.netloc == "datanode:50075":
+            self.add(path, data=request.body or b"")
+            return 201, {}, ""
+        op = query["op"][0]
+        if op == "CREATE":
+            return 307, {"Location": f"{DATANODE}{path}"}, ""
+        if op == "MKDIRS":
+            self.add(path, type="DIRECTORY")
+            return 200, {}, json.dumps({"boolean": True})
+        if path not in self.statuses:
+            return 404, {}, json.dumps(not_found(path))
+        if op == "DELETE":
+            self.remove(path)
+            return 200, {}, json.dumps({"boolean": True})
+        if op == "SETTIMES":
+            self.statuses[path]["modificationTime"] = int(
+                query["modificationtime"][0]
+            )
+            return 200, {}, ""
+        if op == "GETFILESTATUS":
+            return 200, {}, json.dumps({"FileStatus": self.statuses[path]})
+        if op == "OPEN":
+            data = self.data.get(path, b"")
+            offset = int(query.get("offset", ["0"])[0])
+            length = int(query.get("length", [str(len(data))])[0])
+            return 200, {}, data[offset:offset + length]
+        prefix = path.rstrip("/") + "/"
+        children = [
+            dict(status, pathSuffix=p[len(prefix):])
+            for p, status in sorted(self.statuses.items())
+            if p != path and p.startswith(prefix) and "/" not in p[len(prefix):]
+        ]
+        if self.statuses[path]["type"] != "DIRECTORY":
+            # Listing a file returns its own status
+            children = [dict(self.statuses[path], pathSuffix="")]
+        if op == "LISTSTATUS_BATCH":
+            if "startAfter" in query:
+                after = query["startAfter"][0]
+                children = [c for c in children if c["pathSuffix"] > after]
+            page = children[:self.page_size] if self.page_size else children
+            return 200, {}, json.dumps({"DirectoryListing": {
+                "partialListing": {"FileStatuses": {"FileStatus": page}},
+                "remainingEntries": len(children) - len(page),
+            }})
+        return 200, {}, json.dumps({"FileStatuses": {"FileStatus": children}})
+
+    def activate(self):
+        for method in (responses.GET, responses.PUT, responses.DELETE):
+            for base in (BASE, DATANODE):
+                responses.add_callback(
+                    method, re.compile(re.escape(base) + ".*"),
+                    callback=self.callback,
+                )
+
+
+
+class TestIterdir:
+    @responses.activate
+    @pytest.mark.parametrize("prefetch", [False, True])
+    def test_pages(self, client, prefetch):
+        names = [f"f{i:02d}" for i in range(7)]
+        FakeNamespace.from_tree({"/dir": dict.fromkeys(names, "FILE")},
+                                page_size=3).activate()
+        result = [e["pathSuffix"] for e in client.iterdir("/dir", prefetch=prefetch)]
+        assert result == names
+        assert len(responses.calls) == 3
+        assert "op=LISTSTATUS_BATCH" in responses.calls[0].request.url
+        assert "startAfter=f02" in responses.calls[1].request.url
+
+    @responses.activate
+    def test_lazy(self, client):
+        FakeNamespace.from_tree({"/dir": dict.fromkeys("abcd", "FILE")},
+                                page_size=2).activate()
+        it = client.iterdir("/dir")
+        assert next(it)["pathSuffix"] == "a"
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_empty(self, client):
+        FakeNamespace.from_tree({"/dir": {}}, page_size=2).activate()
+        assert list(client.iterdir("/dir")) == []
+
+
+TREE = {
+    "/": {"a": "DIRECTORY", "b": "DIRECTORY", "top.txt": "FILE"},
+    "/a": {"c": "DIRECTORY", "a.txt": "FILE"},
+    "/a/c": {"c.txt": "FILE"},
+    "/b": {},
+}
+
+
+class TestWalk:
+    @responses.activate
+    def test_walk(self, client):
+        FakeNamespace.from_tree(TREE).activate()
+        result = {d: (sorted(ds), sorted(fs)) for d, ds, fs in client.walk("/")}
+        assert result == {
+            "/": (["a", "b"], ["top.txt"]),
+            "/a": (["c"], ["a.txt"]),
+            "/a/c": ([], ["c.txt"]),
+            "/b": ([], []),
+        }
+
+    @responses.activate
+    def test_max_depth(self, client):
+        FakeNamespace.from_tree(TREE).activate()
+        result = {d for d, _, _ in client.walk("/", max_depth=1)}
+        assert result == {"/", "/a", "/b"}
+
+    @responses.activate
+    def test_detail(self, client):
+        FakeNamespace.from_tree(TREE).activate()
+        result = {d: fs for d, _, fs in client.walk("/a/c", detail=True)}
+        assert result["/a/c"][0]["pathSuffix"] == "c.txt"
+
+    @responses.activate
+    @pytest.mark.parametrize("detail", [False, True])
+    def test_prune_dirs(self, client, detail):
+        FakeNamespace.from_tree(TREE).activate()
+        result = []
+        for dirpath, dirs, _ in client.walk("/", detail=detail):
+            result.append(dirpath)
+            dirs[:] = [d for d in dirs
+                       if (d["pathSuffix"] if detail else d) != "a"]
+        assert sorted(result) == ["/", "/b"]
+        assert not any("/a" in call.request.url for call in responses.calls)
+
+    @responses.activate
+    def test_file(self, client):
+        FakeNamespace.from_tree(TREE).activate()
+        assert list(client.walk("/top.txt")) == []
+
+    @responses.activate
+    def test_onerror(self, client):
+        # /a/c disappears between the listing of /a and its own: responses
+        # uses, and then drops, the first of several matching registrations
+        responses.add(responses.GET, f"{BASE}/a/c", json=not_found("/a/c"),
+                      status=404)
+        FakeNamespace.from_tree(TREE).activate()
+        errors = []
+        result = {d for d, _, _ in client.walk("/", onerror=errors.append)}
+        assert "/a/c" not in result
+        assert len(errors) == 1
+        assert errors[0].status_code == 404
+
+
+class TestGlob:
+    TREE = {
+        "/": {"data": "DIRECTORY"},
+        "/data": {
+            "2025-12-31": "DIRECTORY",
+            "2026-01-01": "DIRECTORY",
+            "2026-01-02": "DIRECTORY",
+            "2026-notes.txt": "FILE",
+            "latest": "DIRECTORY",
+        },
+        "/data/2026-01-01": {
+            "part-0.parquet": "FILE",
+            "part-1.parquet": "FILE",
+            "_SUCCESS": "FILE",
+        },
+        "/data/2026-01-02": {"part-0.parquet": "FILE"},
+        "/data/2025-12-31": {"part-0.parquet": "FILE"},
+    }
+
+    @responses.activate
+    def test_glob(self, client):
+        FakeNamespace.from_tree(self.TREE).activate()
+        assert client.glob("/data/2026-*/part-*.parquet") == [
+            "/data/2026-01-01/part-0.parquet",
+            "/data/2026-01-01/part-1.parquet",
+            "/data/2026-01-02/part-0.parquet",
+        ]
+
+    @responses.activate
+    def test_prefix_pruning(self, client):
+        FakeNamespace.from_tree(self.TREE).activate()
+        client.glob("/data/2026-*/part-*.parquet")
+        urls = [c.request.url for c in responses.calls]
+        # The 2025 partition is never listed
+        assert not any("2025-12-31" in url for url in urls)
+        assert "startAfter=2026%2C" in urls[0]
+
+    @responses.activate
+    def test_literal_last_component(self, client):
+        FakeNamespace.from_tree(self.TREE).activate()
+        assert client.glob("/data/*/_SUCCESS") == ["/data/2026-01-01/_SUCCESS"]
+
+    @responses.activate
+    def test_no_magic(self, client):
+        FakeNamespace.from_tree(self.TREE).activate()
+        assert client.glob("/data/2026-01-02/part-0.parquet") == [
+            "/data/2026-01-02/part-0.parquet"
+        ]
+        assert client.glob("/data/missing") == []
+
+    @responses.activate
+    def test_missing_directory(self, client):
+        FakeNamespace.from_tree(self.TREE).activate()
+        assert client.glob("/nope/*") == []
+
+    def test_relative_pattern_raises(self, client):
+        with pytest.raises(WebHDFSException, match="must be absolute"):
+            client.glob("data/*")
+
+
+class TestNamespaceIndex:
+    @pytest.fixture()
+    def namespace(self):
+        ns = FakeNamespace()
+        ns.add("/data", type="DIRECTORY")
+        ns.add("/data/big.bin", length=2000, owner="etl", mtime=100)
+        ns.add("/data/small.bin", length=10, owner="etl", mtime=200)
+        ns.add("/data/sub", type="DIRECTORY")
+        ns.add("/data/sub/other.bin", length=5000, owner="bob", mtime=300)
+        ns.add("/tmp", type="DIRECTORY")
+        return ns
+
+    @responses.activate
+    def test_refresh_and_query(self, client, namespace, tmp_path):
+        namespace.activate()
+        with NamespaceIndex(client, str(tmp_path / "ns.db")) as index:
+            counts = index.refresh("/")
+            assert counts["listed"] == 4
+            big = index.query(owner="etl", min_length=1000)
+            assert [r["path"] for r in big] == ["/data/big.bin"]
+            recent = index.query(file_type="FILE", modified_after=150)
+            assert [r["path"] for r in recent] == [
+                "/data/small.bin", "/data/sub/other.bin",
+            ]
+            under = index.query(path="/data/sub")
+            assert [r["path"] for r in under] == ["/data/sub/other.bin"]
+
+    @responses.activate
+    def test_incremental_refresh(self, client, namespace, tmp_path):
+        namespace.activate()
+        with NamespaceIndex(client, str(tmp_path / "ns.db")) as index:
+            index.refresh("/")
+            namespace.add("/data/sub/new.bin", length=1)
+            namespace.remove("/data/small.bin")
+            responses.calls.reset()
+            counts = index.refresh("/")
+            listed = [
+                urlparse(c.request.url).path for c in responses.calls
+                if "op=LISTSTATUS" in c.request.url
+            ]
+            assert sorted(listed) == ["/webhdfs/v1/data", "/webhdfs/v1/data/sub"]
+            assert counts["skipped"] == 2
+            paths = [r["path"] for r in index.query(file_type="FILE")]
+            assert paths == ["/data/big.bin", "/data/sub/new.bin", "/data/sub/other.bin"]
+
+    @responses.activate
+    def test_removed_directory(self, client, namespace, tmp_path):
+        namespace.activate()
+        with NamespaceIndex(client, str(tmp_path / "ns.db")) as index:
+            index.refresh("/")
+            namespace.remove("/data/sub/other.bin")
+            namespace.remove("/data/sub")
+            index.refresh("/")
+            assert index.query(path="/data/sub") == []
+            assert [r["path"] for r in index.query(path="/data")] == [
+                "/data/big.bin", "/data/small.bin",
+            ]
+
+    @responses.activate
+    def test_persists_across_instances(self, client, namespace, tmp_path):
+        namespace.activate()
+        db = str(tmp_path / "ns.db")
+        with NamespaceIndex(client, db) as index:
+            index.refresh("/")
+        with NamespaceIndex(client, db) as index:
+            assert len(index.query(file_type="DIRECTORY")) == 4
+
+
+class TestSync:
+    @pytest.fixture()
+    def local(self, tmp_path):
+        root = tmp_path / "local"
+        (root / "sub").mkdir(parents=True)
+        (root / "a.txt").write_bytes(b"aaa")
+        (root / "sub" / "b.txt").write_bytes(b"bbbb")
+        return root
+
+    @responses.activate
+    def test_upload_then_skip(self, client, local):
+        namespace = FakeNamespace()
+        namespace.activate()
+        result = client.sync(str(local), "/dst")
+        assert result == {"a.txt": "upload", "sub/b.txt": "upload"}
+        assert namespace.data["/dst/sub/b.txt"] == b"bbbb"
+        mtime = (local / "a.txt").stat().st_mtime_ns // 1_000_000
+        assert namespace.statuses["/dst/a.txt"]["modificationTime"] == mtime
+
+        assert client.sync(str(local), "/dst") == {
+            "a.txt": "skip", "sub/b.txt": "skip",
+        }
+
+    @responses.activate
+    def test_upload_changed_only(self, client, local):
+        namespace = FakeNamespace()
+        namespace.activate()
+        client.sync(str(local), "/dst")
+        (local / "a.txt").write_bytes(b"changed")
+        result = client.sync(str(local), "/dst")
+        assert result == {"a.txt": "upload", "sub/b.txt": "skip"}
+        assert namespace.data["/dst/a.txt"] == b"changed"
+
+    @responses.activate
+    def test_upload_delete(self, client, local):
+        namespace = FakeNamespace()
+        namespace.add("/dst/stale.txt", data=b"x")
+        namespace.add("/dst/old/deep/x.txt", data=b"x")
+        namespace.activate()
+        result = client.sync(str(local), "/dst", delete=True)
+        assert result["stale.txt"] == "delete"
+        assert result["old"] == "delete"
+        assert "old/deep/x.txt" not in result
+        assert "/dst/stale.txt" not in namespace.statuses
+        assert "/dst/old" not in namespace.statuses
+
+    @responses.activate
+    def test_upload_file_replaces_directory(self, client, local):
+        namespace = FakeNamespace()
+        namespace.add("/dst/a.txt/inner.txt", data=b"x")
+        namespace.activate()
+        result = client.sync(str(local), "/dst", delete=True)
+        assert result == {"a.txt": "upload", "sub/b.txt": "upload"}
+        assert namespace.statuses["/dst/a.txt"]["type"] == "FILE"
+        assert namespace.data["/dst/a.txt"] == b"aaa"
+        assert "/dst/a.txt/inner.txt" not in namespace.statuses
+
+    @responses.activate
+    def test_download(self, client, tmp_path):
+        namespace = FakeNamespace()
+        namespace.add("/src/x.txt", data=b"hello", mtime=1_600_000_000_000)
+        namespace.add("/src/d/y.txt", data=b"world", mtime=1_600_000_000_000)
+        namespace.activate()
+        target = tmp_path / "mirror"
+        (target).mkdir()
+        (target / "stale.txt").write_bytes(b"old")
+        result = client.sync(str(target), "/src", direction="download",
+                             delete=True)
+        assert result == {"x.txt": "download", "d/y.txt": "download",
+                          "stale.txt": "delete"}
+        assert (target / "d" / "y.txt").read_bytes() == b"world"
+        assert (target / "x.txt").stat().st_mtime_ns == 1_600_000_000_000_000_000
+        assert not (target / "stale.txt").exists()
+        assert client.sync(str(target), "/src", direction="download") == {
+            "x.txt": "skip", "d/y.txt": "skip",
+        }
+
+    @responses.activate
+    def test_checksum_touch(self, client, local, monkeypatch):
+        namespace = FakeNamespace()
+        namespace.activate()
+        client.sync(str(local), "/dst")
+        namespace.statuses["/dst/a.txt"]["modificationTime"] = 1
+        monkeypatch.setattr(client, "verify", lambda local_path, hdfs_path: True)
+        result = client.sync(str(local), "/dst", checksum=True)
+        assert result == {"a.txt": "touch", "sub/b.txt": "skip"}
+        mtime = (local / "a.txt").stat().st_mtime_ns // 1_000_000
+        assert namespace.statuses["/dst/a.txt"]["modificationTime"] == mtime
+
+    @responses.activate
+    def test_checksum_mismatch_transfers(self, client, local, monkeypatch):
+        namespace = FakeNamespace()
+        namespace.activate()
+        client.sync(str(local), "/dst")
+        namespace.statuses["/dst/a.txt"]["modificationTime"] = 1
+        monkeypatch.setattr(client, "verify", lambda local_path, hdfs_path: False)
+        result = client.sync(str(local), "/dst", checksum=True)
+        assert result == {"a.txt": "upload", "sub/b.txt": "skip"}
+
+    @responses.activate
+    def test_download_missing_source_raises(self, client, tmp_path):
+        FakeNamespace().activate()
+        with pytest.raises(WebHDFSRemoteException):
+            client.sync(str(tmp_path), "/missing", direction="download",
+                        delete=True)
+
+    def test_invalid_direction(self, client, tmp_path):
+        with pytest.raises(WebHDFSException, match="Invalid sync direction"):
+            client.sync(str(tmp_path), "/dst", direction="both")
+
+
 # ------------------------------------------------------------------
 # Mkdir
 # ------------------------------------------------------------------
@@ -211,6 +746,223 @@ class TestOpen:
             client.open("/missing")
 
 
+class TestStreamingRead:
+    @responses.activate
+    def test_read_bytes(self, client):
+        responses.add(
+            responses.GET, f"{BASE}/file.bin", body=b"\x00\xffdata", status=200,
+        )
+        assert client.read_bytes("/file.bin") == b"\x00\xffdata"
+
+    @responses.activate
+    def test_iter_bytes_chunks(self, client):
+        responses.add(
+            responses.GET, f"{BASE}/file.bin", body=b"abcdefghij", status=200,
+        )
+        chunks = list(client.iter_bytes("/file.bin", chunk_size=4))
+        assert chunks == [b"abcd", b"efgh", b"ij"]
+
+    @responses.activate
+    def test_iter_bytes_range_params(self, client):
+        responses.add(responses.GET, f"{BASE}/file.bin", body=b"cd", status=200)
+        assert b"".join(client.iter_bytes("/file.bin", offset=2, length=2)) == b"cd"
+        url = responses.calls[0].request.url
+        assert "offset=2" in url
+        assert "length=2" in url
+
+    @responses.activate
+    def test_iter_bytes_error_raises(self, client):
+        payload = not_found("/missing")
+        responses.add(responses.GET, f"{BASE}/missing", json=payload, status=404)
+        with pytest.raises(WebHDFSRemoteException):
+            list(client.iter_bytes("/missing"))
+
+
+class TestIterLines:
+    TEXT = "id\tname\n1\tZo\u00eb\n2\t\u65e5\u672c\n\n3\tend"
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 4096])
+    @responses.activate
+    def test_split_across_chunks(self, client, chunk_size):
+        add_file("/data.tsv", self.TEXT.encode())
+        lines = list(client.iter_lines("/data.tsv", chunk_size=chunk_size))
+        assert lines == self.TEXT.split("\n")
+
+    @responses.activate
+    def test_trailing_delimiter(self, client):
+        add_file("/data.txt", b"a\nb\n")
+        assert list(client.iter_lines("/data.txt")) == ["a", "b"]
+
+    @responses.activate
+    def test_multibyte_delimiter_bytes(self, client):
+        add_file("/data.bin", b"a\r\nbb\r\n\xffc")
+        records = client.iter_lines("/data.bin", encoding=None,
+                                    delimiter=b"\r\n", chunk_size=3)
+        assert list(records) == [b"a", b"bb", b"\xffc"]
+
+    @responses.activate
+    def test_decode_errors(self, client):
+        add_file("/data.txt", b"ok\n\xff\n")
+        with pytest.raises(UnicodeDecodeError):
+            list(client.iter_lines("/data.txt"))
+        lines = client.iter_lines("/data.txt", errors="replace")
+        assert list(lines) == ["ok", "\ufffd"]
+
+    @pytest.mark.parametrize("encoding", ["utf-16", "utf-16-be", "utf-32"])
+    @pytest.mark.parametrize("chunk_size", [1, 3, 4096])
+    @responses.activate
+    def test_incremental_decoding(self, client, encoding, chunk_size):
+        # "\u0a00" and "\u010a" are encoded with a 0x0a byte in UTF-16
+        text = "a\u0a00\nb\u010a\n\n\U0001f600c"
+        add_file("/data.txt", text.encode(encoding))
+        lines = client.iter_lines("/data.txt", encoding=encoding,
+                                  chunk_size=chunk_size)
+        assert list(lines) == text.split("\n")
+
+    def test_non_ascii_delimiter(self, client):
+        with pytest.raises(WebHDFSException, match="must be ASCII"):
+            client.iter_lines("/data.txt", encoding="utf-16",
+                              delimiter="\u2028".encode("utf-16"))
+
+    def test_empty_delimiter(self, client):
+        with pytest.raises(WebHDFSException, match="delimiter"):
+            client.iter_lines("/data.txt", delimiter=b"")
+
+
+class TestOpenFile:
+    @responses.activate
+    def test_read_and_tell(self, client):
+        add_file("/file.bin", b"0123456789")
+        with client.open_file("/file.bin", read_ahead=4) as f:
+            assert isinstance(f, WebHDFSFile)
+            assert f.read(3) == b"012"
+            assert f.tell() == 3
+            assert f.read() == b"3456789"
+            assert f.read() == b""
+
+    @responses.activate
+    def test_read_ahead_serves_small_reads(self, client):
+        add_file("/file.bin", b"0123456789")
+        with client.open_file("/file.bin", read_ahead=8) as f:
+            assert f.read(2) == b"01"
+            assert f.read(2) == b"23"
+        # One GETFILESTATUS plus one ranged OPEN
+        assert len(responses.calls) == 2
+        assert "length=8" in responses.calls[1].request.url
+
+    @responses.activate
+    def test_seek_end(self, client):
+        add_file("/file.bin", b"0123456789")
+        with client.open_file("/file.bin") as f:
+            assert f.seek(-3, io.SEEK_END) == 7
+            assert f.read() == b"789"
+        assert "offset=7" in responses.calls[1].request.url
+
+    @responses.activate
+    def test_readinto(self, client):
+        add_file("/file.bin", b"0123456789")
+        with client.open_file("/file.bin") as f:
+            f.seek(5)
+            buf = bytearray(3)
+            assert f.readinto(buf) == 3
+            assert buf == b"567"
+
+    @responses.activate
+    def test_readline_across_windows(self, client):
+        add_file("/file.txt", b"first line\nsecond\nlast")
+        with client.open_file("/file.txt", read_ahead=4) as f:
+            assert f.readline() == b"first line\n"
+            assert f.readline() == b"second\n"
+            assert f.readline() == b"last"
+            assert f.readline() == b""
+
+    @responses.activate
+    def test_negative_seek_raises(self, client):
+        add_file("/file.bin", b"0123456789")
+        with client.open_file("/file.bin") as f:
+            with pytest.raises(ValueError):
+                f.seek(-1)
+
+
+class TestCopyToLocal:
+    @responses.activate
+    def test_parallel_ranges(self, client, tmp_path):
+        data = bytes(range(256)) * 10
+        add_file("/file.bin", data)
+        local = tmp_path / "file.bin"
+        assert client.copytolocal("/file.bin", str(local), workers=3,
+                                  chunk_size=1000) is True
+        assert local.read_bytes() == data
+        opens = [c for c in responses.calls if "op=OPEN" in c.request.url]
+        assert len(opens) == 3
+
+    @responses.activate
+    def test_empty_file(self, client, tmp_path):
+        add_file("/empty", b"")
+        local = tmp_path / "empty"
+        client.copytolocal("/empty", str(local))
+        assert local.read_bytes() == b""
+
+    @responses.activate
+    def test_short_read_raises(self, client, tmp_path):
+        responses.add(
+            responses.GET, f"{BASE}/file.bin",
+            json={"FileStatus": {"type": "FILE", "length": 10}}, status=200,
+        )
+        responses.add(responses.GET, f"{BASE}/file.bin", body=b"short", status=200)
+        with pytest.raises(WebHDFSException, match="Short read"):
+            client.copytolocal("/file.bin", str(tmp_path / "file.bin"))
+
+
+class TestInputSplits:
+    DATA = b"".join(b"%d:%s\n" % (i, b"x" * (i * 7 % 23)) for i in range(200))
+
+    @pytest.mark.parametrize("split_size,probe_size", [
+        (7, 2), (50, 3), (64, 4096), (1000, 16), (10**6, 16),
+    ])
+    @responses.activate
+    def test_splits_start_at_records(self, client, split_size, probe_size):
+        add_file("/data.txt", self.DATA)
+        splits = client._input_splits("/data.txt", split_size, b"\n",
+                                      probe_size, 4)
+        assert splits[0][0] == 0
+        assert splits[-1][1] == len(self.DATA)
+        records = []
+        for (start, end), following in zip(splits, splits[1:] + [(None,)]):
+            assert start < end
+            assert start == 0 or self.DATA[start - 1:start] == b"\n"
+            assert following[0] in (None, end)
+            records += self.DATA[start:end].splitlines()
+        assert records == self.DATA.splitlines()
+
+    @responses.activate
+    def test_long_record_spans_splits(self, client):
+        data = b"a\n" + b"b" * 100 + b"\r\nc\r\n"
+        add_file("/data.txt", data)
+        splits = client._input_splits("/data.txt", 10, b"\r\n", 7, 4)
+        assert splits == [(0, 104), (104, 107)]
+
+    @responses.activate
+    def test_boundary_on_record_start(self, client):
+        add_file("/data.txt", b"abc\ndef\nghi\n")
+        assert client._input_splits("/data.txt", 4, b"\n", 2, 1) == [
+            (0, 4), (4, 8), (8, 12)
+        ]
+
+    @responses.activate
+    def test_empty_file(self, client):
+        add_file("/empty", b"")
+        assert client._input_splits("/empty", 4, b"\n", 2, 1) == []
+
+    def test_invalid_arguments(self, client):
+        with pytest.raises(WebHDFSException, match="workers"):
+            client.map_splits("/f", len, workers=0)
+        with pytest.raises(WebHDFSException, match="split_size"):
+            client.map_splits("/f", len, split_size=0)
+        with pytest.raises(WebHDFSException, match="utf-16"):
+            client.map_splits("/f", len, encoding="utf-16")
+
+
 # ------------------------------------------------------------------
 # Status
 # ------------------------------------------------------------------
@@ -231,6 +983,137 @@ class TestStatus:
         assert result["length"] == 123
 
 
+class TestMetadataCache:
+    @pytest.fixture()
+    def cached_client(self):
+        with WebHDFSClient("localhost", 50070, cache_ttl=60, cache_size=2) as c:
+            yield c
+
+    @staticmethod
+    def add_status(path, length=1):
+        responses.add(
+            responses.GET, f"{BASE}{path}",
+            json={"FileStatus": {"type": "FILE", "length": length}}, status=200,
+        )
+
+    @responses.activate
+    def test_status_hit(self, cached_client):
+        self.add_status("/a")
+        assert cached_client.status("/a")["length"] == 1
+        assert cached_client.status("/a")["length"] == 1
+        assert len(responses.calls) == 1
+        assert cached_client.cache_stats() == {"hits": 1, "misses": 1, "size": 1}
+
+    @responses.activate
+    def test_listdir_hit(self, cached_client):
+        payload = {"FileStatuses": {"FileStatus": [{"pathSuffix": "x"}]}}
+        responses.add(responses.GET, f"{BASE}/dir", json=payload, status=200)
+        cached_client.listdir("/dir")
+        result = cached_client.listdir("/dir/")
+        result[0]["pathSuffix"] = "mutated"
+        assert cached_client.listdir("/dir")[0]["pathSuffix"] == "x"
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_ttl_expiry(self, cached_client, monkeypatch):
+        self.add_status("/a")
+        cached_client.status("/a")
+        now = time.monotonic()
+        monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+        cached_client.status("/a")
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    def test_lru_eviction(self, cached_client):
+        for path in ["/a", "/b", "/c"]:
+            self.add_status(path)
+        cached_client.status("/a")
+        cached_client.status("/b")
+        cached_client.status("/a")
+        cached_client.status("/c")
+        cached_client.status("/a")
+        cached_client.status("/b")
+        # /b was the least recently used entry when /c was added
+        assert len(responses.calls) == 4
+
+    @responses.activate
+    def test_mutation_invalidates_path_and_parent(self, cached_client):
+        self.add_status("/dir/a")
+        payload = {"FileStatuses": {"FileStatus": [{"pathSuffix": "a"}]}}
+        responses.add(responses.GET, f"{BASE}/dir", json=payload, status=200)
+        responses.add(responses.PUT, f"{BASE}/dir/a", body="", status=200)
+        cached_client.status("/dir/a")
+        cached_client.listdir("/dir")
+        cached_client.chmod("/dir/a", "600")
+        assert cached_client.cache_stats()["size"] == 0
+
+    @responses.activate
+    def test_failed_mutation_invalidates(self, cached_client):
+        self.add_status("/a")
+        responses.add(responses.DELETE, f"{BASE}/a", body="boom", status=500)
+        cached_client.status("/a")
+        with pytest.raises(WebHDFSException):
+            cached_client.remove("/a")
+        assert cached_client.cache_stats()["size"] == 0
+
+    @responses.activate
+    def test_rename_invalidates_children(self, cached_client):
+        self.add_status("/src/child")
+        responses.add(
+            responses.PUT, f"{BASE}/src", json={"boolean": True}, status=200,
+        )
+        cached_client.status("/src/child")
+        cached_client.rename("/src", "/dst")
+        assert cached_client.cache_stats()["size"] == 0
+
+    @responses.activate
+    def test_mkdir_invalidates_created_parents(self, cached_client):
+        payload = {"FileStatuses": {"FileStatus": []}}
+        responses.add(responses.GET, f"{BASE}/a", json=payload, status=200)
+        responses.add(
+            responses.PUT, f"{BASE}/a/b/c", json={"boolean": True}, status=200,
+        )
+        cached_client.listdir("/a")
+        cached_client.mkdir("/a/b/c")
+        cached_client.listdir("/a")
+        # /a/b was created too, so the listing of /a is stale
+        assert len(responses.calls) == 3
+
+    def test_invalidate_descendants(self):
+        cache = _MetadataCache(60, 100)
+        for path in ["/a/b/c/d", "/a/b/e", "/a/bc", "/x"]:
+            cache.put("status", path, path)
+        cache.invalidate("/a/b/e")
+        assert [cache.get("status", p) for p in ["/a/b/e", "/a/b/c/d"]] == [
+            None, "/a/b/c/d"
+        ]
+        # Intermediate directories without entries are still walked
+        cache.invalidate("/a/b", descendants=True)
+        assert cache.get("status", "/a/b/c/d") is None
+        assert cache.get("status", "/a/bc") == "/a/bc"
+        assert cache.get("status", "/x") == "/x"
+
+    def test_child_index_cleanup(self):
+        cache = _MetadataCache(60, 2)
+        for i in range(50):
+            cache.put("status", f"/d{i}/sub/f", i)
+        cache.put("listdir", "/d49/sub", [])
+        assert cache.stats()["size"] == 2
+        assert set(cache._ops) == {"/d49/sub/f", "/d49/sub"}
+        assert set(cache._children) == {"/", "/d49", "/d49/sub"}
+        cache.invalidate("/d49/sub", descendants=True)
+        assert cache._ops == {}
+        assert not any(cache._children.values())
+
+    @responses.activate
+    def test_disabled_by_default(self, client):
+        self.add_status("/a")
+        client.status("/a")
+        client.status("/a")
+        assert len(responses.calls) == 2
+        assert client.cache_stats() == {"hits": 0, "misses": 0, "size": 0}
+
+
 # ------------------------------------------------------------------
 # Chmod
 # ------------------------------------------------------------------
@@ -280,6 +1163,269 @@ class TestCreate:
         assert "overwrite=True" in responses.calls[0].request.url
 
 
+class TestResumableUpload:
+    @pytest.fixture(autouse=True)
+    def no_sleep(self, monkeypatch):
+        monkeypatch.setattr(time, "sleep", lambda seconds: None)
+
+    @staticmethod
+    def add_lengths(*lengths):
+        for length in lengths:
+            responses.add(
+                responses.GET, f"{BASE}/data.bin",
+                json={"FileStatus": {"type": "FILE", "length": length}},
+            )
+
+    @responses.activate
+    def test_resumes_after_datanode_failure(self, client, tmp_path):
+        local = tmp_path / "data.bin"
+        local.write_bytes(b"aaaabbbbcc")
+        responses.add(
+            responses.PUT, f"{BASE}/data.bin", status=307,
+            headers={"Location": f"{DATANODE}/data.bin"},
+        )
+        responses.add(responses.PUT, f"{DATANODE}/data.bin", status=201)
+        responses.add(
+            responses.POST, f"{BASE}/data.bin", status=307,
+            headers={"Location": f"{DATANODE}/data.bin"},
+        )
+        responses.add(
+            responses.POST, f"{DATANODE}/data.bin",
+            body=requests.ConnectionError("connection reset"),
+        )
+        responses.add(responses.POST, f"{DATANODE}/data.bin", status=200)
+        self.add_lengths(4, 8)
+
+        assert client.copyfromlocal(str(local), "/data.bin", resumable=True,
+                                    chunk_size=4) is True
+        bodies = [
+            c.request.body for c in responses.calls
+            if c.request.url.startswith(DATANODE)
+            and not isinstance(c.response, Exception)
+        ]
+        assert bodies == [b"aaaa", b"bbbb", b"cc"]
+
+    @responses.activate
+    def test_waits_for_lease_recovery(self, client, tmp_path):
+        local = tmp_path / "data.bin"
+        local.write_bytes(b"aaaabbbbcc")
+        responses.add(
+            responses.PUT, f"{BASE}/data.bin", status=307,
+            headers={"Location": f"{DATANODE}/data.bin"},
+        )
+        responses.add(responses.PUT, f"{DATANODE}/data.bin", status=201)
+        redirect = {"status": 307,
+                    "headers": {"Location": f"{DATANODE}/data.bin"}}
+        responses.add(responses.POST, f"{BASE}/data.bin", **redirect)
+        responses.add(responses.POST, f"{BASE}/data.bin", status=403, json={
+            "RemoteException": {
+                "exception": "AlreadyBeingCreatedException",
+                "javaClassName":
+                    "org.apache.hadoop.hdfs.protocol.AlreadyBeingCreatedException",
+                "message": "Failed to APPEND_FILE /data.bin",
+            }
+        })
+        responses.add(responses.POST, f"{BASE}/data.bin", **redirect)
+        # The DataNode received bbbb before the connection dropped
+        responses.add(
+            responses.POST, f"{DATANODE}/data.bin",
+            body=requests.ConnectionError("connection reset"),
+        )
+        responses.add(responses.POST, f"{DATANODE}/data.bin", status=200)
+        # Under construction the partial block isn't counted, once the
+        # lease is recovered it is
+        self.add_lengths(4, 8, 10)
+
+        assert client.copyfromlocal(str(local), "/data.bin", resumable=True,
+                                    chunk_size=4) is True
+        appends = [
+            c.request.body for c in responses.calls
+            if c.request.url.startswith(DATANODE) and c.request.method == "POST"
+        ]
+        assert appends == [b"bbbb", b"cc"]
+
+    @responses.activate
+    def test_detects_resume_at_wrong_offset(self, client, tmp_path):
+        local = tmp_path / "data.bin"
+        local.write_bytes(b"aaaabbbb")
+        responses.add(
+            responses.PUT, f"{BASE}/data.bin", status=307,
+            headers={"Location": f"{DATANODE}/data.bin"},
+        )
+        responses.add(responses.PUT, f"{DATANODE}/data.bin", status=201)
+        responses.add(
+            responses.POST, f"{BASE}/data.bin", status=307,
+            headers={"Location": f"{DATANODE}/data.bin"},
+        )
+        responses.add(
+            responses.POST, f"{DATANODE}/data.bin",
+            body=requests.ConnectionError("connection reset"),
+        )
+        responses.add(responses.POST, f"{DATANODE}/data.bin", status=200)
+        self.add_lengths(4, 12)
+        with pytest.raises(WebHDFSException, match="wrong offset"):
+            client.copyfromlocal(str(local), "/data.bin", resumable=True,
+                                 chunk_size=4)
+
+    @responses.activate
+    def test_gives_up_after_max_resumes(self, client, tmp_path):
+        local = tmp_path / "data.bin"
+        local.write_bytes(b"aaaa")
+        responses.add(
+            responses.PUT, f"{BASE}/data.bin", status=307,
+            headers={"Location": f"{DATANODE}/data.bin"},
+        )
+        responses.add(
+            responses.PUT, f"{DATANODE}/data.bin",
+            body=requests.ConnectionError("connection reset"),
+        )
+        payload = not_found("/data.bin")
+        responses.add(responses.GET, f"{BASE}/data.bin", json=payload, status=404)
+        with pytest.raises(WebHDFSConnectionError):
+            client.copyfromlocal(str(local), "/data.bin", resumable=True,
+                                 max_resumes=2)
+
+
+class TestPutTree:
+    @pytest.fixture()
+    def tree(self, tmp_path):
+        (tmp_path / "a" / "b").mkdir(parents=True)
+        (tmp_path / "c").mkdir()
+        (tmp_path / "top.txt").write_text("top")
+        (tmp_path / "a" / "b" / "deep.txt").write_text("deep")
+        return tmp_path
+
+    @responses.activate
+    def test_success(self, client, tree):
+        for path in ["/dst/a/b", "/dst/c"]:
+            responses.add(
+                responses.PUT, f"{BASE}{path}", json={"boolean": True}, status=200,
+            )
+        for path in ["/dst/top.txt", "/dst/a/b/deep.txt"]:
+            responses.add(
+                responses.PUT, f"{BASE}{path}", status=307,
+                headers={"Location": f"{DATANODE}{path}"},
+            )
+            responses.add(responses.PUT, f"{DATANODE}{path}", status=201)
+
+        result = client.put_tree(str(tree), "/dst", workers=2)
+        assert result == {
+            "/dst/a/b": True,
+            "/dst/c": True,
+            "/dst/top.txt": True,
+            "/dst/a/b/deep.txt": True,
+        }
+        mkdirs = [c for c in responses.calls if "op=MKDIRS" in c.request.url]
+        assert len(mkdirs) == 2
+
+    @responses.activate
+    def test_failure_reported(self, client, tree):
+        for path in ["/dst/a/b", "/dst/c"]:
+            responses.add(
+                responses.PUT, f"{BASE}{path}", json={"boolean": True}, status=200,
+            )
+        responses.add(
+            responses.PUT, f"{BASE}/dst/top.txt", status=307,
+            headers={"Location": f"{DATANODE}/dst/top.txt"},
+        )
+        responses.add(responses.PUT, f"{DATANODE}/dst/top.txt", status=201)
+        payload = {
+            "RemoteException": {
+                "exception": "AccessControlException",
+                "javaClassName": "org.apache.hadoop.security.AccessControlException",
+                "message": "Permission denied",
+            }
+        }
+        responses.add(
+            responses.PUT, f"{BASE}/dst/a/b/deep.txt", json=payload, status=403,
+        )
+
+        result = client.put_tree(str(tree), "/dst")
+        assert result["/dst/top.txt"] is True
+        assert isinstance(result["/dst/a/b/deep.txt"], WebHDFSRemoteException)
+
+    def test_missing_local_dir(self, client, tmp_path):
+        with pytest.raises(WebHDFSException, match="doesn't exist"):
+            client.put_tree(str(tmp_path / "missing"), "/dst")
+
+
+class TestCreateMany:
+    @responses.activate
+    def test_noredirect_location(self, client):
+        for i in range(3):
+            responses.add(
+                responses.PUT, f"{BASE}/f{i}",
+                json={"Location": f"{DATANODE}/f{i}"}, status=200,
+            )
+            responses.add(responses.PUT, f"{DATANODE}/f{i}", status=201)
+        files = [(f"/f{i}", f"data{i}".encode()) for i in range(3)]
+        assert client.create_many(files, prefetch=2) == {
+            "/f0": True, "/f1": True, "/f2": True,
+        }
+        namenode_calls = [c for c in responses.calls
+                          if c.request.url.startswith(BASE)]
+        assert all("noredirect=true" in c.request.url for c in namenode_calls)
+        uploads = {c.request.url.split("?")[0]: c.request.body
+                   for c in responses.calls if c.request.url.startswith(DATANODE)}
+        assert uploads[f"{DATANODE}/f1"] == b"data1"
+
+    @responses.activate
+    def test_redirect_fallback(self, client):
+        responses.add(
+            responses.PUT, f"{BASE}/f", status=307,
+            headers={"Location": f"{DATANODE}/f"},
+        )
+        responses.add(responses.PUT, f"{DATANODE}/f", status=201)
+        assert client.create_many([("/f", b"x")]) == {"/f": True}
+
+    @responses.activate
+    def test_failures_reported(self, client):
+        payload = {
+            "RemoteException": {
+                "exception": "FileAlreadyExistsException",
+                "javaClassName":
+                    "org.apache.hadoop.fs.FileAlreadyExistsException",
+                "message": "/a already exists",
+            }
+        }
+        responses.add(responses.PUT, f"{BASE}/a", json=payload, status=403)
+        responses.add(
+            responses.PUT, f"{BASE}/b", json={"Location": f"{DATANODE}/b"},
+            status=200,
+        )
+        responses.add(responses.PUT, f"{DATANODE}/b", status=201)
+        result = client.create_many([("/a", b"x"), ("/b", b"y")])
+        assert isinstance(result["/a"], WebHDFSRemoteException)
+        assert result["/b"] is True
+
+    @responses.activate
+    @pytest.mark.parametrize("prefetch", [1, 2])
+    def test_lazy_input(self, client, prefetch):
+        consumed = []
+        ahead = []
+
+        def files():
+            for i in range(5):
+                consumed.append(i)
+                yield f"/f{i}", b"x"
+
+        def upload(request):
+            # Files whose location was requested beyond the one uploaded
+            ahead.append(len(consumed) - 1 - int(request.url[-1]))
+            return 201, {}, ""
+
+        for i in range(5):
+            responses.add(
+                responses.PUT, f"{BASE}/f{i}",
+                json={"Location": f"{DATANODE}/f{i}"}, status=200,
+            )
+            responses.add_callback(responses.PUT, f"{DATANODE}/f{i}",
+                                   callback=upload)
+        assert len(client.create_many(files(), prefetch=prefetch)) == 5
+        assert consumed == list(range(5))
+        assert max(ahead) == prefetch
+
+
 # ------------------------------------------------------------------
 # Append (two-step redirect)
 # ------------------------------------------------------------------
@@ -319,6 +1465,22 @@ class TestAppend:
             client.append("/file.txt", "data")
 
 
+# ------------------------------------------------------------------
+# Concat
+# ------------------------------------------------------------------
+
+class TestConcat:
+    @responses.activate
+    def test_success(self, client):
+        responses.add(
+            responses.POST, f"{BASE}/target", body="", status=200,
+            match=[matchers.query_param_matcher(
+                {"op": "CONCAT", "sources": "/a,/b", "user.name": "testuser"}
+            )],
+        )
+        assert client.concat("/target", ["/a", "/b"]) is True
+
+
 # ------------------------------------------------------------------
 # SetOwner
 # ------------------------------------------------------------------
@@ -410,6 +1572,226 @@ class TestGetChecksum:
             client.get_checksum("/file.txt")
 
 
+class TestLocalChecksum:
+    DATA = bytes(range(256)) * 5
+
+    @staticmethod
+    def expected(data, block_size, bytes_per_crc, crc_per_block, crc):
+        md5s = b""
+        for start in range(0, len(data), block_size):
+            block = data[start:start + block_size]
+            crcs = b"".join(
+                struct.pack(">I", crc(block[i:i + bytes_per_crc]))
+                for i in range(0, len(block), bytes_per_crc)
+            )
+            md5s += hashlib.md5(crcs).digest()
+        # HDFS hashes its whole DataOutputBuffer: 32 bytes, doubling
+        capacity = 32
+        while capacity < len(md5s):
+            capacity *= 2
+        return (struct.pack(">iq", bytes_per_crc, crc_per_block)
+                + hashlib.md5(md5s.ljust(capacity, b"\0")).digest()).hex()
+
+    def test_crc32c_python(self):
+        assert checksum._crc32c_python(b"123456789") == 0xE3069283
+
+    def test_crc32c_python_matches_accelerated(self):
+        crc32c = pytest.importorskip("crc32c")
+        assert checksum._crc32c_python(self.DATA) == crc32c.crc32c(self.DATA)
+
+    @pytest.mark.parametrize("crc_type", ["CRC32", "CRC32C"])
+    def test_multi_block(self, tmp_path, crc_type):
+        local = tmp_path / "data.bin"
+        local.write_bytes(self.DATA)
+        algorithm = f"MD5-of-4MD5-of-100{crc_type}"
+        crc = zlib.crc32 if crc_type == "CRC32" else checksum._crc32c_python
+        result = checksum.file_checksum(str(local), algorithm)
+        assert result == {
+            "algorithm": algorithm,
+            "bytes": self.expected(self.DATA, 400, 100, 4, crc),
+            "length": 28,
+        }
+
+    def test_single_block(self, tmp_path):
+        local = tmp_path / "data.bin"
+        local.write_bytes(self.DATA)
+        result = checksum.file_checksum(str(local), "MD5-of-0MD5-of-512CRC32C")
+        expected = self.expected(self.DATA, len(self.DATA), 512, 0,
+                                 checksum._crc32c_python)
+        assert result["bytes"] == expected
+
+    @pytest.mark.parametrize("algorithm", [
+        "MD5-of-0MD5-of-512CRC32C", "MD5-of-4MD5-of-100CRC32",
+    ])
+    def test_data_checksum_matches_file(self, tmp_path, algorithm):
+        local = tmp_path / "data.bin"
+        local.write_bytes(self.DATA)
+        assert checksum.data_checksum(self.DATA, algorithm) == (
+            checksum.file_checksum(str(local), algorithm)
+        )
+
+    def test_parallel_matches_serial(self, tmp_path):
+        local = tmp_path / "data.bin"
+        local.write_bytes(self.DATA)
+        algorithm = "MD5-of-2MD5-of-64CRC32C"
+        serial = checksum.file_checksum(str(local), algorithm)
+        parallel = checksum.file_checksum(str(local), algorithm, workers=2)
+        assert serial == parallel
+
+    def test_empty_file(self, tmp_path):
+        local = tmp_path / "empty"
+        local.write_bytes(b"")
+        result = checksum.file_checksum(str(local), "MD5-of-0MD5-of-0CRC32")
+        # Reported by a Hadoop cluster for an empty file
+        assert result["bytes"] == (
+            "00000000000000000000000070bc8f4b72a86921468bf8e8441dce51"
+        )
+        assert checksum.data_checksum(b"", "MD5-of-0MD5-of-512CRC32C") == result | {
+            "algorithm": "MD5-of-0MD5-of-512CRC32C"
+        }
+
+    @pytest.mark.parametrize("blocks,capacity", [(1, 32), (2, 32), (3, 64), (5, 128)])
+    def test_md5_buffer_padding(self, blocks, capacity):
+        data = self.DATA[:blocks * 100]
+        crcs = [
+            struct.pack(">I", zlib.crc32(data[i:i + 100]))
+            for i in range(0, len(data), 100)
+        ]
+        md5s = b"".join(hashlib.md5(crc).digest() for crc in crcs)
+        result = checksum.data_checksum(data, "MD5-of-1MD5-of-100CRC32")
+        assert result["bytes"].endswith(
+            hashlib.md5(md5s + bytes(capacity - len(md5s))).hexdigest()
+        )
+
+    def test_unsupported_algorithm(self, tmp_path):
+        local = tmp_path / "data.bin"
+        local.write_bytes(b"x")
+        with pytest.raises(WebHDFSException, match="Unsupported"):
+            checksum.file_checksum(str(local), "COMPOSITE-CRC32C")
+
+    def add_remote(self, data, algorithm):
+        responses.add(
+            responses.GET, f"{BASE}/data.bin",
+            json={"FileStatus": {"type": "FILE", "length": len(data)}},
+            status=200,
+        )
+        responses.add(
+            responses.GET, f"{BASE}/data.bin", status=307,
+            headers={"Location": f"{DATANODE}/data.bin"},
+        )
+        responses.add(
+            responses.GET, f"{DATANODE}/data.bin", status=200,
+            json={"FileChecksum": {
+                "algorithm": algorithm,
+                "bytes": self.expected(data, 400, 100, 4, checksum._crc32c_python),
+                "length": 28,
+            }},
+        )
+
+    @responses.activate
+    def test_verify(self, client, tmp_path):
+        local = tmp_path / "data.bin"
+        local.write_bytes(self.DATA)
+        self.add_remote(self.DATA, "MD5-of-4MD5-of-100CRC32C")
+        assert client.verify(str(local), "/data.bin") is True
+
+    @responses.activate
+    def test_verify_mismatch(self, client, tmp_path):
+        local = tmp_path / "data.bin"
+        local.write_bytes(self.DATA[:-1] + b"x")
+        self.add_remote(self.DATA, "MD5-of-4MD5-of-100CRC32C")
+        assert client.verify(str(local), "/data.bin") is False
+
+    @responses.activate
+    def test_verify_length_mismatch_skips_checksum(self, client, tmp_path):
+        local = tmp_path / "data.bin"
+        local.write_bytes(b"short")
+        self.add_remote(self.DATA, "MD5-of-4MD5-of-100CRC32C")
+        assert client.verify(str(local), "/data.bin") is False
+        assert len(responses.calls) == 1
+
+
+# ------------------------------------------------------------------
+# Compression codecs
+# ------------------------------------------------------------------
+
+def available_codecs():
+    return [
+        name if codec.package is None
+        else pytest.param(name, marks=pytest.mark.skip(f"{codec.package} missing"))
+        for name, codec in compression.CODECS.items()
+    ]
+
+
+class TestCompression:
+    DATA = b"".join(b"line %d\n" % i for i in range(20000))
+
+    @pytest.mark.parametrize("name", available_codecs())
+    def test_round_trip(self, name):
+        codec = compression.CODECS[name]
+        compressed = b"".join(compression.compress_chunks(
+            codec, compression.iter_source(self.DATA, 1000)
+        ))
+        assert len(compressed) < len(self.DATA)
+        chunks = [compressed[i:i + 7] for i in range(0, len(compressed), 7)]
+        out = list(compression.decompress_chunks(codec, chunks, 4096))
+        assert b"".join(out) == self.DATA
+
+    @pytest.mark.parametrize("name", available_codecs())
+    def test_concatenated_streams(self, name):
+        codec = compression.CODECS[name]
+        streams = [
+            b"".join(compression.compress_chunks(codec, [part]))
+            for part in (b"first\n", b"", b"second\n")
+        ]
+        out = compression.decompress_chunks(codec, [b"".join(streams)])
+        assert b"".join(out) == b"first\nsecond\n"
+
+    def test_bounded_output(self):
+        codec = compression.CODECS["gzip"]
+        compressed = b"".join(compression.compress_chunks(codec, [bytes(10**6)]))
+        out = list(compression.decompress_chunks(codec, [compressed], 65536))
+        assert max(len(chunk) for chunk in out) <= 65536
+        assert sum(len(chunk) for chunk in out) == 10**6
+
+    def test_truncated_stream(self):
+        codec = compression.CODECS["gzip"]
+        compressed = b"".join(compression.compress_chunks(codec, [self.DATA]))
+        with pytest.raises(WebHDFSException, match="truncated"):
+            b"".join(compression.decompress_chunks(codec, [compressed[:-10]]))
+        assert b"".join(compression.decompress_chunks(codec, [])) == b""
+
+    @pytest.mark.parametrize("path,name", [
+        ("/a/b.gz", "gzip"),
+        ("/a/b.BZ2", "bz2"),
+        ("/a/b.txt", None),
+        ("/a/b", None),
+    ])
+    def test_auto(self, path, name):
+        codec = compression.get_codec(path, "auto")
+        assert (codec and codec.name) == name
+
+    def test_unknown_codec(self):
+        with pytest.raises(WebHDFSException, match="Unknown compression"):
+            compression.get_codec("/f", "snappy")
+
+    def test_missing_package(self, monkeypatch):
+        monkeypatch.setattr(compression.CODECS["zstd"], "package", "zstandard")
+        with pytest.raises(WebHDFSException, match=r"webhdfspy\[zstd\]"):
+            compression.get_codec("/f.zst", "auto")
+
+    def test_iter_source(self):
+        assert list(compression.iter_source("h\u00e9", 2)) == [b"h\xc3", b"\xa9"]
+        assert list(compression.iter_source(io.BytesIO(b"abcde"), 2)) == [
+            b"ab", b"cd", b"e"
+        ]
+        assert list(compression.iter_source(iter([b"x", b"y"]))) == [b"x", b"y"]
+
+    def test_range_with_compression(self, client):
+        with pytest.raises(WebHDFSException, match="offset and length"):
+            client.read_bytes("/f.gz", offset=3, compression="auto")
+
+
 # ------------------------------------------------------------------
 # SetReplication
 # ------------------------------------------------------------------
@@ -423,6 +1805,87 @@ class TestSetReplication:
         assert client.set_replication("/file.txt", 3) is True
 
 
+# ------------------------------------------------------------------
+# Batch operations
+# ------------------------------------------------------------------
+
+NOT_FOUND = not_found("File")
+
+
+class TestBatchOperations:
+    @responses.activate
+    def test_remove_many(self, client):
+        for i in range(20):
+            responses.add(
+                responses.DELETE, f"{BASE}/f{i}", json={"boolean": True},
+                match=[matchers.query_param_matcher(
+                    {"op": "DELETE", "recursive": "True",
+                     "user.name": "testuser"}
+                )],
+            )
+        paths = (f"/f{i}" for i in range(20))
+        result = client.remove_many(paths, recursive=True, workers=3)
+        assert result == {f"/f{i}": True for i in range(20)}
+
+    @responses.activate
+    def test_errors_reported_per_path(self, client):
+        responses.add(responses.PUT, f"{BASE}/ok", json={}, status=200)
+        responses.add(responses.PUT, f"{BASE}/missing", json=NOT_FOUND,
+                      status=404)
+        result = client.chmod_many(["/ok", "/missing"], "750")
+        assert result["/ok"] is True
+        assert isinstance(result["/missing"], WebHDFSRemoteException)
+
+    @responses.activate
+    def test_rename_many_keyed_by_source(self, client):
+        for name in ("a", "b"):
+            responses.add(
+                responses.PUT, f"{BASE}/{name}", json={"boolean": True},
+                match=[matchers.query_param_matcher(
+                    {"op": "RENAME", "destination": f"/archive/{name}",
+                     "user.name": "testuser"}
+                )],
+            )
+        result = client.rename_many([("/a", "/archive/a"),
+                                     ("/b", "/archive/b")])
+        assert result == {"/a": True, "/b": True}
+
+    @responses.activate
+    def test_exists_many(self, client):
+        responses.add(responses.GET, f"{BASE}/here",
+                      json={"FileStatus": {"type": "FILE"}})
+        responses.add(responses.GET, f"{BASE}/gone", json=NOT_FOUND,
+                      status=404)
+        responses.add(responses.GET, f"{BASE}/denied", status=403, json={
+            "RemoteException": {
+                "exception": "AccessControlException",
+                "javaClassName":
+                    "org.apache.hadoop.security.AccessControlException",
+                "message": "Permission denied",
+            }
+        })
+        result = client.exists_many(["/here", "/gone", "/denied"])
+        assert result["/here"] is True
+        assert result["/gone"] is False
+        assert isinstance(result["/denied"], WebHDFSRemoteException)
+
+    @responses.activate
+    def test_status_many(self, client):
+        for i in range(3):
+            responses.add(responses.GET, f"{BASE}/f{i}",
+                          json={"FileStatus": {"length": i}})
+        result = client.status_many([f"/f{i}" for i in range(3)])
+        assert {p: s["length"] for p, s in result.items()} == {
+            "/f0": 0, "/f1": 1, "/f2": 2,
+        }
+
+    def test_invalid_arguments(self, client):
+        with pytest.raises(WebHDFSException, match="workers"):
+            client.set_replication_many(["/f"], 3, workers=0)
+        with pytest.raises(WebHDFSException, match="owner or group"):
+            client.set_owner_many(["/f"])
+
+
 # ------------------------------------------------------------------
 # Delegation tokens
 # ------------------------------------------------------------------
@@ -470,6 +1933,15 @@ class TestErrorHandling:
         assert exc_info.value.exception == "AccessControlException"
         assert "Permission denied" in str(exc_info.value)
 
+    def test_remote_exception_pickles(self):
+        exc = pickle.loads(pickle.dumps(WebHDFSRemoteException(
+            "Permission denied", 403, "AccessControlException", "a.b.ACE"
+        )))
+        assert (str(exc), exc.status_code, exc.exception,
+                exc.java_class_name) == (
+            "Permission denied", 403, "AccessControlException", "a.b.ACE"
+        )
+
     @responses.activate
     def test_generic_error(self, client):
         responses.add(
@@ -485,6 +1957,523 @@ class TestErrorHandling:
                 c.listdir("/")
 
 
+RETRIABLE = {
+    "RemoteException": {
+        "exception": "RetriableException",
+        "javaClassName": "org.apache.hadoop.ipc.RetriableException",
+        "message": "NameNode still not started",
+    }
+}
+
+
+class TruncatingHandler(BaseHTTPRequestHandler):
+    """Serve OPEN requests, dropping the connection midway the first time."""
+
+    protocol_version = "HTTP/1.1"
+    data = b"0123456789" * 10
+    requests_seen = []
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        self.requests_seen.append(query)
+        offset = int(query.get("offset", ["0"])[0])
+        body = self.data[offset:]
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if len(self.requests_seen) == 1:
+            self.wfile.write(body[:30])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestRetry:
+    @pytest.fixture()
+    def sleeps(self, monkeypatch):
+        delays = []
+        monkeypatch.setattr(time, "sleep", delays.append)
+        return delays
+
+    @pytest.fixture()
+    def retry_client(self):
+        policy = RetryPolicy(max_attempts=3, backoff=1.0, jitter=False)
+        with WebHDFSClient("localhost", 50070, retry=policy) as c:
+            yield c
+
+    @responses.activate
+    def test_retriable_exception_retried(self, retry_client, sleeps):
+        responses.add(responses.GET, f"{BASE}/f", json=RETRIABLE, status=403)
+        responses.add(
+            responses.GET, f"{BASE}/f",
+            json={"FileStatus": {"type": "FILE", "length": 1}}, status=200,
+        )
+        assert retry_client.status("/f")["length"] == 1
+        assert len(responses.calls) == 2
+        assert sleeps == [1.0]
+
+    @responses.activate
+    def test_backoff_and_max_attempts(self, retry_client, sleeps):
+        responses.add(responses.GET, f"{BASE}/f", json=RETRIABLE, status=403)
+        with pytest.raises(WebHDFSRemoteException):
+            retry_client.status("/f")
+        assert len(responses.calls) == 3
+        assert sleeps == [1.0, 2.0]
+
+    @responses.activate
+    def test_permanent_error_not_retried(self, retry_client, sleeps):
+        payload = not_found("/f")
+        responses.add(responses.GET, f"{BASE}/f", json=payload, status=404)
+        with pytest.raises(WebHDFSRemoteException):
+            retry_client.status("/f")
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_non_idempotent_not_retried(self, retry_client, sleeps):
+        responses.add(responses.PUT, f"{BASE}/src", json=RETRIABLE, status=403)
+        with pytest.raises(WebHDFSRemoteException):
+            retry_client.rename("/src", "/dst")
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_retry_all_ops(self, sleeps):
+        policy = RetryPolicy(retry_all_ops=True, jitter=False)
+        responses.add(responses.PUT, f"{BASE}/src", json=RETRIABLE, status=403)
+        responses.add(responses.PUT, f"{BASE}/src", json={"boolean": True})
+        with WebHDFSClient("localhost", 50070, retry=policy) as c:
+            assert c.rename("/src", "/dst") is True
+
+    @responses.activate
+    def test_connection_error_retried(self, retry_client, sleeps):
+        responses.add(
+            responses.GET, f"{BASE}/f", body=requests.ConnectionError("reset"),
+        )
+        responses.add(
+            responses.GET, f"{BASE}/f",
+            json={"FileStatus": {"type": "FILE", "length": 1}}, status=200,
+        )
+        assert retry_client.status("/f")["length"] == 1
+
+    @responses.activate
+    def test_create_namenode_step_retried(self, retry_client, sleeps):
+        responses.add(responses.PUT, f"{BASE}/f", json=RETRIABLE, status=403)
+        responses.add(
+            responses.PUT, f"{BASE}/f", status=307,
+            headers={"Location": f"{DATANODE}/f"},
+        )
+        responses.add(responses.PUT, f"{DATANODE}/f", status=201)
+        assert retry_client.create("/f", b"data") is True
+
+    def test_jitter_bounds(self):
+        policy = RetryPolicy(backoff=1.0, max_backoff=4.0)
+        for attempt in range(1, 6):
+            assert 0 <= policy.delay(attempt) <= min(2 ** (attempt - 1), 4.0)
+
+    def test_streaming_read_resumes(self, sleeps):
+        TruncatingHandler.requests_seen = []
+        server = ThreadingHTTPServer(("127.0.0.1", 0), TruncatingHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            port = server.server_address[1]
+            with WebHDFSClient("127.0.0.1", port, retry=RetryPolicy()) as c:
+                data = b"".join(c.iter_bytes("/f", chunk_size=10))
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert data == TruncatingHandler.data
+        assert TruncatingHandler.requests_seen[1]["offset"] == ["30"]
+
+    def test_streaming_read_without_retry_raises(self):
+        TruncatingHandler.requests_seen = []
+        server = ThreadingHTTPServer(("127.0.0.1", 0), TruncatingHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            port = server.server_address[1]
+            with WebHDFSClient("127.0.0.1", port) as c:
+                with pytest.raises(WebHDFSConnectionError):
+                    b"".join(c.iter_bytes("/f", chunk_size=10))
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+STANDBY = {
+    "RemoteException": {
+        "exception": "StandbyException",
+        "javaClassName": "org.apache.hadoop.ipc.StandbyException",
+        "message": "Operation category READ is not supported in state standby",
+    }
+}
+NN2 = "http://nn2:9870/webhdfs/v1"
+
+
+class TestFailover:
+    @pytest.fixture()
+    def ha_client(self):
+        with WebHDFSClient(["nn1", "nn2:9870"], 50070) as c:
+            yield c
+
+    def test_addresses(self, ha_client):
+        assert ha_client.namenodes == [("nn1", 50070), ("nn2", 9870)]
+        assert ha_client.namenode_url == "http://nn1:50070/webhdfs/v1"
+
+    def test_no_address_raises(self):
+        with pytest.raises(WebHDFSException, match="At least one namenode"):
+            WebHDFSClient([], 50070)
+
+    @responses.activate
+    def test_standby_fails_over_and_sticks(self, ha_client):
+        responses.add(
+            responses.GET, "http://nn1:50070/webhdfs/v1/f", json=STANDBY,
+            status=403,
+        )
+        responses.add(
+            responses.GET, f"{NN2}/f",
+            json={"FileStatus": {"type": "FILE", "length": 1}}, status=200,
+        )
+        assert ha_client.status("/f")["length"] == 1
+        assert ha_client.status("/f")["length"] == 1
+        # The standby is not probed again once nn2 is known to be active
+        assert len(responses.calls) == 3
+        assert ha_client.namenode_url == NN2
+
+    @responses.activate
+    def test_connection_failure_fails_over(self, ha_client):
+        responses.add(
+            responses.GET, "http://nn1:50070/webhdfs/v1/",
+            body=requests.ConnectionError("refused"),
+        )
+        responses.add(
+            responses.GET, f"{NN2}/",
+            json={"FileStatuses": {"FileStatus": []}}, status=200,
+        )
+        assert ha_client.listdir("/") == []
+
+    @responses.activate
+    def test_non_idempotent_standby_fails_over(self, ha_client):
+        responses.add(
+            responses.PUT, "http://nn1:50070/webhdfs/v1/src", json=STANDBY,
+            status=403,
+        )
+        responses.add(responses.PUT, f"{NN2}/src", json={"boolean": True})
+        assert ha_client.rename("/src", "/dst") is True
+
+    @responses.activate
+    def test_non_idempotent_connection_reset_not_failed_over(self, ha_client):
+        responses.add(
+            responses.PUT, "http://nn1:50070/webhdfs/v1/src",
+            body=requests.ConnectionError("connection reset"),
+        )
+        with pytest.raises(WebHDFSConnectionError):
+            ha_client.rename("/src", "/dst")
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_all_standby_raises(self, ha_client):
+        responses.add(
+            responses.GET, "http://nn1:50070/webhdfs/v1/f", json=STANDBY,
+            status=403,
+        )
+        responses.add(responses.GET, f"{NN2}/f", json=STANDBY, status=403)
+        with pytest.raises(WebHDFSRemoteException) as exc_info:
+            ha_client.status("/f")
+        assert exc_info.value.exception == "StandbyException"
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    def test_redirect_ops_fail_over(self, ha_client):
+        responses.add(
+            responses.PUT, "http://nn1:50070/webhdfs/v1/f", json=STANDBY,
+            status=403,
+        )
+        responses.add(
+            responses.PUT, f"{NN2}/f", status=307,
+            headers={"Location": f"{DATANODE}/f"},
+        )
+        responses.add(responses.PUT, f"{DATANODE}/f", status=201)
+        assert ha_client.create("/f", b"data") is True
+
+    @responses.activate
+    def test_datanode_failure_not_failed_over(self, ha_client):
+        def refuse(request):
+            # Like the HTTP adapter, name the request that failed
+            raise requests.ConnectionError("refused", request=request)
+
+        responses.add(
+            responses.GET, "http://nn1:50070/webhdfs/v1/f", status=307,
+            headers={"Location": f"{DATANODE}/f"},
+        )
+        responses.add_callback(responses.GET, f"{DATANODE}/f", callback=refuse)
+        with pytest.raises(WebHDFSConnectionError,
+                           match="Failed to connect to DataNode for open"):
+            ha_client.read_bytes("/f")
+        assert ha_client.namenode_url == "http://nn1:50070/webhdfs/v1"
+        assert not any(call.request.url.startswith(NN2)
+                       for call in responses.calls)
+
+
+# ------------------------------------------------------------------
+# Metrics
+# ------------------------------------------------------------------
+
+class TestMetrics:
+    @responses.activate
+    def test_namenode_request(self, client):
+        payload = {"FileStatuses": {"FileStatus": []}}
+        responses.add(responses.GET, f"{BASE}/", json=payload)
+        client.listdir("/")
+        op = client.metrics.snapshot()["LISTSTATUS"]
+        assert op["latency"]["namenode"]["count"] == 1
+        assert op["latency"]["datanode"]["count"] == 0
+        assert op["bytes_received"] == len(json.dumps(payload))
+        buckets = op["latency"]["namenode"]["buckets"]
+        assert buckets[-1] == (float("inf"), 1)
+
+    @responses.activate
+    def test_create_phases_and_bytes(self, client):
+        responses.add(responses.PUT, f"{BASE}/f", status=307,
+                      headers={"Location": f"{DATANODE}/f"})
+        responses.add(responses.PUT, f"{DATANODE}/f", status=201)
+        client.create("/f", b"x" * 100)
+        op = client.metrics.snapshot()["CREATE"]
+        assert op["latency"]["namenode"]["count"] == 1
+        assert op["latency"]["datanode"]["count"] == 1
+        assert op["bytes_sent"] == 100
+
+    @responses.activate
+    def test_redirected_open(self, client):
+        responses.add(responses.GET, f"{BASE}/f", status=307,
+                      headers={"Location": f"{DATANODE}/f"})
+        responses.add(responses.GET, f"{DATANODE}/f", body=b"0123456789")
+        assert client.read_bytes("/f") == b"0123456789"
+        assert b"".join(client.iter_bytes("/f", chunk_size=4)) == b"0123456789"
+        op = client.metrics.snapshot()["OPEN"]
+        assert op["latency"]["namenode"]["count"] == 2
+        assert op["latency"]["datanode"]["count"] == 2
+        assert op["bytes_received"] == 20
+
+    @responses.activate
+    def test_retries_and_errors(self, monkeypatch):
+        monkeypatch.setattr(time, "sleep", lambda delay: None)
+        responses.add(responses.GET, f"{BASE}/f", json=RETRIABLE, status=403)
+        responses.add(responses.GET, f"{BASE}/f",
+                      json={"FileStatus": {"type": "FILE"}})
+        with WebHDFSClient("localhost", 50070,
+                           retry=RetryPolicy(jitter=False)) as c:
+            c.status("/f")
+            op = c.metrics.snapshot()["GETFILESTATUS"]
+        assert op["retries"] == 1
+        assert op["errors"] == {"org.apache.hadoop.ipc.RetriableException": 1}
+
+    @responses.activate
+    def test_datanode_error(self, client):
+        responses.add(responses.POST, f"{BASE}/f", status=307,
+                      headers={"Location": f"{DATANODE}/f"})
+        responses.add(responses.POST, f"{DATANODE}/f", status=500)
+        with pytest.raises(WebHDFSException):
+            client.append("/f", b"data")
+        assert client.metrics.snapshot()["APPEND"]["errors"] == {
+            "WebHDFSException": 1
+        }
+
+    @responses.activate
+    def test_hooks(self, client):
+        events = []
+
+        def broken(event):
+            raise RuntimeError("ignored")
+
+        client.metrics.add_hook(events.append)
+        client.metrics.add_hook(broken)
+        responses.add(responses.GET, f"{BASE}/f",
+                      json={"FileStatus": {"type": "FILE"}})
+        client.status("/f")
+        assert [(e["event"], e["op"], e["phase"]) for e in events] == [
+            ("request", "GETFILESTATUS", "namenode")
+        ]
+        client.metrics.remove_hook(events.append)
+        client.status("/f")
+        assert len(events) == 1
+
+    def test_shared_and_reset(self):
+        metrics = Metrics()
+        with WebHDFSClient("a", 1, metrics=metrics) as a, \
+                WebHDFSClient("b", 1, metrics=metrics) as b:
+            assert a.metrics is b.metrics is metrics
+        metrics.observe("OPEN", "namenode", 0.01)
+        metrics.reset()
+        assert metrics.snapshot() == {}
+
+    def test_prometheus(self):
+        metrics = Metrics(buckets=(0.1, 1.0))
+        metrics.observe("OPEN", "namenode", 0.05)
+        metrics.observe("OPEN", "datanode", 0.5, received=42)
+        metrics.count_error("OPEN", WebHDFSRemoteException(
+            "x", 403, java_class_name="org.apache.hadoop.ipc.StandbyException"
+        ))
+        text = metrics.to_prometheus()
+        assert "# TYPE webhdfs_request_seconds histogram" in text
+        assert 'webhdfs_request_seconds_bucket{op="OPEN",phase="namenode",le="0.1"} 1' in text
+        assert 'webhdfs_request_seconds_bucket{op="OPEN",phase="datanode",le="0.1"} 0' in text
+        assert 'webhdfs_request_seconds_bucket{op="OPEN",phase="datanode",le="+Inf"} 1' in text
+        assert 'webhdfs_request_seconds_count{op="OPEN",phase="datanode"} 1' in text
+        assert 'webhdfs_bytes_received_total{op="OPEN"} 42' in text
+        assert ('webhdfs_errors_total{op="OPEN",'
+                'exception="org.apache.hadoop.ipc.StandbyException"} 1') in text
+
+
+# ------------------------------------------------------------------
+# Trace record and replay
+# ------------------------------------------------------------------
+
+class TestTrace:
+    def record(self, trace_path, anonymize=True):
+        responses.add(responses.GET, f"{BASE}/logs/2024/a.log",
+                      json={"FileStatus": {"type": "FILE", "length": 3}})
+        responses.add(responses.PUT, f"{BASE}/logs/2024/b.log", status=307,
+                      headers={"Location": f"{DATANODE}/b"})
+        responses.add(responses.PUT, f"{DATANODE}/b", status=201)
+        responses.add(responses.PUT, f"{BASE}/logs/2024/a.log",
+                      json={"boolean": True})
+        with TraceRecorder(str(trace_path), anonymize=anonymize) as recorder:
+            with WebHDFSClient("localhost", 50070, username="secret",
+                               recorder=recorder) as c:
+                c.status("/logs/2024/a.log")
+                c.create("/logs/2024/b.log", b"hello")
+                c.rename("/logs/2024/a.log", "/logs/2024/c.log")
+        return list(trace.read_trace(str(trace_path)))
+
+    @responses.activate
+    def test_record(self, tmp_path):
+        entries = self.record(tmp_path / "job.trace")
+        assert [(e["op"], e["phase"]) for e in entries] == [
+            ("GETFILESTATUS", "namenode"),
+            ("CREATE", "namenode"),
+            ("CREATE", "datanode"),
+            ("RENAME", "namenode"),
+        ]
+        status, create_nn, create_dn, rename = entries
+        assert status["path"] == "/n0/n1/n2.log"
+        assert status["status"] == 200
+        assert status["received"] > 0
+        assert create_nn["status"] == 307
+        assert create_nn["path"] == create_dn["path"] == "/n0/n1/n3.log"
+        assert create_dn["sent"] == 5
+        assert rename["params"] == {"destination": "/n0/n1/n4.log"}
+        assert all(e["t"] >= 0 and e["seconds"] >= 0 for e in entries)
+        assert b"secret" not in (tmp_path / "job.trace").read_bytes()
+
+    @responses.activate
+    def test_record_anonymizes_params(self, tmp_path):
+        responses.add(responses.GET, f"{BASE}/secret/dir", json={
+            "DirectoryListing": {"partialListing": {"FileStatus": []},
+                                 "remainingEntries": 0}
+        })
+        responses.add(responses.POST, f"{BASE}/secret/all.log",
+                      json={"boolean": True})
+        responses.add(responses.PUT, f"{BASE}/secret/all.log",
+                      json={"boolean": True})
+        responses.add(responses.GET, f"{BASE}/secret/all.log",
+                      body=b"0123456789")
+        trace_path = tmp_path / "job.trace"
+        with TraceRecorder(str(trace_path)) as recorder:
+            with WebHDFSClient("localhost", 50070, recorder=recorder) as c:
+                c._query("get", "/secret/dir", {
+                    "op": "LISTSTATUS_BATCH", "startAfter": "hidden-2026,"
+                }, json_path=[])
+                c.concat("/secret/all.log", ["/secret/a.log", "/secret/b.log"])
+                c.set_owner("/secret/all.log", owner="alice", group="staff")
+                assert b"".join(c.iter_bytes("/secret/all.log", chunk_size=3)) == (
+                    b"0123456789"
+                )
+        raw = trace_path.read_text()
+        for secret in ("secret", "hidden", "alice", "staff"):
+            assert secret not in raw
+        listing, concat, owner, read = trace.read_trace(str(trace_path))
+        assert listing["params"] == {"startAfter": "n0"}
+        assert concat["params"] == {"sources": "/n1/n3.log,/n1/n4.log"}
+        assert owner["params"] == {"owner": "u0", "group": "u1"}
+        assert read["op"] == "OPEN"
+        assert read["received"] == 10
+
+    @responses.activate
+    def test_record_compressed_without_anonymizing(self, tmp_path):
+        entries = self.record(tmp_path / "job.trace.gz", anonymize=False)
+        assert entries[0]["path"] == "/logs/2024/a.log"
+        assert (tmp_path / "job.trace.gz").read_bytes()[:2] == b"\x1f\x8b"
+
+    @responses.activate
+    def test_replay(self, tmp_path):
+        trace_path = tmp_path / "job.trace"
+        self.record(trace_path)
+        responses.reset()
+        calls = []
+
+        def callback(request):
+            calls.append(request)
+            query = parse_qs(urlparse(request.url).query)
+            if request.url.startswith(DATANODE):
+                return 201, {}, ""
+            if query["op"] == ["CREATE"]:
+                return 307, {"Location": f"{DATANODE}/x"}, ""
+            if query["op"] == ["RENAME"]:
+                return 403, {}, json.dumps({"RemoteException": {
+                    "exception": "AccessControlException",
+                    "javaClassName":
+                        "org.apache.hadoop.security.AccessControlException",
+                    "message": "Permission denied",
+                }})
+            return 200, {}, json.dumps({"FileStatus": {}})
+
+        for method in (responses.GET, responses.PUT):
+            responses.add_callback(method, re.compile(".*"), callback=callback)
+        with WebHDFSClient("localhost", 50070) as c:
+            result = trace.replay(str(trace_path), c, speed=None,
+                                  root="/replay", workers=1)
+        assert result["requests"] == 3
+        assert result["errors"] == 1
+        paths = [urlparse(r.url).path for r in calls]
+        assert paths == [
+            "/webhdfs/v1/replay/n0/n1/n2.log",
+            "/webhdfs/v1/replay/n0/n1/n3.log",
+            "/webhdfs/v1/x",
+            "/webhdfs/v1/replay/n0/n1/n2.log",
+        ]
+        assert calls[2].body == bytes(5)
+        assert parse_qs(urlparse(calls[3].url).query)["destination"] == [
+            "/replay/n0/n1/n4.log"
+        ]
+
+    @responses.activate
+    def test_replay_rebases_sources(self, tmp_path):
+        trace_path = tmp_path / "job.trace"
+        trace_path.write_text(
+            '{"version":1}\n'
+            '{"t":0,"op":"CONCAT","phase":"namenode","method":"post",'
+            '"path":"/n0/n1","status":200,"seconds":0,'
+            '"params":{"sources":"/n0/n2,/n0/n3"}}\n'
+        )
+        responses.add(responses.POST, f"{BASE}/replay/n0/n1",
+                      json={"boolean": True})
+        with WebHDFSClient("localhost", 50070) as c:
+            result = trace.replay(str(trace_path), c, speed=None,
+                                  root="/replay")
+        assert result["errors"] == 0
+        query = parse_qs(urlparse(responses.calls[0].request.url).query)
+        assert query["sources"] == ["/replay/n0/n2,/replay/n0/n3"]
+
+    def test_invalid_trace(self, tmp_path):
+        (tmp_path / "bad").write_text("{}\n")
+        with pytest.raises(WebHDFSException, match="not a supported trace"):
+            list(trace.read_trace(str(tmp_path / "bad")))
+
+
 # ------------------------------------------------------------------
 # EnvironHome
 # ------------------------------------------------------------------
@@ -1,13 +1,25 @@
+from .aio import AsyncWebHDFSClient
+from .index import NamespaceIndex
+from .metrics import Metrics
+from .trace import TraceRecorder
 from .webhdfspy import (
+    RetryPolicy,
     WebHDFSClient,
     WebHDFSConnectionError,
     WebHDFSException,
+    WebHDFSFile,
     WebHDFSRemoteException,
 )
 
 __all__ = [
+    "AsyncWebHDFSClient",
+    "Metrics",
+    "NamespaceIndex",
+    "RetryPolicy",
+    "TraceRecorder",
     "WebHDFSClient",
     "WebHDFSConnectionError",
     "WebHDFSException",
+    "WebHDFSFile",
     "WebHDFSRemoteException",
 ]
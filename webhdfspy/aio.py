@@ -0,0 +1,546 @@
+"""Asyncio client for the Hadoop WebHDFS REST API.
+
+Requires the optional ``httpx`` dependency (``pip install webhdfspy[async]``).
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from collections.abc import AsyncIterator, Sequence
+from typing import Any
+
+from .webhdfspy import (
+    CHUNK_SIZE,
+    CONTEXT_ROOT,
+    READ_AHEAD_SIZE,
+    WebHDFSClient,
+    WebHDFSConnectionError,
+    WebHDFSException,
+)
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - exercised only without httpx
+    httpx = None
+
+
+class AsyncWebHDFSClient:
+    """Asyncio client for Hadoop WebHDFS REST API.
+
+    Mirrors the :class:`~webhdfspy.WebHDFSClient` API with coroutine
+    methods and supports the async context manager protocol::
+
+        async with AsyncWebHDFSClient("host", 50070, username="user") as client:
+            await client.listdir("/")
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str | None = None,
+        logger: logging.Logger | None = None,
+        *,
+        timeout: float = 60.0,
+        scheme: str = "http",
+        max_connections: int = 100,
+    ) -> None:
+        """Create a new asyncio WebHDFS client.
+
+        :param host: hostname of the HDFS namenode
+        :param port: port of the namenode
+        :param username: used for authentication
+        :param logger: optional logger instance
+        :param timeout: request timeout in seconds
+        :param scheme: URL scheme, ``"http"`` or ``"https"``
+        :param max_connections: maximum number of concurrent connections
+        """
+        if httpx is None:
+            raise ImportError(
+                "AsyncWebHDFSClient requires httpx, "
+                "install it with: pip install webhdfspy[async]"
+            )
+        self.host = host
+        self.port = port
+        self.username = username
+        self.timeout = timeout
+        self.namenode_url = f"{scheme}://{host}:{port}{CONTEXT_ROOT}"
+        self.logger = logger or logging.getLogger(__name__)
+        self._client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections),
+        )
+
+    async def close(self) -> None:
+        """Close the underlying HTTP client."""
+        await self._client.aclose()
+
+    async def __aenter__(self) -> AsyncWebHDFSClient:
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.close()
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _params(self, params: dict[str, Any]) -> dict[str, Any]:
+        """Add the user name and encode booleans the way requests does."""
+        if self.username is not None:
+            params["user.name"] = self.username
+        return {
+            key: str(value) if isinstance(value, bool) else value
+            for key, value in params.items()
+        }
+
+    async def _make_request(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any],
+        allow_redirects: bool = False,
+    ) -> httpx.Response:
+        """Make an HTTP request to the namenode."""
+        try:
+            return await self._client.request(
+                method,
+                f"{self.namenode_url}{path}",
+                params=self._params(params),
+                follow_redirects=allow_redirects,
+            )
+        except httpx.TransportError as exc:
+            raise WebHDFSConnectionError(
+                f"Failed to connect to {self.host}:{self.port}", cause=exc
+            ) from exc
+
+    async def _datanode_request(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any],
+        op: str,
+        data: Any = None,
+        headers: dict[str, str] | None = None,
+    ) -> httpx.Response:
+        """Run the NameNode redirect + DataNode request flow of ``op``."""
+        r = await self._make_request(method, path, params)
+        WebHDFSClient._check_response(r, {307})
+        location = r.headers.get("location")
+        if not location:
+            raise WebHDFSException(f"NameNode did not return a redirect for {op}")
+        try:
+            return await self._client.request(
+                method, location, content=data, headers=headers,
+            )
+        except httpx.TransportError as exc:
+            raise WebHDFSConnectionError(
+                f"Failed to connect to DataNode for {op.lower()}", cause=exc
+            ) from exc
+
+    async def _query(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any],
+        json_path: list[str] | None = None,
+        allow_redirects: bool = False,
+        expected_status: set[int] | None = None,
+    ) -> Any:
+        """Make a request and extract a value from the JSON response."""
+        if json_path is None:
+            json_path = ["boolean"]
+        r = await self._make_request(method, path, params, allow_redirects)
+        WebHDFSClient._check_response(r, expected_status)
+        if json_path:
+            response = r.json()
+            for key in json_path:
+                response = response[key]
+            return response
+        return True
+
+    @staticmethod
+    def _open_params(offset: int | None, length: int | None,
+                     buffersize: int | None) -> dict[str, Any]:
+        params: dict[str, Any] = {"op": "OPEN"}
+        if offset is not None:
+            params["offset"] = offset
+        if length is not None:
+            params["length"] = length
+        if buffersize is not None:
+            params["buffersize"] = buffersize
+        return params
+
+    # ------------------------------------------------------------------
+    # Directory operations
+    # ------------------------------------------------------------------
+
+    async def listdir(self, path: str = "/") -> list[dict[str, Any]]:
+        """List all the contents of a directory.
+
+        :param path: path of the directory
+        :returns: a list of FileStatus dicts
+        """
+        self.logger.info("Listing %s", path)
+        params = {"op": "LISTSTATUS"}
+        return await self._query(
+            method="get",
+            path=path,
+            params=params,
+            json_path=["FileStatuses", "FileStatus"],
+        )
+
+    async def mkdir(self, path: str, permission: str | None = None) -> bool:
+        """Create a directory hierarchy, like ``mkdir -p``.
+
+        :param path: the path of the directory
+        :param permission: dir permissions in octal (e.g. ``"755"``)
+        """
+        self.logger.info("Creating directory %s", path)
+        params: dict[str, Any] = {"op": "MKDIRS"}
+        if permission is not None:
+            params["permission"] = permission
+        return await self._query(method="put", path=path, params=params)
+
+    async def remove(self, path: str, recursive: bool = False) -> bool:
+        """Delete a file or directory.
+
+        :param path: path of the file or dir to delete
+        :param recursive: delete content in subdirectories
+        """
+        self.logger.info("Deleting %s", path)
+        params: dict[str, Any] = {"op": "DELETE", "recursive": recursive}
+        return await self._query(method="delete", path=path, params=params)
+
+    async def rename(self, src: str, dst: str) -> bool:
+        """Rename a file or directory.
+
+        :param src: path of the file or dir to rename
+        :param dst: destination path
+        """
+        self.logger.info("Renaming %s", src)
+        params: dict[str, Any] = {"op": "RENAME", "destination": dst}
+        return await self._query(method="put", path=src, params=params)
+
+    # ------------------------------------------------------------------
+    # File read operations
+    # ------------------------------------------------------------------
+
+    async def environ_home(self) -> str:
+        """Return the home directory of the user."""
+        self.logger.info("Getting environment home")
+        params: dict[str, Any] = {"op": "GETHOMEDIRECTORY"}
+        return await self._query(
+            method="get", path="/", params=params, json_path=["Path"]
+        )
+
+    async def open(self, path: str, offset: int | None = None,
+                   length: int | None = None,
+                   buffersize: int | None = None) -> str:
+        """Open a file to read.
+
+        :param path: path of the file
+        :param offset: starting byte position
+        :param length: number of bytes to read
+        :param buffersize: size of the buffer used to transfer the data
+        :returns: the file data as text
+        """
+        self.logger.info("Opening %s", path)
+        params = self._open_params(offset, length, buffersize)
+        r = await self._make_request("get", path, params, allow_redirects=True)
+        WebHDFSClient._check_response(r)
+        return r.text
+
+    async def read_bytes(self, path: str, offset: int | None = None,
+                         length: int | None = None,
+                         buffersize: int | None = None) -> bytes:
+        """Read a file as raw bytes, without decoding it.
+
+        :param path: path of the file
+        :param offset: starting byte position
+        :param length: number of bytes to read
+        :param buffersize: size of the buffer used to transfer the data
+        :returns: the file data as bytes
+        """
+        self.logger.info("Reading bytes of %s", path)
+        params = self._open_params(offset, length, buffersize)
+        r = await self._make_request("get", path, params, allow_redirects=True)
+        WebHDFSClient._check_response(r)
+        return r.content
+
+    async def iter_bytes(self, path: str, offset: int | None = None,
+                         length: int | None = None,
+                         buffersize: int | None = None,
+                         chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+        """Stream a file, yielding chunks as they arrive from the DataNode.
+
+        :param path: path of the file
+        :param offset: starting byte position
+        :param length: number of bytes to read
+        :param buffersize: size of the buffer used to transfer the data
+        :param chunk_size: maximum size in bytes of each yielded chunk
+        :returns: an async iterator of ``bytes`` chunks
+        """
+        self.logger.info("Streaming %s", path)
+        params = self._params(self._open_params(offset, length, buffersize))
+        try:
+            async with self._client.stream(
+                "GET",
+                f"{self.namenode_url}{path}",
+                params=params,
+                follow_redirects=True,
+            ) as r:
+                if r.status_code != 200:
+                    await r.aread()
+                    WebHDFSClient._check_response(r)
+                async for chunk in r.aiter_bytes(chunk_size):
+                    yield chunk
+        except httpx.TransportError as exc:
+            raise WebHDFSConnectionError(
+                f"Failed to connect to {self.host}:{self.port}", cause=exc
+            ) from exc
+
+    async def status(self, path: str) -> dict[str, Any]:
+        """Return the FileStatus of a file or directory.
+
+        :param path: path of the file/dir
+        :returns: a FileStatus dictionary
+        """
+        self.logger.info("Getting status of %s", path)
+        params: dict[str, Any] = {"op": "GETFILESTATUS"}
+        return await self._query(
+            method="get",
+            path=path,
+            params=params,
+            json_path=["FileStatus"],
+            allow_redirects=True,
+        )
+
+    async def get_checksum(self, path: str) -> dict[str, Any]:
+        """Return the checksum of a file.
+
+        :param path: path of the file
+        :returns: FileChecksum dict
+        """
+        self.logger.info("Getting checksum of %s", path)
+        params: dict[str, Any] = {"op": "GETFILECHECKSUM"}
+        r = await self._datanode_request("get", path, params, "GETFILECHECKSUM")
+        WebHDFSClient._check_response(r)
+        return r.json()["FileChecksum"]
+
+    async def get_content_summary(self, path: str) -> dict[str, Any]:
+        """Return the content summary of a directory.
+
+        :param path: path of the directory
+        :returns: ContentSummary dict
+        """
+        self.logger.info("Getting content summary of %s", path)
+        params: dict[str, Any] = {"op": "GETCONTENTSUMMARY"}
+        return await self._query(
+            method="get",
+            path=path,
+            params=params,
+            json_path=["ContentSummary"],
+        )
+
+    # ------------------------------------------------------------------
+    # File write operations
+    # ------------------------------------------------------------------
+
+    async def create(self, path: str, file_data: Any,
+                     overwrite: bool | None = None) -> bool:
+        """Create a new file in HDFS.
+
+        :param path: the file path to create
+        :param file_data: the data to write, as ``bytes``, ``str`` or an
+            async iterator of ``bytes``
+        :param overwrite: whether to overwrite an existing file
+        """
+        self.logger.info("Creating %s", path)
+        params: dict[str, Any] = {"op": "CREATE"}
+        if overwrite is not None:
+            params["overwrite"] = overwrite
+        r = await self._datanode_request(
+            "put", path, params, "CREATE", data=file_data,
+            headers={"content-type": "application/octet-stream"},
+        )
+        WebHDFSClient._check_response(r, {201})
+        return True
+
+    async def copyfromlocal(self, local_path: str, hdfs_path: str,
+                            overwrite: bool | None = None, *,
+                            chunk_size: int = READ_AHEAD_SIZE) -> bool:
+        """Copy a file from the local filesystem to HDFS.
+
+        The file is read in chunks in a worker thread while it is
+        uploaded, so the event loop isn't blocked. Unlike
+        :meth:`WebHDFSClient.copyfromlocal <webhdfspy.WebHDFSClient.copyfromlocal>`
+        there is no resumable mode.
+
+        :param local_path: path of the local file
+        :param hdfs_path: HDFS destination path
+        :param overwrite: whether to overwrite an existing file
+        :param chunk_size: size in bytes of each chunk read from disk
+        """
+        self.logger.info("Copying local file %s to %s", local_path, hdfs_path)
+        if not os.path.exists(local_path):
+            raise WebHDFSException(f"The local file {local_path} doesn't exist")
+        if chunk_size <= 0:
+            raise WebHDFSException("chunk_size must be a positive number")
+
+        async def chunks() -> AsyncIterator[bytes]:
+            with open(local_path, "rb") as reader:
+                while True:
+                    chunk = await asyncio.to_thread(reader.read, chunk_size)
+                    if not chunk:
+                        return
+                    yield chunk
+
+        return await self.create(hdfs_path, chunks(), overwrite=overwrite)
+
+    async def append(self, path: str, file_data: Any,
+                     buffersize: int | None = None) -> bool:
+        """Append data to a file.
+
+        :param path: path of the file
+        :param file_data: data to append, as ``bytes``, ``str`` or an
+            async iterator of ``bytes``
+        :param buffersize: size of the buffer used to transfer the data
+        """
+        self.logger.info("Appending to file %s", path)
+        params: dict[str, Any] = {"op": "APPEND"}
+        if buffersize is not None:
+            params["buffersize"] = buffersize
+        r = await self._datanode_request(
+            "post", path, params, "APPEND", data=file_data,
+        )
+        WebHDFSClient._check_response(r)
+        return True
+
+    async def concat(self, path: str, sources: Sequence[str]) -> bool:
+        """Concatenate files into a target file, deleting the sources.
+
+        :param path: path of the target file
+        :param sources: paths of the files appended to it, in order
+        """
+        self.logger.info("Concatenating %d files into %s", len(sources), path)
+        params: dict[str, Any] = {"op": "CONCAT", "sources": ",".join(sources)}
+        return await self._query(method="post", path=path, json_path=[],
+                                 params=params)
+
+    # ------------------------------------------------------------------
+    # Permission / ownership operations
+    # ------------------------------------------------------------------
+
+    async def chmod(self, path: str, permission: str) -> bool:
+        """Set the permissions of a file or directory.
+
+        :param path: path of the file/dir
+        :param permission: permissions in octal (e.g. ``"755"``)
+        """
+        self.logger.info("Setting permissions of %s to %s", path, permission)
+        params: dict[str, Any] = {"op": "SETPERMISSION", "permission": permission}
+        return await self._query(
+            method="put", path=path, json_path=[], params=params
+        )
+
+    async def set_owner(
+        self,
+        path: str,
+        owner: str | None = None,
+        group: str | None = None,
+    ) -> bool:
+        """Set the owner and/or group of a file or directory.
+
+        :param path: path of the file/dir
+        :param owner: new owner name
+        :param group: new group name
+        """
+        if owner is None and group is None:
+            raise WebHDFSException("At least one of owner or group must be specified")
+        self.logger.info("Setting owner of %s", path)
+        params: dict[str, Any] = {"op": "SETOWNER"}
+        if owner is not None:
+            params["owner"] = owner
+        if group is not None:
+            params["group"] = group
+        return await self._query(
+            method="put", path=path, json_path=[], params=params
+        )
+
+    async def set_replication(self, path: str, replication_factor: int) -> bool:
+        """Set the replication factor of a file.
+
+        :param path: path of the file
+        :param replication_factor: number of replications (>0)
+        """
+        self.logger.info(
+            "Setting replication factor of %s to %s", path, replication_factor
+        )
+        params: dict[str, Any] = {
+            "op": "SETREPLICATION",
+            "replication": replication_factor,
+        }
+        return await self._query(method="put", path=path, params=params)
+
+    async def set_times(
+        self,
+        path: str,
+        modificationtime: int | None = None,
+        accesstime: int | None = None,
+    ) -> bool:
+        """Set modification and/or access time of a file.
+
+        :param path: path of the file
+        :param modificationtime: modification time in ms since epoch
+        :param accesstime: access time in ms since epoch
+        """
+        self.logger.info("Setting times of %s", path)
+        params: dict[str, Any] = {"op": "SETTIMES"}
+        if modificationtime is not None:
+            params["modificationtime"] = modificationtime
+        if accesstime is not None:
+            params["accesstime"] = accesstime
+        return await self._query(
+            method="put", path=path, json_path=[], params=params
+        )
+
+    # ------------------------------------------------------------------
+    # Delegation token operations
+    # ------------------------------------------------------------------
+
+    async def get_delegation_token(self, renewer: str) -> dict[str, Any]:
+        """Get a delegation token.
+
+        :param renewer: the user who can renew the token
+        :returns: Token dict
+        """
+        self.logger.info("Getting delegation token for renewer %s", renewer)
+        params: dict[str, Any] = {"op": "GETDELEGATIONTOKEN", "renewer": renewer}
+        return await self._query(
+            method="get", path="/", params=params, json_path=["Token"]
+        )
+
+    async def renew_delegation_token(self, token: str) -> int:
+        """Renew a delegation token.
+
+        :param token: the delegation token
+        :returns: new expiration time in ms since epoch
+        """
+        self.logger.info("Renewing delegation token")
+        params: dict[str, Any] = {"op": "RENEWDELEGATIONTOKEN", "token": token}
+        return await self._query(
+            method="put", path="/", params=params, json_path=["long"]
+        )
+
+    async def cancel_delegation_token(self, token: str) -> bool:
+        """Cancel a delegation token.
+
+        :param token: the delegation token
+        """
+        self.logger.info("Cancelling delegation token")
+        params: dict[str, Any] = {"op": "CANCELDELEGATIONTOKEN", "token": token}
+        return await self._query(
+            method="put", path="/", json_path=[], params=params
+        )
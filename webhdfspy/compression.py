@@ -0,0 +1,240 @@
+"""Streaming compression codecs for uploads and downloads.
+
+Data is compressed chunk by chunk while it is sent to the DataNode and
+decompressed chunk by chunk while it is received, so neither the
+compressed nor the plain content is ever held in memory as a whole.
+gzip and bz2 use the standard library; zstd and lz4 require the optional
+``zstandard`` and ``lz4`` packages (``pip install webhdfspy[zstd]`` or
+``webhdfspy[lz4]``). Concatenated streams, as written by appends, are
+decoded one after the other.
+"""
+from __future__ import annotations
+
+import bz2
+import posixpath
+import zlib
+from collections.abc import Callable, Iterable, Iterator
+from typing import Any
+
+from .webhdfspy import CHUNK_SIZE, WebHDFSException
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - exercised only without zstandard
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # pragma: no cover - exercised only without lz4
+    lz4_frame = None
+
+AUTO = "auto"  # Pick the codec from the file extension
+
+
+class _GzipDecompressor:
+    """``zlib`` decompressor with the interface of ``bz2.BZ2Decompressor``."""
+
+    def __init__(self) -> None:
+        self._obj = zlib.decompressobj(wbits=31)
+        self._tail = b""
+
+    def decompress(self, data: bytes, max_length: int = -1) -> bytes:
+        out = self._obj.decompress(self._tail + data, max(max_length, 0))
+        self._tail = self._obj.unconsumed_tail
+        return out
+
+    @property
+    def needs_input(self) -> bool:
+        return not self._tail
+
+    @property
+    def eof(self) -> bool:
+        return self._obj.eof
+
+    @property
+    def unused_data(self) -> bytes:
+        return self._obj.unused_data
+
+
+class _ZstdDecompressor:
+    """``zstandard`` decompressor with the interface of ``bz2.BZ2Decompressor``."""
+
+    needs_input = True
+
+    def __init__(self) -> None:
+        self._obj = zstandard.ZstdDecompressor().decompressobj()
+
+    def decompress(self, data: bytes, max_length: int = -1) -> bytes:
+        return self._obj.decompress(data)
+
+    @property
+    def eof(self) -> bool:
+        return self._obj.eof
+
+    @property
+    def unused_data(self) -> bytes:
+        return self._obj.unused_data
+
+
+class _Lz4Compressor:
+    """LZ4 frame compressor that writes the frame header on first use."""
+
+    def __init__(self) -> None:
+        self._obj = lz4_frame.LZ4FrameCompressor()
+        self._header = self._obj.begin()
+
+    def compress(self, data: bytes) -> bytes:
+        header, self._header = self._header, b""
+        return header + self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        header, self._header = self._header, b""
+        return header + self._obj.flush()
+
+
+class Codec:
+    """A compression format with factories of streaming (de)compressors."""
+
+    def __init__(
+        self,
+        name: str,
+        extensions: tuple[str, ...],
+        compressor: Callable[[], Any],
+        decompressor: Callable[[], Any],
+        package: str | None = None,
+    ) -> None:
+        """Describe a codec.
+
+        :param name: name used to select the codec explicitly
+        :param extensions: file extensions selecting the codec
+        :param compressor: returns an object with ``compress`` and ``flush``
+        :param decompressor: returns an object with the interface of
+            :class:`bz2.BZ2Decompressor`
+        :param package: optional package the codec needs, ``None`` when it
+            is available
+        """
+        self.name = name
+        self.extensions = extensions
+        self.compressor = compressor
+        self.decompressor = decompressor
+        self.package = package
+
+
+CODECS = {
+    "gzip": Codec(
+        "gzip", (".gz",),
+        lambda: zlib.compressobj(wbits=31), _GzipDecompressor,
+    ),
+    "bz2": Codec("bz2", (".bz2",), bz2.BZ2Compressor, bz2.BZ2Decompressor),
+    "zstd": Codec(
+        "zstd", (".zst", ".zstd"),
+        lambda: zstandard.ZstdCompressor().compressobj(), _ZstdDecompressor,
+        package="zstandard" if zstandard is None else None,
+    ),
+    "lz4": Codec(
+        "lz4", (".lz4",),
+        _Lz4Compressor,
+        lambda: lz4_frame.LZ4FrameDecompressor(),
+        package="lz4" if lz4_frame is None else None,
+    ),
+}
+
+
+def get_codec(path: str, compression: str) -> Codec | None:
+    """Return the codec selected for ``path``.
+
+    :param path: path of the file, used when ``compression`` is ``"auto"``
+    :param compression: a codec name, or ``"auto"`` to pick it from the
+        extension of ``path``
+    :returns: the codec, or ``None`` when ``"auto"`` finds no codec for
+        the extension
+    """
+    if compression == AUTO:
+        ext = posixpath.splitext(path)[1].lower()
+        codec = next((c for c in CODECS.values() if ext in c.extensions), None)
+        if codec is None:
+            return None
+    else:
+        codec = CODECS.get(compression)
+        if codec is None:
+            raise WebHDFSException(f"Unknown compression codec {compression}")
+    if codec.package is not None:
+        raise WebHDFSException(
+            f"The {codec.name} codec requires {codec.package}, "
+            f"install it with: pip install webhdfspy[{codec.name}]"
+        )
+    return codec
+
+
+def iter_source(data: Any, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield the content of upload data in chunks.
+
+    :param data: ``bytes``, ``str`` (encoded as UTF-8), a binary file
+        object or an iterable of ``bytes``
+    :param chunk_size: maximum size of the chunks read from buffers and
+        file objects
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        view = memoryview(data)
+        for start in range(0, len(view), chunk_size):
+            yield bytes(view[start:start + chunk_size])
+    elif hasattr(data, "read"):
+        while True:
+            chunk = data.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+    else:
+        yield from data
+
+
+def compress_chunks(codec: Codec, chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Compress a stream of chunks into one compressed stream.
+
+    :param codec: the codec
+    :param chunks: plain chunks
+    :returns: an iterator of compressed chunks
+    """
+    compressor = codec.compressor()
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        if out:
+            yield out
+    out = compressor.flush()
+    if out:
+        yield out
+
+
+def decompress_chunks(codec: Codec, chunks: Iterable[bytes],
+                      chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Decompress a stream of compressed chunks.
+
+    Output pieces are at most ``chunk_size`` bytes for the codecs that can
+    bound their output (all but zstd), however well the data compresses.
+
+    :param codec: the codec
+    :param chunks: compressed chunks
+    :param chunk_size: maximum size of the yielded chunks
+    :returns: an iterator of plain chunks
+    """
+    decompressor = codec.decompressor()
+    received = False
+    for data in chunks:
+        received = received or bool(data)
+        while True:
+            if decompressor.eof:
+                # Another stream follows, e.g. written by an append
+                data = decompressor.unused_data + data
+                if not data:
+                    break
+                decompressor = codec.decompressor()
+            elif not data and decompressor.needs_input:
+                break
+            out = decompressor.decompress(data, chunk_size)
+            data = b""
+            if out:
+                yield out
+    if received and not decompressor.eof:
+        raise WebHDFSException(f"The {codec.name} stream is truncated")
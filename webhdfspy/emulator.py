@@ -0,0 +1,854 @@
+"""Local WebHDFS emulator for tests, benchmarks and experiments.
+
+:class:`WebHDFSEmulator` runs a NameNode and several DataNodes as HTTP
+servers on localhost, sharing an in-memory namespace. ``OPEN``, ``CREATE``,
+``APPEND`` and ``GETFILECHECKSUM`` are redirected with a real 307 to one of
+the DataNode ports, so connection pooling, parallel transfers and retries
+behave as they would against a cluster. Latency can be added to each hop,
+DataNode bandwidth can be capped and ``RetriableException``,
+``StandbyException`` or dropped connections can be injected::
+
+    with WebHDFSEmulator(datanodes=3, datanode_bandwidth=50 * 2**20) as hdfs:
+        hdfs.inject_fault("StandbyException", ops={"CREATE"}, count=2)
+        with hdfs.client(retry=RetryPolicy()) as client:
+            client.create("/data/file", b"payload")
+"""
+from __future__ import annotations
+
+import json
+import posixpath
+import random
+import secrets
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, quote, unquote, urlencode, urlparse
+
+from .checksum import data_checksum
+from .webhdfspy import CONTEXT_ROOT, WebHDFSClient, WebHDFSException
+
+STREAM_CHUNK_SIZE = 65536  # Bytes sent or received between bandwidth checks
+TOKEN_LIFETIME = 86400000  # Delegation token lifetime in ms
+DROP = "drop"  # Fault closing the connection without a response
+FAULT_CLASSES = {
+    "RetriableException": "org.apache.hadoop.ipc.RetriableException",
+    "StandbyException": "org.apache.hadoop.ipc.StandbyException",
+    "SafeModeException":
+        "org.apache.hadoop.hdfs.server.namenode.SafeModeException",
+}
+REDIRECTED_OPS = frozenset({"OPEN", "CREATE", "APPEND", "GETFILECHECKSUM"})
+NAMENODE_OPS = {
+    "GET": frozenset({
+        "OPEN", "GETFILESTATUS", "LISTSTATUS", "LISTSTATUS_BATCH",
+        "GETCONTENTSUMMARY", "GETFILECHECKSUM", "GETHOMEDIRECTORY",
+        "GETDELEGATIONTOKEN",
+    }),
+    "PUT": frozenset({
+        "CREATE", "MKDIRS", "RENAME", "SETREPLICATION", "SETOWNER",
+        "SETPERMISSION", "SETTIMES", "RENEWDELEGATIONTOKEN",
+        "CANCELDELEGATIONTOKEN",
+    }),
+    "POST": frozenset({"APPEND", "CONCAT"}),
+    "DELETE": frozenset({"DELETE"}),
+}
+
+
+class RemoteError(Exception):
+    """Error answered to the client as a WebHDFS RemoteException."""
+
+    def __init__(self, status: int, java_class_name: str, message: str) -> None:
+        self.status = status
+        self.java_class_name = java_class_name
+        super().__init__(message)
+
+    def payload(self) -> dict[str, Any]:
+        return {"RemoteException": {
+            "exception": self.java_class_name.rsplit(".", 1)[-1],
+            "javaClassName": self.java_class_name,
+            "message": str(self),
+        }}
+
+
+def _not_found(path: str) -> RemoteError:
+    return RemoteError(404, "java.io.FileNotFoundException",
+                       f"File {path} does not exist.")
+
+
+def _bool_param(value: str | None, default: bool = False) -> bool:
+    if value is None:
+        return default
+    return value.lower() == "true"
+
+
+class _Entry:
+    """A file or directory of the emulated namespace."""
+
+    def __init__(self, file_type: str, owner: str, permission: str,
+                 replication: int = 0, block_size: int = 0) -> None:
+        now = int(time.time() * 1000)
+        self.type = file_type
+        self.data = bytearray() if file_type == "FILE" else None
+        self.owner = owner
+        self.group = "supergroup"
+        self.permission = permission
+        self.modification_time = now
+        self.access_time = now if file_type == "FILE" else 0
+        self.replication = replication
+        self.block_size = block_size
+        self.datanodes: list[int] = []
+
+    def status(self, name: str, children: int = 0) -> dict[str, Any]:
+        return {
+            "pathSuffix": name,
+            "type": self.type,
+            "length": len(self.data) if self.data is not None else 0,
+            "owner": self.owner,
+            "group": self.group,
+            "permission": self.permission,
+            "modificationTime": self.modification_time,
+            "accessTime": self.access_time,
+            "replication": self.replication,
+            "blockSize": self.block_size,
+            "childrenNum": children,
+        }
+
+
+class _Fault:
+    def __init__(self, exception: str, hop: str, ops: frozenset[str] | None,
+                 count: int | None, probability: float) -> None:
+        self.exception = exception
+        self.hop = hop
+        self.ops = ops
+        self.count = count
+        self.probability = probability
+
+
+class _Throttle:
+    """Pace transfers shared by all connections to a bandwidth in bytes/s."""
+
+    def __init__(self, rate: float | None) -> None:
+        self.rate = rate
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, size: int) -> None:
+        if not self.rate:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._next = max(now, self._next) + size / self.rate
+            wait = self._next - now
+        if wait > 0:
+            time.sleep(wait)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without TCP_NODELAY every
+    # response would wait for the client's delayed ACK
+    disable_nagle_algorithm = True
+    hop = "namenode"
+    server: _Server
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        self._handle("GET")
+
+    def do_PUT(self) -> None:
+        self._handle("PUT")
+
+    def do_POST(self) -> None:
+        self._handle("POST")
+
+    def do_DELETE(self) -> None:
+        self._handle("DELETE")
+
+    def do_HEAD(self) -> None:
+        self._send(200)
+
+    def _handle(self, method: str) -> None:
+        emulator = self.server.emulator
+        url = urlparse(self.path)
+        path = posixpath.normpath(unquote(url.path[len(CONTEXT_ROOT):]) or "/")
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        op = query.get("op", "").upper()
+        with emulator._lock:
+            emulator.counts[(self.hop, op)] += 1
+        latency = (emulator.namenode_latency if self.hop == "namenode"
+                   else emulator.datanode_latency)
+        if latency:
+            time.sleep(latency)
+        fault = emulator._match_fault(self.hop, op)
+        if fault is not None and fault.exception == DROP:
+            self.close_connection = True
+            return
+        try:
+            if fault is not None:
+                self._read_body()
+                raise RemoteError(
+                    403, FAULT_CLASSES.get(fault.exception, fault.exception),
+                    f"Injected {fault.exception}",
+                )
+            self.dispatch(method, op, path, query)
+        except RemoteError as exc:
+            self._json(exc.payload(), exc.status)
+        except ValueError as exc:
+            error = RemoteError(400, "java.lang.IllegalArgumentException",
+                                str(exc))
+            self._json(error.payload(), error.status)
+
+    def dispatch(self, method: str, op: str, path: str,
+                 query: dict[str, str]) -> None:
+        raise NotImplementedError
+
+    def _body_chunks(self) -> Iterator[bytes]:
+        """Yield the request body, decoding chunked transfer encoding."""
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            while True:
+                size = int(self.rfile.readline().split(b";")[0], 16)
+                if size == 0:
+                    # Skip trailers up to the final blank line
+                    while self.rfile.readline() not in (b"\r\n", b"\n", b""):
+                        pass
+                    return
+                yield self.rfile.read(size)
+                self.rfile.readline()
+        remaining = int(self.headers.get("Content-Length") or 0)
+        while remaining > 0:
+            chunk = self.rfile.read(min(STREAM_CHUNK_SIZE, remaining))
+            if not chunk:
+                return
+            remaining -= len(chunk)
+            yield chunk
+
+    def _read_body(self) -> bytes:
+        return b"".join(self._body_chunks())
+
+    def _json(self, payload: Any, status: int = 200) -> None:
+        self._send(status, json.dumps(payload).encode(),
+                   {"Content-Type": "application/json"})
+
+    def _send(self, status: int, body: bytes = b"",
+              headers: dict[str, str] | None = None) -> None:
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+
+class _NameNodeHandler(_Handler):
+    hop = "namenode"
+
+    def dispatch(self, method: str, op: str, path: str,
+                 query: dict[str, str]) -> None:
+        self._read_body()
+        if op not in NAMENODE_OPS.get(method, ()):
+            raise RemoteError(400, "java.lang.IllegalArgumentException",
+                              f"Invalid value for webhdfs parameter \"op\": {op}")
+        emulator = self.server.emulator
+        if op in REDIRECTED_OPS:
+            location = emulator._redirect(op, path, query)
+            if _bool_param(query.get("noredirect")):
+                self._json({"Location": location})
+            else:
+                self._send(307, headers={"Location": location})
+            return
+        result = getattr(emulator, f"_op_{op.lower()}")(path, query)
+        if result is None:
+            self._send(200)
+        else:
+            self._json(result)
+
+
+class _DataNodeHandler(_Handler):
+    hop = "datanode"
+
+    def dispatch(self, method: str, op: str, path: str,
+                 query: dict[str, str]) -> None:
+        emulator = self.server.emulator
+        throttle = emulator._throttles[self.server.index]
+        if op in ("CREATE", "APPEND"):
+            data = bytearray()
+            for chunk in self._body_chunks():
+                throttle.consume(len(chunk))
+                data += chunk
+            emulator._write(path, bytes(data), query, self.server.index,
+                            append=op == "APPEND")
+            self._send(201 if op == "CREATE" else 200)
+        elif op == "OPEN":
+            self._read_body()
+            data = emulator._read_range(path, query)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            for start in range(0, len(data), STREAM_CHUNK_SIZE):
+                chunk = data[start:start + STREAM_CHUNK_SIZE]
+                throttle.consume(len(chunk))
+                self.wfile.write(chunk)
+        elif op == "GETFILECHECKSUM":
+            self._read_body()
+            self._json({"FileChecksum": emulator._checksum(path)})
+        else:
+            raise RemoteError(400, "java.lang.IllegalArgumentException",
+                              f"Unsupported DataNode operation {op}")
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, emulator: WebHDFSEmulator, address: tuple[str, int],
+                 handler: type[_Handler], index: int = -1) -> None:
+        super().__init__(address, handler)
+        self.emulator = emulator
+        self.index = index
+
+
+class WebHDFSEmulator:
+    """In-memory WebHDFS cluster with one NameNode and several DataNodes.
+
+    The files and directories only live in memory; :meth:`write`,
+    :meth:`read` and :meth:`mkdirs` access them directly, without HTTP.
+    ``counts`` holds the number of requests received per
+    ``(hop, op)``, where hop is ``"namenode"`` or ``"datanode"``.
+    """
+
+    def __init__(
+        self,
+        datanodes: int = 3,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        namenode_latency: float = 0.0,
+        datanode_latency: float = 0.0,
+        datanode_bandwidth: float | Iterable[float | None] | None = None,
+        replication: int = 3,
+        block_size: int = 134217728,
+        bytes_per_crc: int = 512,
+        ls_limit: int = 1000,
+        seed: int | None = None,
+    ) -> None:
+        """Create an emulator; servers start with :meth:`start`.
+
+        :param datanodes: number of DataNode servers
+        :param host: address the servers listen on
+        :param port: NameNode port, ``0`` picks a free one
+        :param namenode_latency: seconds added to every NameNode request
+        :param datanode_latency: seconds added to every DataNode request
+        :param datanode_bandwidth: maximum bytes per second transferred by
+            each DataNode, shared by its connections; a list gives one
+            limit per DataNode, ``None`` means unlimited
+        :param replication: default replication factor of new files
+        :param block_size: default block size of new files, which decides
+            the checksum algorithm returned for them
+        :param bytes_per_crc: bytes covered by each CRC of the checksums
+        :param ls_limit: entries per ``LISTSTATUS_BATCH`` page, like
+            ``dfs.ls.limit``
+        :param seed: seed of the random numbers drawn for faults
+        """
+        if datanodes < 1:
+            raise WebHDFSException("datanodes must be at least 1")
+        if datanode_bandwidth is None or isinstance(datanode_bandwidth,
+                                                    (int, float)):
+            bandwidths = [datanode_bandwidth] * datanodes
+        else:
+            bandwidths = list(datanode_bandwidth)
+            if len(bandwidths) != datanodes:
+                raise WebHDFSException(
+                    "datanode_bandwidth needs one value per DataNode"
+                )
+        self.host = host
+        self.namenode_latency = namenode_latency
+        self.datanode_latency = datanode_latency
+        self.replication = replication
+        self.block_size = block_size
+        self.bytes_per_crc = bytes_per_crc
+        self.ls_limit = ls_limit
+        self.counts: Counter[tuple[str, str]] = Counter()
+        self._entries = {"/": _Entry("DIRECTORY", "hdfs", "755")}
+        self._children: dict[str, set[str]] = {"/": set()}
+        self._tokens: dict[str, int] = {}
+        self._faults: list[_Fault] = []
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        self._next_datanode = 0
+        self._throttles = [_Throttle(rate) for rate in bandwidths]
+        self._namenode = _Server(self, (host, port), _NameNodeHandler)
+        self._datanodes = [
+            _Server(self, (host, 0), _DataNodeHandler, index)
+            for index in range(datanodes)
+        ]
+        self._threads: list[threading.Thread] = []
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> WebHDFSEmulator:
+        """Start serving requests in background threads."""
+        for server in (self._namenode, *self._datanodes):
+            thread = threading.Thread(target=server.serve_forever,
+                                      kwargs={"poll_interval": 0.05},
+                                      daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self) -> None:
+        """Stop the servers and close their sockets."""
+        for server in (self._namenode, *self._datanodes):
+            if self._threads:
+                server.shutdown()
+            server.server_close()
+        self._threads.clear()
+
+    def __enter__(self) -> WebHDFSEmulator:
+        return self.start()
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
+
+    @property
+    def port(self) -> int:
+        """Port of the NameNode."""
+        return self._namenode.server_address[1]
+
+    @property
+    def datanode_ports(self) -> list[int]:
+        """Ports of the DataNodes."""
+        return [server.server_address[1] for server in self._datanodes]
+
+    def client(self, username: str | None = "webhdfs",
+               **kwargs: Any) -> WebHDFSClient:
+        """Return a client connected to the emulated NameNode.
+
+        :param username: user name of the client
+        :param kwargs: other :class:`~webhdfspy.WebHDFSClient` arguments
+        """
+        return WebHDFSClient(self.host, self.port, username, **kwargs)
+
+    # ------------------------------------------------------------------
+    # Fault injection
+    # ------------------------------------------------------------------
+
+    def inject_fault(
+        self,
+        exception: str = "RetriableException",
+        ops: Iterable[str] | None = None,
+        count: int | None = 1,
+        probability: float = 1.0,
+        hop: str = "namenode",
+    ) -> None:
+        """Make upcoming requests fail.
+
+        :param exception: ``"RetriableException"``, ``"StandbyException"``,
+            ``"SafeModeException"`` or any Java class name, answered as a
+            403 RemoteException; ``"drop"`` closes the connection without
+            answering
+        :param ops: operations affected, all when ``None``
+        :param count: number of requests to fail, unlimited when ``None``
+        :param probability: chance that a matching request fails
+        :param hop: ``"namenode"`` or ``"datanode"``
+        """
+        if hop not in ("namenode", "datanode"):
+            raise WebHDFSException(f"Unknown hop {hop}")
+        with self._lock:
+            self._faults.append(_Fault(
+                exception, hop,
+                frozenset(op.upper() for op in ops) if ops is not None else None,
+                count, probability,
+            ))
+
+    def clear_faults(self) -> None:
+        """Remove every injected fault."""
+        with self._lock:
+            self._faults.clear()
+
+    def _match_fault(self, hop: str, op: str) -> _Fault | None:
+        with self._lock:
+            for fault in self._faults:
+                if fault.hop != hop or (fault.ops is not None
+                                        and op not in fault.ops):
+                    continue
+                if self._random.random() >= fault.probability:
+                    continue
+                if fault.count is not None:
+                    fault.count -= 1
+                    if fault.count <= 0:
+                        self._faults.remove(fault)
+                return fault
+        return None
+
+    # ------------------------------------------------------------------
+    # Direct namespace access
+    # ------------------------------------------------------------------
+
+    def mkdirs(self, path: str, owner: str = "hdfs",
+               permission: str = "755") -> None:
+        """Create a directory and its missing parents.
+
+        :param path: path of the directory
+        :param owner: owner of the created directories
+        :param permission: permission of the created directories
+        """
+        with self._lock:
+            missing = []
+            current = posixpath.normpath(path)
+            while current not in self._entries:
+                missing.append(current)
+                current = posixpath.dirname(current)
+            if self._entries[current].type != "DIRECTORY":
+                raise RemoteError(
+                    403, "org.apache.hadoop.fs.ParentNotDirectoryException",
+                    f"{current} is not a directory",
+                )
+            for directory in reversed(missing):
+                self._add(directory, _Entry("DIRECTORY", owner, permission))
+
+    def write(self, path: str, data: bytes) -> None:
+        """Create or replace a file, creating its parent directories.
+
+        :param path: path of the file
+        :param data: content of the file
+        """
+        path = posixpath.normpath(path)
+        with self._lock:
+            self.mkdirs(posixpath.dirname(path))
+            self._delete(path)
+            entry = self._new_file("hdfs", "644", self.replication,
+                                   self.block_size, self._pick_datanode())
+            entry.data.extend(data)
+            self._add(path, entry)
+
+    def read(self, path: str) -> bytes:
+        """Return the content of a file.
+
+        :param path: path of the file
+        """
+        with self._lock:
+            return bytes(self._file(posixpath.normpath(path)).data)
+
+    def _add(self, path: str, entry: _Entry, touch: bool = True) -> None:
+        self._entries[path] = entry
+        self._children[posixpath.dirname(path)].add(posixpath.basename(path))
+        if entry.type == "DIRECTORY":
+            self._children[path] = set()
+        if touch:
+            self._touch_parent(path)
+
+    def _delete(self, path: str) -> bool:
+        if path not in self._entries:
+            return False
+        self._children[posixpath.dirname(path)].discard(posixpath.basename(path))
+        self._touch_parent(path)
+        stack = [path]
+        while stack:
+            current = stack.pop()
+            del self._entries[current]
+            stack.extend(posixpath.join(current, name)
+                         for name in self._children.pop(current, ()))
+        return True
+
+    def _touch_parent(self, path: str) -> None:
+        """Bump the mtime of the directory of ``path``, as HDFS does."""
+        parent = self._entries.get(posixpath.dirname(path))
+        if parent is not None and path != "/":
+            parent.modification_time = int(time.time() * 1000)
+
+    def _pick_datanode(self) -> int:
+        """Return the DataNode receiving the next new file, round-robin."""
+        index = self._next_datanode
+        self._next_datanode = (index + 1) % len(self._datanodes)
+        return index
+
+    def _new_file(self, owner: str, permission: str, replication: int,
+                  block_size: int, first: int) -> _Entry:
+        """Create a file entry stored on DataNodes from ``first`` onwards."""
+        entry = _Entry("FILE", owner, permission, replication, block_size)
+        count = len(self._datanodes)
+        entry.datanodes = [(first + i) % count
+                           for i in range(min(max(replication, 1), count))]
+        return entry
+
+    def _get(self, path: str) -> _Entry:
+        entry = self._entries.get(path)
+        if entry is None:
+            raise _not_found(path)
+        return entry
+
+    def _file(self, path: str) -> _Entry:
+        entry = self._get(path)
+        if entry.type != "FILE":
+            raise RemoteError(403, "java.io.FileNotFoundException",
+                              f"Path is not a file: {path}")
+        return entry
+
+    def _status(self, path: str, name: str = "") -> dict[str, Any]:
+        entry = self._get(path)
+        return entry.status(name, len(self._children.get(path, ())))
+
+    def _listing(self, path: str) -> list[dict[str, Any]]:
+        entry = self._get(path)
+        if entry.type == "FILE":
+            return [self._status(path)]
+        return [self._status(posixpath.join(path, name), name)
+                for name in sorted(self._children[path])]
+
+    # ------------------------------------------------------------------
+    # Redirected operations
+    # ------------------------------------------------------------------
+
+    def _redirect(self, op: str, path: str, query: dict[str, str]) -> str:
+        """Validate a redirected operation and pick its DataNode URL."""
+        with self._lock:
+            if op == "CREATE":
+                entry = self._entries.get(path)
+                if entry is not None and (
+                    entry.type == "DIRECTORY"
+                    or not _bool_param(query.get("overwrite"))
+                ):
+                    raise RemoteError(
+                        403, "org.apache.hadoop.fs.FileAlreadyExistsException",
+                        f"{path} already exists",
+                    )
+                index = self._pick_datanode()
+            else:
+                datanodes = self._file(path).datanodes
+                index = datanodes[self.counts[("namenode", op)] % len(datanodes)]
+        params = {k: v for k, v in query.items() if k != "noredirect"}
+        port = self._datanodes[index].server_address[1]
+        return (f"http://{self.host}:{port}{CONTEXT_ROOT}{quote(path)}"
+                f"?{urlencode(params)}")
+
+    def _write(self, path: str, data: bytes, query: dict[str, str],
+               index: int, append: bool) -> None:
+        with self._lock:
+            if append:
+                entry = self._file(path)
+                entry.data.extend(data)
+                entry.modification_time = int(time.time() * 1000)
+                return
+            self.mkdirs(posixpath.dirname(path))
+            entry = self._entries.get(path)
+            if entry is not None and not _bool_param(query.get("overwrite")):
+                raise RemoteError(
+                    403, "org.apache.hadoop.fs.FileAlreadyExistsException",
+                    f"{path} already exists",
+                )
+            self._delete(path)
+            entry = self._new_file(
+                query.get("user.name", "webhdfs"),
+                query.get("permission", "644"),
+                int(query.get("replication", self.replication)),
+                int(query.get("blocksize", self.block_size)),
+                index,
+            )
+            entry.data.extend(data)
+            self._add(path, entry)
+
+    def _read_range(self, path: str, query: dict[str, str]) -> bytes:
+        with self._lock:
+            entry = self._file(path)
+            size = len(entry.data)
+            offset = int(query.get("offset", 0))
+            if offset < 0 or offset > size:
+                raise RemoteError(
+                    403, "java.io.IOException",
+                    f"Offset={offset} out of the range [0, {size}]; "
+                    f"OPEN, path={path}",
+                )
+            end = size
+            if "length" in query:
+                end = min(size, offset + int(query["length"]))
+            entry.access_time = int(time.time() * 1000)
+            return bytes(entry.data[offset:end])
+
+    def _checksum(self, path: str) -> dict[str, Any]:
+        with self._lock:
+            entry = self._file(path)
+            data = bytes(entry.data)
+            block_size = entry.block_size
+        # Like HDFS, files of a single block report 0 CRCs per block
+        crc_per_block = (block_size // self.bytes_per_crc
+                         if len(data) > block_size else 0)
+        algorithm = f"MD5-of-{crc_per_block}MD5-of-{self.bytes_per_crc}CRC32C"
+        return data_checksum(data, algorithm)
+
+    # ------------------------------------------------------------------
+    # NameNode operations
+    # ------------------------------------------------------------------
+
+    def _op_getfilestatus(self, path: str, query: dict[str, str]) -> Any:
+        with self._lock:
+            return {"FileStatus": self._status(path)}
+
+    def _op_liststatus(self, path: str, query: dict[str, str]) -> Any:
+        with self._lock:
+            return {"FileStatuses": {"FileStatus": self._listing(path)}}
+
+    def _op_liststatus_batch(self, path: str, query: dict[str, str]) -> Any:
+        start_after = query.get("startAfter", "")
+        with self._lock:
+            listing = [status for status in self._listing(path)
+                       if status["pathSuffix"] > start_after or
+                       not status["pathSuffix"]]
+        page = listing[:self.ls_limit]
+        return {"DirectoryListing": {
+            "partialListing": {"FileStatuses": {"FileStatus": page}},
+            "remainingEntries": len(listing) - len(page),
+        }}
+
+    def _op_getcontentsummary(self, path: str, query: dict[str, str]) -> Any:
+        with self._lock:
+            self._get(path)
+            prefix = path.rstrip("/") + "/"
+            entries = [entry for name, entry in self._entries.items()
+                       if name == path or name.startswith(prefix)]
+            files = [entry for entry in entries if entry.type == "FILE"]
+        return {"ContentSummary": {
+            "directoryCount": len(entries) - len(files),
+            "fileCount": len(files),
+            "length": sum(len(entry.data) for entry in files),
+            "quota": -1,
+            "spaceConsumed": sum(len(entry.data) * entry.replication
+                                 for entry in files),
+            "spaceQuota": -1,
+        }}
+
+    def _op_gethomedirectory(self, path: str, query: dict[str, str]) -> Any:
+        return {"Path": f"/user/{query.get('user.name', 'webhdfs')}"}
+
+    def _op_mkdirs(self, path: str, query: dict[str, str]) -> Any:
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry.type == "FILE":
+                raise RemoteError(
+                    403, "org.apache.hadoop.fs.FileAlreadyExistsException",
+                    f"Path is not a directory: {path}",
+                )
+            self.mkdirs(path, query.get("user.name", "webhdfs"),
+                        query.get("permission", "755"))
+        return {"boolean": True}
+
+    def _op_delete(self, path: str, query: dict[str, str]) -> Any:
+        with self._lock:
+            if path == "/":
+                return {"boolean": False}
+            if self._children.get(path) and not _bool_param(
+                query.get("recursive")
+            ):
+                raise RemoteError(
+                    403, "org.apache.hadoop.fs.PathIsNotEmptyDirectoryException",
+                    f"`{path} is non empty': Directory is not empty",
+                )
+            return {"boolean": self._delete(path)}
+
+    def _op_rename(self, path: str, query: dict[str, str]) -> Any:
+        if "destination" not in query:
+            raise RemoteError(400, "java.lang.IllegalArgumentException",
+                              "Required param destination for op: RENAME is null")
+        destination = posixpath.normpath(query["destination"])
+        with self._lock:
+            target = self._entries.get(destination)
+            if target is not None and target.type == "DIRECTORY":
+                destination = posixpath.join(destination,
+                                             posixpath.basename(path))
+            parent = self._entries.get(posixpath.dirname(destination))
+            if (path not in self._entries or path == "/"
+                    or destination in self._entries
+                    or parent is None or parent.type != "DIRECTORY"
+                    or destination.startswith(path.rstrip("/") + "/")):
+                return {"boolean": False}
+            moved = {
+                name: entry for name, entry in self._entries.items()
+                if name == path or name.startswith(path + "/")
+            }
+            self._delete(path)
+            # Only the source and destination directories change
+            for name in sorted(moved):
+                self._add(destination + name[len(path):], moved[name],
+                          touch=False)
+            self._touch_parent(destination)
+        return {"boolean": True}
+
+    def _op_setreplication(self, path: str, query: dict[str, str]) -> Any:
+        with self._lock:
+            entry = self._get(path)
+            if entry.type != "FILE":
+                return {"boolean": False}
+            entry.replication = int(query.get("replication", self.replication))
+        return {"boolean": True}
+
+    def _op_setowner(self, path: str, query: dict[str, str]) -> Any:
+        with self._lock:
+            entry = self._get(path)
+            entry.owner = query.get("owner", entry.owner)
+            entry.group = query.get("group", entry.group)
+
+    def _op_setpermission(self, path: str, query: dict[str, str]) -> Any:
+        with self._lock:
+            self._get(path).permission = query.get("permission", "755")
+
+    def _op_settimes(self, path: str, query: dict[str, str]) -> Any:
+        with self._lock:
+            entry = self._get(path)
+            modification_time = int(query.get("modificationtime", -1))
+            access_time = int(query.get("accesstime", -1))
+            if modification_time != -1:
+                entry.modification_time = modification_time
+            if access_time != -1:
+                entry.access_time = access_time
+
+    def _op_concat(self, path: str, query: dict[str, str]) -> Any:
+        sources = [posixpath.normpath(source)
+                   for source in query.get("sources", "").split(",") if source]
+        if not sources:
+            raise RemoteError(400, "java.lang.IllegalArgumentException",
+                              "Required param sources for op: CONCAT is null")
+        with self._lock:
+            target = self._file(path)
+            if path in sources or len(set(sources)) != len(sources):
+                raise RemoteError(
+                    400, "org.apache.hadoop.HadoopIllegalArgumentException",
+                    "concat: the target and the sources must be distinct",
+                )
+            data = [self._file(source).data for source in sources]
+            for source, chunk in zip(sources, data):
+                target.data.extend(chunk)
+                self._delete(source)
+            target.modification_time = int(time.time() * 1000)
+
+    def _op_getdelegationtoken(self, path: str, query: dict[str, str]) -> Any:
+        token = secrets.token_urlsafe(24)
+        with self._lock:
+            self._tokens[token] = int(time.time() * 1000) + TOKEN_LIFETIME
+        return {"Token": {"urlString": token}}
+
+    def _token(self, query: dict[str, str]) -> str:
+        token = query.get("token", "")
+        if token not in self._tokens:
+            raise RemoteError(
+                403, "org.apache.hadoop.security.token.SecretManager$InvalidToken",
+                "token can't be found in cache",
+            )
+        return token
+
+    def _op_renewdelegationtoken(self, path: str,
+                                 query: dict[str, str]) -> Any:
+        with self._lock:
+            token = self._token(query)
+            self._tokens[token] = int(time.time() * 1000) + TOKEN_LIFETIME
+            return {"long": self._tokens[token]}
+
+    def _op_canceldelegationtoken(self, path: str,
+                                  query: dict[str, str]) -> Any:
+        with self._lock:
+            del self._tokens[self._token(query)]
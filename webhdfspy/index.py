@@ -0,0 +1,252 @@
+"""Persistent local index of the HDFS namespace, stored in SQLite."""
+from __future__ import annotations
+
+import posixpath
+import sqlite3
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any
+
+from .webhdfspy import WebHDFSClient, WebHDFSException, WebHDFSRemoteException
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    parent TEXT NOT NULL,
+    type TEXT NOT NULL,
+    length INTEGER NOT NULL,
+    owner TEXT,
+    "group" TEXT,
+    permission TEXT,
+    modification_time INTEGER,
+    replication INTEGER
+);
+CREATE INDEX IF NOT EXISTS files_parent ON files (parent);
+CREATE INDEX IF NOT EXISTS files_owner ON files (owner);
+CREATE INDEX IF NOT EXISTS files_length ON files (length);
+CREATE INDEX IF NOT EXISTS files_modification_time ON files (modification_time);
+CREATE TABLE IF NOT EXISTS listings (
+    path TEXT PRIMARY KEY,
+    modification_time INTEGER NOT NULL
+);
+"""
+
+COLUMNS = ("path", "parent", "type", "length", "owner", "group", "permission",
+           "modification_time", "replication")
+
+
+class NamespaceIndex:
+    """Local SQLite index of FileStatus records for offline queries.
+
+    :meth:`refresh` crawls the namespace and stores one row per file and
+    directory in the ``files`` table. Later refreshes only re-list the
+    directories whose ``modificationTime`` changed since they were last
+    listed; unchanged directories cost one ``GETFILESTATUS`` per
+    subdirectory. Note that HDFS only bumps a directory's modification time
+    when entries are added, removed or renamed, so appends or permission
+    changes on files in an unchanged directory are not picked up::
+
+        with NamespaceIndex(client, "namespace.db") as index:
+            index.refresh("/warehouse")
+            big = index.query(owner="etl", min_length=2**30)
+    """
+
+    def __init__(self, client: WebHDFSClient, db_path: str) -> None:
+        """Open or create an index.
+
+        :param client: the client used to crawl the namespace
+        :param db_path: path of the SQLite database file
+        """
+        self.client = client
+        self.db_path = db_path
+        self.connection = sqlite3.connect(db_path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.connection.close()
+
+    def __enter__(self) -> NamespaceIndex:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Crawling
+    # ------------------------------------------------------------------
+
+    def refresh(self, top: str = "/", workers: int = 8) -> dict[str, int]:
+        """Bring the index of ``top`` up to date with the cluster.
+
+        :param top: path of the directory to index
+        :param workers: number of concurrent requests
+        :returns: a dict with the number of ``listed`` and ``skipped``
+            directories and of ``stat`` calls made
+        """
+        if workers < 1:
+            raise WebHDFSException("workers must be at least 1")
+        top = posixpath.normpath(top)
+        counts = {"listed": 0, "skipped": 0, "stat": 0}
+        pending: dict[Future[Any], tuple[str, str, int]] = {}
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+
+            def stat(path: str) -> None:
+                counts["stat"] += 1
+                pending[executor.submit(self.client.status, path)] = (
+                    "stat", path, 0
+                )
+
+            def visit(path: str, mtime: int) -> None:
+                if self._listed_mtime(path) == mtime:
+                    counts["skipped"] += 1
+                    for child in self._child_dirs(path):
+                        stat(child)
+                else:
+                    counts["listed"] += 1
+                    pending[executor.submit(self.client.listdir, path)] = (
+                        "list", path, mtime
+                    )
+
+            stat(top)
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    kind, path, mtime = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except WebHDFSRemoteException as exc:
+                        if exc.status_code != 404:
+                            raise
+                        self._delete_tree(path)
+                        continue
+                    if kind == "stat":
+                        self._upsert(path, result)
+                        if result["type"] == "DIRECTORY":
+                            visit(path, result["modificationTime"])
+                    else:
+                        for child, status in self._store_listing(
+                            path, mtime, result
+                        ):
+                            visit(child, status["modificationTime"])
+                self.connection.commit()
+        return counts
+
+    def _listed_mtime(self, path: str) -> int | None:
+        row = self.connection.execute(
+            "SELECT modification_time FROM listings WHERE path = ?", (path,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _child_dirs(self, path: str) -> list[str]:
+        rows = self.connection.execute(
+            "SELECT path FROM files"
+            " WHERE parent = ? AND path != parent AND type = 'DIRECTORY'",
+            (path,),
+        )
+        return [row[0] for row in rows]
+
+    def _upsert(self, path: str, status: dict[str, Any]) -> None:
+        self.connection.execute(
+            f"INSERT OR REPLACE INTO files VALUES ({', '.join('?' * len(COLUMNS))})",
+            (
+                path,
+                posixpath.dirname(path),
+                status["type"],
+                status.get("length", 0),
+                status.get("owner"),
+                status.get("group"),
+                status.get("permission"),
+                status.get("modificationTime"),
+                status.get("replication"),
+            ),
+        )
+
+    def _store_listing(
+        self, path: str, mtime: int, entries: list[dict[str, Any]]
+    ) -> list[tuple[str, dict[str, Any]]]:
+        """Replace the children of ``path``; return its subdirectories."""
+        children = {
+            posixpath.join(path, e["pathSuffix"]): e
+            for e in entries if e["pathSuffix"]
+        }
+        for (old,) in self.connection.execute(
+            "SELECT path FROM files WHERE parent = ? AND path != parent",
+            (path,),
+        ).fetchall():
+            if old not in children:
+                self._delete_tree(old)
+        for child, status in children.items():
+            self._upsert(child, status)
+        self.connection.execute(
+            "INSERT OR REPLACE INTO listings VALUES (?, ?)", (path, mtime)
+        )
+        return [(child, status) for child, status in children.items()
+                if status["type"] == "DIRECTORY"]
+
+    def _delete_tree(self, path: str) -> None:
+        """Remove ``path`` and everything below it from the index."""
+        low, high = self._descendant_range(path)
+        for table in ("files", "listings"):
+            self.connection.execute(
+                f"DELETE FROM {table} WHERE path = ? OR (path >= ? AND path < ?)",
+                (path, low, high),
+            )
+
+    @staticmethod
+    def _descendant_range(path: str) -> tuple[str, str]:
+        """Return bounds that enclose every path strictly below ``path``."""
+        base = path.rstrip("/")
+        # "0" is the character right after "/"
+        return base + "/", base + "0"
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def query(
+        self,
+        path: str | None = None,
+        file_type: str | None = None,
+        owner: str | None = None,
+        group: str | None = None,
+        min_length: int | None = None,
+        max_length: int | None = None,
+        modified_after: int | None = None,
+        modified_before: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """Return the indexed records matching every given filter.
+
+        :param path: only return records below this directory
+        :param file_type: ``"FILE"`` or ``"DIRECTORY"``
+        :param owner: owner name
+        :param group: group name
+        :param min_length: minimum length in bytes
+        :param max_length: maximum length in bytes
+        :param modified_after: minimum modification time in ms since epoch
+        :param modified_before: maximum modification time in ms since epoch
+        :returns: a list of record dicts keyed by column name
+        """
+        clauses = []
+        params: list[Any] = []
+        if path is not None:
+            clauses.append("path >= ? AND path < ?")
+            params.extend(self._descendant_range(posixpath.normpath(path)))
+        for column, op, value in (
+            ("type", "=", file_type),
+            ("owner", "=", owner),
+            ('"group"', "=", group),
+            ("length", ">=", min_length),
+            ("length", "<=", max_length),
+            ("modification_time", ">=", modified_after),
+            ("modification_time", "<=", modified_before),
+        ):
+            if value is not None:
+                clauses.append(f"{column} {op} ?")
+                params.append(value)
+        sql = "SELECT * FROM files"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY path"
+        return [dict(row) for row in self.connection.execute(sql, params)]
@@ -0,0 +1,254 @@
+"""Per-operation metrics of WebHDFS clients.
+
+Every request records its latency, split into a NameNode phase and a
+DataNode phase for the operations redirected to a DataNode, the bytes it
+moved, the retries it needed and the errors it raised. The counters can be
+read as a dict with :meth:`Metrics.snapshot`, streamed to callbacks with
+:meth:`Metrics.add_hook` or exported in the Prometheus text format with
+:meth:`Metrics.to_prometheus`.
+"""
+from __future__ import annotations
+
+import bisect
+import logging
+import threading
+from collections.abc import Callable, Sequence
+from typing import Any
+
+# Upper bounds in seconds of the latency histogram buckets
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+PHASES = ("namenode", "datanode")
+
+logger = logging.getLogger(__name__)
+
+
+class _Histogram:
+    """Cumulative latency histogram with fixed buckets."""
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, buckets: Sequence[float], value: float) -> None:
+        self.counts[bisect.bisect_left(buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self, buckets: Sequence[float]) -> dict[str, Any]:
+        cumulative = []
+        total = 0
+        for bound, count in zip((*buckets, float("inf")), self.counts):
+            total += count
+            cumulative.append((bound, total))
+        return {"count": self.count, "sum": self.sum, "buckets": cumulative}
+
+
+class _OpMetrics:
+    """Counters of a single WebHDFS operation."""
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.latency = {phase: _Histogram(buckets) for phase in PHASES}
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.retries = 0
+        self.errors: dict[str, int] = {}
+
+
+class Metrics:
+    """Thread-safe collector of per-operation client metrics.
+
+    A client creates its own collector, reachable as
+    :attr:`WebHDFSClient.metrics`; pass one to several clients to
+    aggregate them::
+
+        client.metrics.add_hook(print)
+        client.listdir("/")
+        print(client.metrics.to_prometheus())
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        """Create an empty collector.
+
+        :param buckets: increasing upper bounds in seconds of the latency
+            histogram buckets
+        """
+        self.buckets = tuple(buckets)
+        self._ops: dict[str, _OpMetrics] = {}
+        self._hooks: list[Callable[[dict[str, Any]], None]] = []
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook: Callable[[dict[str, Any]], None]) -> None:
+        """Call ``hook`` with a dict describing every recorded event.
+
+        Events have an ``event`` key, one of ``"request"`` (with ``op``,
+        ``phase``, ``seconds``, ``sent`` and ``received``), ``"bytes"``
+        (with ``op``, ``sent`` and ``received``), ``"retry"`` (with ``op``)
+        or ``"error"`` (with ``op`` and ``error``). Hooks run on the thread
+        that made the request and exceptions they raise are logged and
+        ignored.
+
+        :param hook: the callback
+        """
+        with self._lock:
+            self._hooks.append(hook)
+
+    def remove_hook(self, hook: Callable[[dict[str, Any]], None]) -> None:
+        """Stop calling a hook added with :meth:`add_hook`.
+
+        :param hook: the callback
+        """
+        with self._lock:
+            self._hooks.remove(hook)
+
+    def reset(self) -> None:
+        """Drop every recorded value; hooks are kept."""
+        with self._lock:
+            self._ops.clear()
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def _op(self, op: str) -> _OpMetrics:
+        metrics = self._ops.get(op)
+        if metrics is None:
+            metrics = self._ops[op] = _OpMetrics(self.buckets)
+        return metrics
+
+    def _emit(self, event: dict[str, Any]) -> None:
+        for hook in list(self._hooks):
+            try:
+                hook(event)
+            except Exception:
+                logger.warning("Metrics hook %r failed", hook, exc_info=True)
+
+    def observe(self, op: str, phase: str, seconds: float, sent: int = 0,
+                received: int = 0) -> None:
+        """Record one request.
+
+        :param op: WebHDFS operation, e.g. ``"OPEN"``
+        :param phase: ``"namenode"`` or ``"datanode"``
+        :param seconds: latency of the request
+        :param sent: bytes of request body sent
+        :param received: bytes of response body received
+        """
+        with self._lock:
+            metrics = self._op(op)
+            metrics.latency[phase].observe(self.buckets, seconds)
+            metrics.bytes_sent += sent
+            metrics.bytes_received += received
+        if self._hooks:
+            self._emit({"event": "request", "op": op, "phase": phase,
+                        "seconds": seconds, "sent": sent, "received": received})
+
+    def count_bytes(self, op: str, sent: int = 0, received: int = 0) -> None:
+        """Record bytes moved outside of :meth:`observe`, e.g. by a stream.
+
+        :param op: WebHDFS operation
+        :param sent: bytes sent
+        :param received: bytes received
+        """
+        with self._lock:
+            metrics = self._op(op)
+            metrics.bytes_sent += sent
+            metrics.bytes_received += received
+        if self._hooks:
+            self._emit({"event": "bytes", "op": op, "sent": sent,
+                        "received": received})
+
+    def count_retry(self, op: str) -> None:
+        """Record a retried or resumed request.
+
+        :param op: WebHDFS operation
+        """
+        with self._lock:
+            self._op(op).retries += 1
+        if self._hooks:
+            self._emit({"event": "retry", "op": op})
+
+    def count_error(self, op: str, exc: BaseException) -> None:
+        """Record a failed request.
+
+        Remote exceptions are counted by Java class name, other errors by
+        Python class name.
+
+        :param op: WebHDFS operation
+        :param exc: the exception raised
+        """
+        error = getattr(exc, "java_class_name", "") or type(exc).__name__
+        with self._lock:
+            errors = self._op(op).errors
+            errors[error] = errors.get(error, 0) + 1
+        if self._hooks:
+            self._emit({"event": "error", "op": op, "error": error})
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """Return a copy of the recorded values.
+
+        :returns: a dict keyed by operation, with a ``latency`` dict per
+            phase (``count``, ``sum`` and cumulative ``(le, count)``
+            ``buckets``), plus ``bytes_sent``, ``bytes_received``,
+            ``retries`` and an ``errors`` dict keyed by exception class
+        """
+        with self._lock:
+            return {
+                op: {
+                    "latency": {
+                        phase: histogram.snapshot(self.buckets)
+                        for phase, histogram in metrics.latency.items()
+                    },
+                    "bytes_sent": metrics.bytes_sent,
+                    "bytes_received": metrics.bytes_received,
+                    "retries": metrics.retries,
+                    "errors": dict(metrics.errors),
+                }
+                for op, metrics in self._ops.items()
+            }
+
+    def to_prometheus(self, prefix: str = "webhdfs") -> str:
+        """Render the recorded values in the Prometheus text format.
+
+        :param prefix: prefix of the metric names
+        :returns: the exposition text
+        """
+        snapshot = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_request_seconds Latency of WebHDFS requests.",
+            f"# TYPE {prefix}_request_seconds histogram",
+        ]
+        for op, values in sorted(snapshot.items()):
+            for phase, histogram in values["latency"].items():
+                if not histogram["count"]:
+                    continue
+                labels = f'op="{op}",phase="{phase}"'
+                for bound, count in histogram["buckets"]:
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{prefix}_request_seconds_bucket'
+                                 f'{{{labels},le="{le}"}} {count}')
+                lines.append(f"{prefix}_request_seconds_sum{{{labels}}} "
+                             f"{histogram['sum']!r}")
+                lines.append(f"{prefix}_request_seconds_count{{{labels}}} "
+                             f"{histogram['count']}")
+        for name, key, text in (
+            ("bytes_sent_total", "bytes_sent", "Bytes sent in request bodies."),
+            ("bytes_received_total", "bytes_received",
+             "Bytes received in response bodies."),
+            ("retries_total", "retries", "Retried or resumed requests."),
+        ):
+            lines.append(f"# HELP {prefix}_{name} {text}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for op, values in sorted(snapshot.items()):
+                lines.append(f'{prefix}_{name}{{op="{op}"}} {values[key]}')
+        lines.append(f"# HELP {prefix}_errors_total Failed requests.")
+        lines.append(f"# TYPE {prefix}_errors_total counter")
+        for op, values in sorted(snapshot.items()):
+            for error, count in sorted(values["errors"].items()):
+                lines.append(f'{prefix}_errors_total'
+                             f'{{op="{op}",exception="{error}"}} {count}')
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,283 @@
+"""Record WebHDFS traffic to a trace file and replay it against a cluster.
+
+A :class:`TraceRecorder` attached to a client writes one JSON line per HTTP
+request with the operation, the shape of the path, the parameters, the
+status, the timings and the payload sizes, never the payloads themselves.
+:func:`replay` drives such a trace against any WebHDFS endpoint at the
+recorded pace or a multiple of it, turning the access pattern of a
+production job into a repeatable load test::
+
+    with TraceRecorder("job.trace.gz") as recorder:
+        with WebHDFSClient("prod-nn", 9870, recorder=recorder) as client:
+            run_job(client)
+
+    with WebHDFSClient("test-nn", 9870) as client:
+        print(replay("job.trace.gz", client, speed=2.0, root="/replay"))
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import posixpath
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Any
+
+from .webhdfspy import WebHDFSClient, WebHDFSException
+
+TRACE_VERSION = 1
+# Parameters never written to a trace
+SECRET_PARAMS = frozenset({"user.name", "delegation", "token", "doas"})
+# Parameters holding a path, recorded as path shapes
+PATH_PARAMS = frozenset({"destination"})
+# Parameters holding comma separated paths
+PATH_LIST_PARAMS = frozenset({"sources"})
+# Parameters holding a file name
+NAME_PARAMS = frozenset({"startAfter"})
+# Parameters holding user or group names, recorded as placeholders
+USER_PARAMS = frozenset({"owner", "group", "renewer"})
+# Operations whose NameNode step only returns a DataNode location; they
+# are replayed from their DataNode entry, which knows the payload size
+REDIRECTED_OPS = frozenset({"CREATE", "APPEND", "GETFILECHECKSUM"})
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class TraceRecorder:
+    """Write the requests made by clients to a JSON lines trace file.
+
+    Pass it as the ``recorder`` of one or more
+    :class:`~webhdfspy.WebHDFSClient`. Files ending with ``.gz`` are
+    compressed. User and group names are always recorded as placeholders
+    such as ``u0``.
+    """
+
+    def __init__(self, trace_path: str, anonymize: bool = True) -> None:
+        """Create a trace file.
+
+        :param trace_path: path of the trace file, overwritten if it exists
+        :param anonymize: replace path components with stable placeholders
+            such as ``n3.parquet``, keeping the depth, the extensions and
+            which paths are shared
+        """
+        self.trace_path = trace_path
+        self.anonymize = anonymize
+        self._names: dict[str, str] = {}
+        self._users: dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._writer = _open(trace_path, "w")
+        self._writer.write(json.dumps({"version": TRACE_VERSION}) + "\n")
+
+    def close(self) -> None:
+        """Flush and close the trace file."""
+        with self._lock:
+            self._writer.close()
+
+    def __enter__(self) -> TraceRecorder:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def shape(self, path: str) -> str:
+        """Return the recorded form of ``path``.
+
+        :param path: an HDFS path
+        :returns: the path, with placeholder names when anonymizing
+        """
+        if not self.anonymize:
+            return path
+        parts = []
+        for name in path.split("/"):
+            if not name:
+                parts.append(name)
+                continue
+            with self._lock:
+                placeholder = self._names.get(name)
+                if placeholder is None:
+                    ext = posixpath.splitext(name)[1]
+                    placeholder = f"n{len(self._names)}{ext}"
+                    self._names[name] = placeholder
+            parts.append(placeholder)
+        return "/".join(parts)
+
+    def _user(self, name: str) -> str:
+        """Return the stable placeholder of a user or group name."""
+        with self._lock:
+            return self._users.setdefault(name, f"u{len(self._users)}")
+
+    def _param(self, key: str, value: Any) -> Any:
+        """Return the recorded form of a query parameter."""
+        if key in PATH_PARAMS or key in NAME_PARAMS:
+            return self.shape(value)
+        if key in PATH_LIST_PARAMS:
+            return ",".join(self.shape(path) for path in value.split(","))
+        if key in USER_PARAMS:
+            return self._user(value)
+        return value
+
+    def record(
+        self,
+        op: str,
+        phase: str,
+        method: str,
+        path: str,
+        params: dict[str, Any],
+        start: float,
+        seconds: float,
+        status: int | None,
+        sent: int = 0,
+        received: int = 0,
+        redirects: bool = False,
+    ) -> None:
+        """Append one request to the trace.
+
+        :param op: WebHDFS operation
+        :param phase: ``"namenode"`` or ``"datanode"``
+        :param method: HTTP method
+        :param path: HDFS path of the request
+        :param params: query parameters
+        :param start: :func:`time.perf_counter` value when the request started
+        :param seconds: latency of the request
+        :param status: HTTP status, ``None`` when no response was received
+        :param sent: bytes of request body sent
+        :param received: bytes of response body received
+        :param redirects: whether the request followed redirects
+        """
+        recorded = {
+            key: self._param(key, value)
+            for key, value in params.items()
+            if key != "op" and key not in SECRET_PARAMS
+        }
+        entry: dict[str, Any] = {
+            "t": round(start - self._origin, 6),
+            "op": op,
+            "phase": phase,
+            "method": method,
+            "path": self.shape(path),
+            "status": status,
+            "seconds": round(seconds, 6),
+        }
+        if recorded:
+            entry["params"] = recorded
+        if sent:
+            entry["sent"] = sent
+        if received:
+            entry["received"] = received
+        if redirects:
+            entry["redirects"] = True
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._writer.write(line)
+
+
+def read_trace(trace_path: str) -> Iterator[dict[str, Any]]:
+    """Iterate over the entries of a trace file.
+
+    :param trace_path: path of the trace file
+    :returns: an iterator of entry dicts, in recording order
+    """
+    with _open(trace_path, "r") as reader:
+        header = json.loads(reader.readline() or "{}")
+        if header.get("version") != TRACE_VERSION:
+            raise WebHDFSException(f"{trace_path} is not a supported trace")
+        for line in reader:
+            if line.strip():
+                yield json.loads(line)
+
+
+def replay(
+    trace_path: str,
+    client: WebHDFSClient,
+    speed: float | None = 1.0,
+    root: str = "/",
+    workers: int = 8,
+) -> dict[str, Any]:
+    """Send the requests of a trace to the cluster of ``client``.
+
+    Requests are started at their recorded offset divided by ``speed``.
+    ``CREATE`` and ``APPEND`` upload as many zero bytes as were recorded.
+    Failed requests are counted, not raised, since the target namespace
+    rarely matches the recorded one exactly.
+
+    :param trace_path: path of the trace file
+    :param client: client of the target cluster
+    :param speed: pace multiplier, ``2.0`` replays twice as fast;
+        ``None`` sends requests as fast as the workers allow
+    :param root: directory the recorded paths are replayed under
+    :param workers: number of concurrent requests
+    :returns: a dict with the number of ``requests`` and ``errors``, the
+        ``elapsed`` seconds and the maximum ``lag`` in seconds a request
+        started behind the recorded schedule
+    """
+    if workers < 1:
+        raise WebHDFSException("workers must be at least 1")
+    if speed is not None and speed <= 0:
+        raise WebHDFSException("speed must be a positive number")
+    counts: dict[str, Any] = {"requests": 0, "errors": 0, "lag": 0.0}
+    lock = threading.Lock()
+
+    def rebase(path: str) -> str:
+        return posixpath.join(root, path.lstrip("/"))
+
+    def send(entry: dict[str, Any], due: float | None) -> None:
+        if due is not None:
+            with lock:
+                counts["lag"] = max(counts["lag"], time.perf_counter() - due)
+        op = entry["op"]
+        path = rebase(entry["path"])
+        params = dict(entry.get("params", {}))
+        try:
+            if entry["phase"] == "datanode":
+                payload = bytes(entry.get("sent", 0))
+                if op == "CREATE":
+                    client.create(path, payload, overwrite=True)
+                elif op == "APPEND":
+                    client.append(path, payload)
+                else:
+                    client.get_checksum(path)
+            else:
+                for key in PATH_PARAMS & params.keys():
+                    params[key] = rebase(params[key])
+                for key in PATH_LIST_PARAMS & params.keys():
+                    params[key] = ",".join(
+                        rebase(path) for path in params[key].split(",")
+                    )
+                params["op"] = op
+                r = client._make_request(entry["method"], path, params,
+                                         entry.get("redirects", False))
+                r.close()
+                client._check_response(r, {200, 201, 307})
+        except WebHDFSException:
+            with lock:
+                counts["errors"] += 1
+        with lock:
+            counts["requests"] += 1
+
+    def replayed(entry: dict[str, Any]) -> bool:
+        # The DataNode entry replays the whole exchange of redirected ops
+        return not (entry["phase"] == "namenode"
+                    and entry["op"] in REDIRECTED_OPS
+                    and entry["status"] in (200, 307))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for entry in read_trace(trace_path):
+            if not replayed(entry):
+                continue
+            due = None
+            if speed is not None:
+                due = start + entry["t"] / speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            pool.submit(send, entry, due)
+    counts["elapsed"] = time.perf_counter() - start
+    return counts
@@ -1,15 +1,71 @@
 """A wrapper library to access Hadoop HTTP REST API."""
 from __future__ import annotations
 
+import codecs
+import fnmatch
+import functools
+import io
+import itertools
 import json
 import logging
 import os
-from typing import Any
+import posixpath
+import random
+import shutil
+import threading
+import time
+from collections import OrderedDict, deque
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from typing import TYPE_CHECKING, Any, TypeVar
 
 import requests
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError
+
+from .metrics import Metrics
+
+if TYPE_CHECKING:
+    from .compression import Codec
+    from .trace import TraceRecorder
 
 CONTEXT_ROOT = "/webhdfs/v1"
 OFFSET = 32768  # Default offset in bytes
+CHUNK_SIZE = 65536  # Default chunk size in bytes for streaming reads
+READ_AHEAD_SIZE = 1048576  # Default read-ahead window of WebHDFSFile
+TRANSFER_CHUNK_SIZE = 67108864  # Default byte range per parallel transfer
+SPLIT_SIZE = 134217728  # Default size of map_splits splits, an HDFS block
+GLOB_MAGIC = "*?["  # Characters that make a path component a glob pattern
+
+# Operations that can be repeated without changing their outcome
+IDEMPOTENT_OPS = frozenset({
+    "GETFILESTATUS", "LISTSTATUS", "LISTSTATUS_BATCH", "OPEN",
+    "GETFILECHECKSUM", "GETCONTENTSUMMARY", "GETHOMEDIRECTORY",
+    "GETDELEGATIONTOKEN", "RENEWDELEGATIONTOKEN", "MKDIRS", "SETPERMISSION",
+    "SETOWNER", "SETREPLICATION", "SETTIMES",
+})
+STANDBY_EXCEPTION = "org.apache.hadoop.ipc.StandbyException"
+# Server-side exceptions that signal a transient condition
+RETRIABLE_EXCEPTIONS = frozenset({
+    "org.apache.hadoop.ipc.RetriableException",
+    STANDBY_EXCEPTION,
+    "org.apache.hadoop.hdfs.server.namenode.SafeModeException",
+})
+# Raised while the lease of a file whose writer failed is recovered
+LEASE_EXCEPTIONS = frozenset({
+    "org.apache.hadoop.hdfs.protocol.AlreadyBeingCreatedException",
+    "org.apache.hadoop.hdfs.protocol.RecoveryInProgressException",
+    "org.apache.hadoop.hdfs.server.namenode.LeaseExpiredException",
+})
+
+T = TypeVar("T")
 
 
 class WebHDFSException(Exception):
@@ -38,6 +94,11 @@ class WebHDFSRemoteException(WebHDFSException):
         self.java_class_name = java_class_name
         super().__init__(message)
 
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Keep the remote details when crossing process boundaries
+        return (type(self), (self.msg, self.status_code, self.exception,
+                             self.java_class_name))
+
 
 class WebHDFSConnectionError(WebHDFSException):
     """Exception raised when a connection to WebHDFS fails."""
@@ -47,6 +108,194 @@ class WebHDFSConnectionError(WebHDFSException):
         super().__init__(msg)
 
 
+class _DataNodeConnectionError(WebHDFSConnectionError):
+    """Connection failure on the DataNode leg of a redirected operation."""
+
+
+class RetryPolicy:
+    """When and how long to wait before retrying a failed request.
+
+    Connection failures and the remote exceptions listed in
+    ``retriable_exceptions`` are retried with exponential backoff and full
+    jitter. Only idempotent operations are retried unless
+    ``retry_all_ops`` is set::
+
+        client = WebHDFSClient("host", 50070, retry=RetryPolicy(max_attempts=5))
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        jitter: bool = True,
+        retry_all_ops: bool = False,
+        retriable_exceptions: Iterable[str] = RETRIABLE_EXCEPTIONS,
+    ) -> None:
+        """Create a retry policy.
+
+        :param max_attempts: total number of attempts, including the first
+        :param backoff: delay in seconds before the first retry, doubled
+            after each attempt
+        :param max_backoff: maximum delay in seconds between attempts
+        :param jitter: pick a random delay between 0 and the backoff
+        :param retry_all_ops: also retry non-idempotent operations such as
+            ``RENAME`` or ``DELETE``
+        :param retriable_exceptions: Java class names of the remote
+            exceptions to retry
+        """
+        if max_attempts < 1:
+            raise WebHDFSException("max_attempts must be at least 1")
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_all_ops = retry_all_ops
+        self.retriable_exceptions = frozenset(retriable_exceptions)
+
+    def is_retriable(self, exc: WebHDFSException) -> bool:
+        """Return whether ``exc`` signals a transient failure."""
+        if isinstance(exc, WebHDFSConnectionError):
+            return True
+        return (isinstance(exc, WebHDFSRemoteException)
+                and exc.java_class_name in self.retriable_exceptions)
+
+    def should_retry(self, op: str, exc: WebHDFSException, attempt: int,
+                     idempotent: bool | None = None) -> bool:
+        """Return whether attempt number ``attempt`` of ``op`` may be retried.
+
+        :param op: the WebHDFS operation, e.g. ``"LISTSTATUS"``
+        :param exc: the exception raised by the attempt
+        :param attempt: number of the attempt that failed, starting at 1
+        :param idempotent: overrides the idempotency of ``op``
+        """
+        if attempt >= self.max_attempts or not self.is_retriable(exc):
+            return False
+        if idempotent is None:
+            idempotent = op in IDEMPOTENT_OPS
+        return idempotent or self.retry_all_ops
+
+    def delay(self, attempt: int) -> float:
+        """Return the seconds to wait after attempt number ``attempt``."""
+        delay = min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+        return random.uniform(0, delay) if self.jitter else delay
+
+
+class _MetadataCache:
+    """Thread-safe LRU cache of metadata results with a time to live."""
+
+    def __init__(self, ttl: float, size: int) -> None:
+        self.ttl = ttl
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[str, str], tuple[float, Any]] = (
+            OrderedDict()
+        )
+        # Cached ops of each path, and for each directory the child paths
+        # that have entries at or below them, to find descendants quickly
+        self._ops: dict[str, set[str]] = {}
+        self._children: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(path: str) -> str:
+        return posixpath.normpath(path) if path else "/"
+
+    def get(self, op: str, path: str) -> Any:
+        key = (op, self._normalize(path))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+
+    def put(self, op: str, path: str, value: Any) -> None:
+        key = (op, self._normalize(path))
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            self._ops.setdefault(key[1], set()).add(op)
+            self._link(key[1])
+            while len(self._entries) > self.size:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, path: str, descendants: bool = False,
+                   ancestors: bool = False) -> None:
+        """Drop the entries of ``path`` and of its parent directory.
+
+        :param path: the changed path
+        :param descendants: also drop the entries below ``path``, when a
+            directory was renamed or recursively deleted
+        :param ancestors: also drop the entries of all the directories
+            above ``path``, which may have been created along with it
+        """
+        path = self._normalize(path)
+        with self._lock:
+            self._drop(path)
+            parent = posixpath.dirname(path)
+            self._drop(parent)
+            while ancestors and parent != "/":
+                parent = posixpath.dirname(parent)
+                self._drop(parent)
+            if descendants:
+                stack = list(self._children.get(path, ()))
+                while stack:
+                    child = stack.pop()
+                    stack.extend(self._children.get(child, ()))
+                    self._drop(child)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._ops.clear()
+            self._children.clear()
+
+    def _link(self, path: str) -> None:
+        """Add ``path`` to the child index of its ancestors."""
+        while path != "/":
+            parent = posixpath.dirname(path)
+            children = self._children.setdefault(parent, set())
+            if path in children:
+                return
+            children.add(path)
+            path = parent
+
+    def _unlink(self, path: str) -> None:
+        """Remove ``path`` from the child index if nothing is cached below."""
+        while (path != "/" and path not in self._ops
+               and not self._children.get(path)):
+            self._children.pop(path, None)
+            path, child = posixpath.dirname(path), path
+            self._children.get(path, set()).discard(child)
+
+    def _remove(self, key: tuple[str, str]) -> None:
+        del self._entries[key]
+        op, path = key
+        ops = self._ops[path]
+        ops.discard(op)
+        if not ops:
+            del self._ops[path]
+            self._unlink(path)
+
+    def _drop(self, path: str) -> None:
+        for op in list(self._ops.get(path, ())):
+            self._remove((op, path))
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+            }
+
+
 class WebHDFSClient:
     """Client for Hadoop WebHDFS REST API.
 
@@ -58,30 +307,81 @@ class WebHDFSClient:
 
     def __init__(
         self,
-        host: str,
+        host: str | Sequence[str],
         port: int,
         username: str | None = None,
         logger: logging.Logger | None = None,
         *,
         timeout: float = 60.0,
         scheme: str = "http",
+        pool_connections: int = DEFAULT_POOLSIZE,
+        pool_maxsize: int = DEFAULT_POOLSIZE,
+        pool_block: bool = False,
+        cache_ttl: float | None = None,
+        cache_size: int = 1024,
+        retry: RetryPolicy | None = None,
+        metrics: Metrics | None = None,
+        recorder: TraceRecorder | None = None,
     ) -> None:
         """Create a new WebHDFS client.
 
-        :param host: hostname of the HDFS namenode
-        :param port: port of the namenode
+        Every DataNode a request is redirected to gets its own connection
+        pool. On large clusters raise ``pool_connections`` to about the
+        number of DataNodes so their keep-alive connections are not
+        discarded and rebuilt.
+
+        With high availability, pass the list of NameNode addresses as
+        ``host``. Requests go to the last NameNode known to be active and
+        fail over to the next address on a ``StandbyException`` or a
+        connection failure.
+
+        :param host: hostname of the HDFS namenode, or a list of
+            ``"host"`` or ``"host:port"`` addresses of HA namenodes
+        :param port: port of the namenode, used for addresses without one
         :param username: used for authentication
         :param logger: optional logger instance
         :param timeout: request timeout in seconds
         :param scheme: URL scheme, ``"http"`` or ``"https"``
+        :param pool_connections: number of hosts to keep connection pools for
+        :param pool_maxsize: maximum number of connections kept per host
+        :param pool_block: block when a host has no free connection instead
+            of opening a connection that is thrown away afterwards
+        :param cache_ttl: cache :meth:`status` and :meth:`listdir` results
+            for this many seconds; disabled when ``None``
+        :param cache_size: maximum number of cached results
+        :param retry: retry policy for transient failures; failed requests
+            are not retried when ``None``
+        :param metrics: collector of request metrics, to share one between
+            clients; a new one is created when ``None``
+        :param recorder: trace recorder every request is written to, see
+            :mod:`webhdfspy.trace`
         """
-        self.host = host
-        self.port = port
+        if isinstance(host, str):
+            self.namenodes = [(host, port)]
+        else:
+            self.namenodes = [self._parse_address(a, port) for a in host]
+        if not self.namenodes:
+            raise WebHDFSException("At least one namenode must be specified")
         self.username = username
         self.timeout = timeout
-        self.namenode_url = f"{scheme}://{host}:{port}{CONTEXT_ROOT}"
+        self.scheme = scheme
+        self.retry = retry
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.recorder = recorder
+        self._failover_lock = threading.Lock()
+        self._activate(0)
         self.logger = logger or logging.getLogger(__name__)
         self._session = requests.Session()
+        self._adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+        self._session.mount("http://", self._adapter)
+        self._session.mount("https://", self._adapter)
+        self._cache = (
+            _MetadataCache(cache_ttl, cache_size) if cache_ttl else None
+        )
 
     def close(self) -> None:
         """Close the underlying HTTP session."""
@@ -93,32 +393,240 @@ class WebHDFSClient:
     def __exit__(self, *exc: object) -> None:
         self.close()
 
+    def prewarm(self, hosts: Iterable[str], connections: int = 1,
+                workers: int = 16) -> int:
+        """Open keep-alive connections to hosts ahead of time.
+
+        Sends ``HEAD`` requests so that later redirects to these DataNodes
+        reuse an established connection instead of paying for TCP and TLS
+        setup.
+
+        :param hosts: addresses as ``"host:port"``
+        :param connections: number of connections to open per host
+        :param workers: number of concurrent requests
+        :returns: the number of connections successfully opened
+        """
+        urls = [f"{self.scheme}://{host}/" for host in hosts
+                for _ in range(connections)]
+        if not urls:
+            return 0
+        self.logger.info("Prewarming %d connections", len(urls))
+
+        def head(url: str) -> int:
+            try:
+                self._session.head(url, timeout=self.timeout).close()
+            except requests.RequestException as exc:
+                self.logger.warning("Failed to prewarm %s: %s", url, exc)
+                return 0
+            return 1
+
+        with ThreadPoolExecutor(max_workers=min(workers, len(urls))) as pool:
+            return sum(pool.map(head, urls))
+
+    def connection_stats(self) -> dict[str, Any]:
+        """Return connection reuse statistics of the pooled hosts.
+
+        Counters are kept per host pool, so hosts evicted from the pool
+        (see ``pool_connections``) are no longer reported.
+
+        :returns: a dict with the total ``connections`` opened, ``requests``
+            sent and ``reused`` connections, plus a ``hosts`` dict with the
+            same counters per ``"host:port"``
+        """
+        hosts: dict[str, dict[str, int]] = {}
+        pools = self._adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            stats = hosts.setdefault(
+                f"{pool.host}:{pool.port}", {"connections": 0, "requests": 0}
+            )
+            stats["connections"] += pool.num_connections
+            stats["requests"] += pool.num_requests
+        connections = sum(h["connections"] for h in hosts.values())
+        requests_sent = sum(h["requests"] for h in hosts.values())
+        return {
+            "connections": connections,
+            "requests": requests_sent,
+            "reused": max(requests_sent - connections, 0),
+            "hosts": hosts,
+        }
+
+    def cache_stats(self) -> dict[str, int]:
+        """Return the hit/miss counters of the metadata cache.
+
+        :returns: a dict with ``hits``, ``misses`` and ``size``
+        """
+        if self._cache is None:
+            return {"hits": 0, "misses": 0, "size": 0}
+        return self._cache.stats()
+
+    def clear_cache(self) -> None:
+        """Drop every entry of the metadata cache."""
+        if self._cache is not None:
+            self._cache.clear()
+
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
 
+    @staticmethod
+    def _parse_address(address: str, default_port: int) -> tuple[str, int]:
+        """Split a ``"host:port"`` address, defaulting the port."""
+        host, sep, port = address.rpartition(":")
+        if sep and port.isdigit():
+            return host, int(port)
+        return address, default_port
+
+    def _activate(self, index: int) -> None:
+        """Send the following requests to the namenode at ``index``."""
+        self._active = index
+        self.host, self.port = self.namenodes[index]
+        self.namenode_url = (
+            f"{self.scheme}://{self.host}:{self.port}{CONTEXT_ROOT}"
+        )
+
+    def _failover(self, failed: int) -> None:
+        """Switch to the namenode after ``failed`` unless already done."""
+        with self._failover_lock:
+            if self._active != failed:
+                # Another thread already failed over
+                return
+            self._activate((failed + 1) % len(self.namenodes))
+            self.logger.warning(
+                "Namenode %s:%s unavailable, failing over to %s:%s",
+                *self.namenodes[failed], self.host, self.port,
+            )
+
+    @staticmethod
+    def _should_failover(exc: WebHDFSException, idempotent: bool) -> bool:
+        """Return whether a namenode error calls for trying the next one."""
+        if isinstance(exc, WebHDFSRemoteException):
+            return exc.java_class_name == STANDBY_EXCEPTION
+        if (not isinstance(exc, WebHDFSConnectionError)
+                or isinstance(exc, _DataNodeConnectionError)):
+            # Another namenode would redirect to the same DataNodes
+            return False
+        if idempotent:
+            return True
+        # Non-idempotent requests only move on if they were never sent
+        cause = exc.cause
+        reason = getattr(cause.args[0], "reason", None) if (
+            cause is not None and cause.args
+        ) else None
+        return (isinstance(cause, requests.ConnectTimeout)
+                or isinstance(reason, ConnectTimeoutError))
+
+    def _invalidate(self, *paths: str, descendants: bool = False,
+                    ancestors: bool = False) -> None:
+        """Drop cached metadata of ``paths`` and their parents, and of
+        their descendants or all their ancestors if requested."""
+        if self._cache is not None:
+            for path in paths:
+                self._cache.invalidate(path, descendants, ancestors)
+
     def _make_request(
         self,
         method: str,
         path: str,
         params: dict[str, Any],
         allow_redirects: bool = False,
+        stream: bool = False,
     ) -> requests.Response:
         """Make an HTTP request to the namenode."""
         if self.username is not None:
             params["user.name"] = self.username
+        start = time.perf_counter()
         try:
-            return self._session.request(
+            r = self._session.request(
                 method,
                 f"{self.namenode_url}{path}",
                 params=params,
                 allow_redirects=allow_redirects,
                 timeout=self.timeout,
+                stream=stream,
+            )
+        except (requests.ConnectionError, requests.Timeout) as exc:
+            # A redirect followed by requests may fail on the DataNode
+            failed_url = getattr(exc.request, "url", None) or ""
+            datanode = bool(failed_url) and not failed_url.startswith(
+                self.namenode_url
             )
-        except requests.ConnectionError as exc:
+            if self.recorder is not None:
+                self.recorder.record(
+                    params["op"], "datanode" if datanode else "namenode",
+                    method, path, params, start,
+                    time.perf_counter() - start, None,
+                    redirects=allow_redirects,
+                )
+            if datanode:
+                raise _DataNodeConnectionError(
+                    f"Failed to connect to DataNode for "
+                    f"{params['op'].lower()}", cause=exc
+                ) from exc
             raise WebHDFSConnectionError(
                 f"Failed to connect to {self.host}:{self.port}", cause=exc
             ) from exc
+        elapsed = time.perf_counter() - start
+        # Streamed bodies are counted by their reader
+        received = 0 if stream else len(r.content)
+        if self.recorder is not None:
+            entry = {
+                "op": params["op"], "phase": "namenode", "method": method,
+                "path": path, "params": dict(params), "start": start,
+                "seconds": elapsed, "status": r.status_code,
+                "redirects": allow_redirects,
+            }
+            if stream and r.status_code == 200:
+                # Recorded by _record_stream once the body size is known
+                r.trace_entry = entry  # type: ignore[attr-defined]
+            else:
+                self.recorder.record(**entry, received=received)
+        if r.history:
+            # Redirect followed: the first hop went to the namenode
+            namenode = sum(h.elapsed.total_seconds() for h in r.history)
+            self.metrics.observe(params["op"], "namenode", namenode)
+            self.metrics.observe(params["op"], "datanode",
+                                 max(elapsed - namenode, 0.0),
+                                 received=received)
+        else:
+            self.metrics.observe(params["op"], "namenode", elapsed,
+                                 received=received)
+        return r
+
+    def _record_stream(self, response: requests.Response,
+                       received: int) -> None:
+        """Record a streamed request with the bytes read from its body."""
+        entry = getattr(response, "trace_entry", None)
+        if self.recorder is not None and entry is not None:
+            self.recorder.record(**entry, received=received)
+
+    def _datanode_request(self, op: str, path: str, method: str,
+                          location: str, **kwargs: Any) -> requests.Response:
+        """Send the DataNode leg of a redirected operation on ``path``."""
+        start = time.perf_counter()
+        try:
+            r = self._session.request(method, location, timeout=self.timeout,
+                                      **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as exc:
+            error = _DataNodeConnectionError(
+                f"Failed to connect to DataNode for {op.lower()}", cause=exc
+            )
+            self.metrics.count_error(op, error)
+            if self.recorder is not None:
+                self.recorder.record(op, "datanode", method, path, {}, start,
+                                     time.perf_counter() - start, None)
+            raise error from exc
+        elapsed = time.perf_counter() - start
+        sent = int(r.request.headers.get("Content-Length") or 0)
+        self.metrics.observe(op, "datanode", elapsed, sent=sent,
+                             received=len(r.content))
+        if self.recorder is not None:
+            self.recorder.record(op, "datanode", method, path, {}, start,
+                                 elapsed, r.status_code, sent=sent,
+                                 received=len(r.content))
+        return r
 
     @staticmethod
     def _check_response(
@@ -147,6 +655,95 @@ class WebHDFSClient:
             f"WebHDFS request failed with status {response.status_code}: {text}"
         )
 
+    def _check_datanode_response(
+        self,
+        op: str,
+        response: requests.Response,
+        expected_status: set[int] | None = None,
+    ) -> None:
+        """Check the response of a DataNode leg, counting failures."""
+        try:
+            self._check_response(response, expected_status)
+        except WebHDFSException as exc:
+            self.metrics.count_error(op, exc)
+            raise
+
+    def _retry(self, op: str, func: Callable[[], T],
+               idempotent: bool | None = None) -> T:
+        """Call ``func``, retrying it according to the retry policy."""
+        attempt = 1
+        while True:
+            try:
+                return func()
+            except WebHDFSException as exc:
+                if self.retry is None or not self.retry.should_retry(
+                    op, exc, attempt, idempotent
+                ):
+                    raise
+                delay = self.retry.delay(attempt)
+                self.logger.warning(
+                    "%s failed (%s), retrying in %.2fs", op, exc, delay
+                )
+                self.metrics.count_retry(op)
+                time.sleep(delay)
+                attempt += 1
+
+    def _request(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any],
+        allow_redirects: bool = False,
+        expected_status: set[int] | None = None,
+        stream: bool = False,
+        idempotent: bool | None = None,
+    ) -> requests.Response:
+        """Make a request and check its response, retrying on failure."""
+        if idempotent is None:
+            idempotent = params["op"] in IDEMPOTENT_OPS
+        return self._retry(
+            params["op"],
+            lambda: self._failover_request(
+                method, path, params, allow_redirects, expected_status,
+                stream, idempotent,
+            ),
+            idempotent,
+        )
+
+    def _failover_request(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any],
+        allow_redirects: bool,
+        expected_status: set[int] | None,
+        stream: bool,
+        idempotent: bool,
+    ) -> requests.Response:
+        """Make a request and check its response, skipping standby namenodes.
+
+        Each HA namenode is tried at most once.
+        """
+        tries = 0
+        while True:
+            active = self._active
+            try:
+                r = self._make_request(method, path, dict(params),
+                                       allow_redirects, stream)
+                try:
+                    self._check_response(r, expected_status)
+                except WebHDFSException:
+                    r.close()
+                    raise
+                return r
+            except WebHDFSException as exc:
+                self.metrics.count_error(params["op"], exc)
+                tries += 1
+                if (tries >= len(self.namenodes)
+                        or not self._should_failover(exc, idempotent)):
+                    raise
+                self._failover(active)
+
     def _query(
         self,
         method: str,
@@ -159,8 +756,7 @@ class WebHDFSClient:
         """Make a request and extract a value from the JSON response."""
         if json_path is None:
             json_path = ["boolean"]
-        r = self._make_request(method, path, params, allow_redirects)
-        self._check_response(r, expected_status)
+        r = self._request(method, path, params, allow_redirects, expected_status)
         if json_path:
             response = r.json()
             for key in json_path:
@@ -178,14 +774,237 @@ class WebHDFSClient:
         :param path: path of the directory
         :returns: a list of FileStatus dicts
         """
+        if self._cache is not None:
+            cached = self._cache.get("listdir", path)
+            if cached is not None:
+                return [dict(entry) for entry in cached]
         self.logger.info("Listing %s", path)
         params = {"op": "LISTSTATUS"}
-        return self._query(
+        result = self._query(
             method="get",
             path=path,
             params=params,
             json_path=["FileStatuses", "FileStatus"],
         )
+        if self._cache is not None:
+            self._cache.put("listdir", path, [dict(entry) for entry in result])
+        return result
+
+    def iterdir(self, path: str = "/", prefetch: bool = False,
+                start_after: str | None = None) -> Iterator[dict[str, Any]]:
+        """Lazily list the contents of a directory, one page at a time.
+
+        Uses ``LISTSTATUS_BATCH`` so entries are yielded as each page
+        arrives instead of after the whole listing. The page size is set by
+        the NameNode (``dfs.ls.limit``).
+
+        :param path: path of the directory
+        :param prefetch: fetch the next page in the background while the
+            current one is being consumed
+        :param start_after: only list the entries whose name sorts after
+            this one
+        :returns: an iterator of FileStatus dicts
+        """
+        self.logger.info("Iterating %s", path)
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        try:
+            entries, remaining = self._list_batch(path, start_after)
+            while True:
+                more = bool(remaining and entries)
+                next_page = None
+                if more:
+                    start_after = entries[-1]["pathSuffix"]
+                    if executor is not None:
+                        next_page = executor.submit(
+                            self._list_batch, path, start_after
+                        )
+                yield from entries
+                if not more:
+                    return
+                if next_page is not None:
+                    entries, remaining = next_page.result()
+                else:
+                    entries, remaining = self._list_batch(path, start_after)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+    def walk(
+        self,
+        top: str = "/",
+        workers: int = 8,
+        max_depth: int | None = None,
+        detail: bool = False,
+        onerror: Callable[[WebHDFSException], None] | None = None,
+    ) -> Iterator[tuple[str, list[Any], list[Any]]]:
+        """Recursively walk a directory tree, like :func:`os.walk`.
+
+        Directories are listed breadth-first by a pool of threads and
+        each ``(dirpath, dirs, files)`` tuple is yielded as soon as its
+        listing arrives, so the order is not deterministic. As with
+        :func:`os.walk`, removing entries from ``dirs`` in place prunes
+        the walk. Walking a file yields nothing.
+
+        :param top: path of the top directory
+        :param workers: number of concurrent listings
+        :param max_depth: how many levels below ``top`` to descend; ``0``
+            lists only ``top``, ``None`` means no limit
+        :param detail: yield FileStatus dicts instead of names
+        :param onerror: called with the exception when a listing fails;
+            by default errors are ignored, as in :func:`os.walk`
+        :returns: an iterator of ``(dirpath, dirs, files)`` tuples
+        """
+        self.logger.info("Walking %s", top)
+        if workers < 1:
+            raise WebHDFSException("workers must be at least 1")
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            pending = {executor.submit(self.listdir, top): (top, 0)}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    dirpath, depth = pending.pop(future)
+                    try:
+                        entries = future.result()
+                    except WebHDFSException as exc:
+                        if onerror is not None:
+                            onerror(exc)
+                        continue
+                    if any(not e["pathSuffix"] for e in entries):
+                        # The status of a file: there is nothing to walk
+                        continue
+                    dirs = [e for e in entries if e["type"] == "DIRECTORY"]
+                    files = [e for e in entries if e["type"] != "DIRECTORY"]
+                    if not detail:
+                        dirs = [e["pathSuffix"] for e in dirs]
+                        files = [e["pathSuffix"] for e in files]
+                    yield dirpath, dirs, files
+                    if max_depth is None or depth < max_depth:
+                        # Descend into what the caller left in dirs
+                        for entry in dirs:
+                            name = entry["pathSuffix"] if detail else entry
+                            child = posixpath.join(dirpath, name)
+                            pending[executor.submit(self.listdir, child)] = (
+                                child, depth + 1
+                            )
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def glob(self, pattern: str, workers: int = 8) -> list[str]:
+        """Return the sorted list of paths matching a glob pattern.
+
+        See :meth:`iglob` for the supported syntax.
+
+        :param pattern: absolute path pattern
+        :param workers: number of concurrent requests
+        :returns: a list of matching paths
+        """
+        return sorted(self.iglob(pattern, workers=workers))
+
+    def iglob(self, pattern: str, workers: int = 8) -> Iterator[str]:
+        """Iterate over the paths matching a glob pattern.
+
+        The pattern is expanded one path component at a time with
+        :mod:`fnmatch` rules (``*``, ``?`` and ``[...]``), listing only the
+        directories that can still match. The listings of sibling
+        directories run concurrently, and when a component starts with a
+        literal prefix (as in ``2026-*``) the listing starts at that prefix
+        so the entries sorting before it are never transferred.
+
+        :param pattern: absolute path pattern, e.g.
+            ``"/data/2026-*/part-*.parquet"``
+        :param workers: number of concurrent requests
+        :returns: an iterator of matching paths, in no particular order
+        """
+        if not pattern.startswith("/"):
+            raise WebHDFSException(f"The pattern {pattern} must be absolute")
+        if workers < 1:
+            raise WebHDFSException("workers must be at least 1")
+        self.logger.info("Globbing %s", pattern)
+        parts = [part for part in pattern.split("/") if part]
+        candidates = ["/"]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for index, part in enumerate(parts):
+                last = index == len(parts) - 1
+                if any(c in part for c in GLOB_MAGIC):
+                    futures = [
+                        executor.submit(self._glob_dir, d, part, not last)
+                        for d in candidates
+                    ]
+                elif last:
+                    futures = [
+                        executor.submit(self._glob_exists,
+                                        posixpath.join(d, part))
+                        for d in candidates
+                    ]
+                else:
+                    candidates = [posixpath.join(d, part) for d in candidates]
+                    continue
+                if last:
+                    for future in as_completed(futures):
+                        yield from future.result()
+                    return
+                candidates = [
+                    path for future in futures for path in future.result()
+                ]
+                if not candidates:
+                    return
+        if not parts:
+            yield "/"
+
+    def _glob_dir(self, directory: str, part: str,
+                  dirs_only: bool) -> list[str]:
+        """Return the paths in ``directory`` whose name matches ``part``."""
+        prefix = "".join(itertools.takewhile(lambda c: c not in GLOB_MAGIC, part))
+        try:
+            if prefix:
+                # Start the listing right before the first possible match
+                # and stop at the first name past the prefix.
+                before = prefix[:-1] + chr(ord(prefix[-1]) - 1)
+                entries: Iterable[dict[str, Any]] = itertools.takewhile(
+                    lambda e: e["pathSuffix"] <= prefix
+                    or e["pathSuffix"].startswith(prefix),
+                    self.iterdir(directory, start_after=before),
+                )
+            else:
+                entries = self.listdir(directory)
+            return [
+                posixpath.join(directory, e["pathSuffix"])
+                for e in entries
+                if e["pathSuffix"]
+                and fnmatch.fnmatchcase(e["pathSuffix"], part)
+                and (not dirs_only or e["type"] == "DIRECTORY")
+            ]
+        except WebHDFSRemoteException as exc:
+            if exc.status_code == 404:
+                return []
+            raise
+
+    def _glob_exists(self, path: str) -> list[str]:
+        """Return ``[path]`` if it exists, else an empty list."""
+        try:
+            self.status(path)
+        except WebHDFSRemoteException as exc:
+            if exc.status_code == 404:
+                return []
+            raise
+        return [path]
+
+    def _list_batch(
+        self, path: str, start_after: str | None
+    ) -> tuple[list[dict[str, Any]], int]:
+        """Fetch one LISTSTATUS_BATCH page and its remaining entry count."""
+        params: dict[str, Any] = {"op": "LISTSTATUS_BATCH"}
+        if start_after is not None:
+            params["startAfter"] = start_after
+        listing = self._query(
+            method="get",
+            path=path,
+            params=params,
+            json_path=["DirectoryListing"],
+        )
+        entries = listing["partialListing"]["FileStatuses"]["FileStatus"]
+        return entries, listing.get("remainingEntries", 0)
 
     def mkdir(self, path: str, permission: str | None = None) -> bool:
         """Create a directory hierarchy, like ``mkdir -p``.
@@ -197,7 +1016,11 @@ class WebHDFSClient:
         params: dict[str, Any] = {"op": "MKDIRS"}
         if permission is not None:
             params["permission"] = permission
-        return self._query(method="put", path=path, params=params)
+        try:
+            return self._query(method="put", path=path, params=params)
+        finally:
+            # Missing parents are created too
+            self._invalidate(path, ancestors=True)
 
     def remove(self, path: str, recursive: bool = False) -> bool:
         """Delete a file or directory.
@@ -207,7 +1030,10 @@ class WebHDFSClient:
         """
         self.logger.info("Deleting %s", path)
         params: dict[str, Any] = {"op": "DELETE", "recursive": recursive}
-        return self._query(method="delete", path=path, params=params)
+        try:
+            return self._query(method="delete", path=path, params=params)
+        finally:
+            self._invalidate(path, descendants=recursive)
 
     def rename(self, src: str, dst: str) -> bool:
         """Rename a file or directory.
@@ -217,7 +1043,10 @@ class WebHDFSClient:
         """
         self.logger.info("Renaming %s", src)
         params: dict[str, Any] = {"op": "RENAME", "destination": dst}
-        return self._query(method="put", path=src, params=params)
+        try:
+            return self._query(method="put", path=src, params=params)
+        finally:
+            self._invalidate(src, dst, descendants=True)
 
     # ------------------------------------------------------------------
     # File read operations
@@ -230,16 +1059,360 @@ class WebHDFSClient:
         return self._query(method="get", path="/", params=params, json_path=["Path"])
 
     def open(self, path: str, offset: int | None = None, length: int | None = None,
-             buffersize: int | None = None) -> str:
+             buffersize: int | None = None, compression: str | None = None) -> str:
         """Open a file to read.
 
         :param path: path of the file
         :param offset: starting byte position
         :param length: number of bytes to read
         :param buffersize: size of the buffer used to transfer the data
+        :param compression: codec the file is decompressed with, see
+            :meth:`iter_bytes`; the content is then decoded as UTF-8
         :returns: the file data as text
         """
+        if self._codec(path, compression, offset, length) is not None:
+            return self.read_bytes(path, buffersize=buffersize,
+                                   compression=compression).decode("utf-8")
         self.logger.info("Opening %s", path)
+        r = self._open_response(path, offset, length, buffersize)
+        return r.text
+
+    def read_bytes(self, path: str, offset: int | None = None,
+                   length: int | None = None,
+                   buffersize: int | None = None,
+                   compression: str | None = None) -> bytes:
+        """Read a file as raw bytes, without decoding it.
+
+        :param path: path of the file
+        :param offset: starting byte position
+        :param length: number of bytes to read
+        :param buffersize: size of the buffer used to transfer the data
+        :param compression: codec the file is decompressed with, see
+            :meth:`iter_bytes`
+        :returns: the file data as bytes
+        """
+        if self._codec(path, compression, offset, length) is not None:
+            return b"".join(self.iter_bytes(path, buffersize=buffersize,
+                                            compression=compression))
+        self.logger.info("Reading bytes of %s", path)
+        r = self._open_response(path, offset, length, buffersize)
+        return r.content
+
+    def iter_bytes(self, path: str, offset: int | None = None,
+                   length: int | None = None, buffersize: int | None = None,
+                   chunk_size: int = CHUNK_SIZE,
+                   compression: str | None = None) -> Iterator[bytes]:
+        """Stream a file, yielding chunks as they arrive from the DataNode.
+
+        Only one chunk is held in memory at a time, so files of any size
+        can be read with constant memory. With ``compression`` the chunks
+        are decompressed as they arrive; offsets then refer to compressed
+        data, so ``offset`` and ``length`` can't be combined with it.
+
+        :param path: path of the file
+        :param offset: starting byte position
+        :param length: number of bytes to read
+        :param buffersize: size of the buffer used to transfer the data
+        :param chunk_size: maximum size in bytes of each yielded chunk
+        :param compression: ``"gzip"``, ``"bz2"``, ``"zstd"`` or ``"lz4"``,
+            or ``"auto"`` to pick the codec from the extension of ``path``
+            (files with other extensions are read as they are)
+        :returns: an iterator of ``bytes`` chunks
+        """
+        codec = self._codec(path, compression, offset, length)
+        if codec is not None:
+            from .compression import decompress_chunks
+
+            raw = self.iter_bytes(path, buffersize=buffersize,
+                                  chunk_size=chunk_size)
+            yield from decompress_chunks(codec, raw, chunk_size)
+            return
+        self.logger.info("Streaming %s", path)
+        r = self._open_response(path, offset, length, buffersize, stream=True)
+        received = 0
+        # Bytes received of the current response, which restarts on resume
+        resumed_at = 0
+        attempt = 1
+        try:
+            while True:
+                try:
+                    for chunk in r.iter_content(chunk_size=chunk_size):
+                        received += len(chunk)
+                        yield chunk
+                    return
+                except (requests.ConnectionError,
+                        requests.exceptions.ChunkedEncodingError) as exc:
+                    error = WebHDFSConnectionError(
+                        f"Connection lost while reading {path}", cause=exc
+                    )
+                    if self.retry is None or not self.retry.should_retry(
+                        "OPEN", error, attempt
+                    ):
+                        raise error from exc
+                    # Resume from the last byte received instead of restarting
+                    delay = self.retry.delay(attempt)
+                    self.logger.warning(
+                        "Reading %s interrupted at byte %d, resuming in %.2fs",
+                        path, received, delay,
+                    )
+                    time.sleep(delay)
+                    attempt += 1
+                    self.metrics.count_retry("OPEN")
+                    r.close()
+                    self._record_stream(r, received - resumed_at)
+                    resumed_at = received
+                    r = self._open_response(
+                        path,
+                        (offset or 0) + received,
+                        None if length is None else length - received,
+                        buffersize,
+                        stream=True,
+                    )
+        finally:
+            r.close()
+            self._record_stream(r, received - resumed_at)
+            self.metrics.count_bytes("OPEN", received=received)
+
+    def iter_lines(self, path: str, encoding: str | None = "utf-8",
+                   delimiter: bytes = b"\n", errors: str = "strict",
+                   offset: int | None = None, length: int | None = None,
+                   chunk_size: int = CHUNK_SIZE,
+                   compression: str | None = None) -> Iterator[Any]:
+        """Stream a text file, yielding one record at a time.
+
+        Records are split on ``delimiter`` as chunks arrive and decoded
+        one by one, so multibyte characters split across chunks are
+        decoded whole and memory holds only the current chunk and record.
+        Encodings that aren't ASCII compatible, such as UTF-16, are
+        decoded incrementally before splitting instead, and their
+        ``delimiter`` must be ASCII text.
+
+        :param path: path of the file
+        :param encoding: encoding of the records, ``None`` yields ``bytes``
+        :param delimiter: bytes separating records, removed from them
+        :param errors: how decoding errors are handled, see :meth:`bytes.decode`
+        :param offset: starting byte position
+        :param length: number of bytes to read
+        :param chunk_size: size in bytes of the chunks read
+        :param compression: codec the file is decompressed with, see
+            :meth:`iter_bytes`
+        :returns: an iterator of ``str`` records, or ``bytes`` records
+            without ``encoding``
+        """
+        if not delimiter:
+            raise WebHDFSException("delimiter can't be empty")
+        if encoding is not None and not _ascii_compatible(encoding):
+            try:
+                delimiter.decode("ascii")
+            except UnicodeDecodeError:
+                raise WebHDFSException(
+                    f"The delimiter of {encoding} text must be ASCII"
+                ) from None
+        chunks = self.iter_bytes(path, offset, length, chunk_size=chunk_size,
+                                 compression=compression)
+        if encoding is None:
+            return _split_records(chunks, delimiter)
+        if not _ascii_compatible(encoding):
+            # The delimiter bytes may occur inside characters, so decode
+            # first and split the text, re-encoded as UTF-8
+            chunks = _transcode(chunks, encoding, errors)
+            encoding, errors = "utf-8", "surrogatepass"
+        return (record.decode(encoding, errors)
+                for record in _split_records(chunks, delimiter))
+
+    def open_file(self, path: str,
+                  read_ahead: int = READ_AHEAD_SIZE) -> WebHDFSFile:
+        """Open a file as a seekable, read-only binary file object.
+
+        Reads are served from a read-ahead window fetched with ranged
+        ``OPEN`` requests, so only the parts of the file that are actually
+        read are transferred.
+
+        :param path: path of the file
+        :param read_ahead: size in bytes of each ranged request
+        :returns: a :class:`WebHDFSFile`
+        """
+        self.logger.info("Opening file object for %s", path)
+        return WebHDFSFile(self, path, read_ahead=read_ahead)
+
+    def copytolocal(self, hdfs_path: str, local_path: str, workers: int = 4,
+                    chunk_size: int = TRANSFER_CHUNK_SIZE) -> bool:
+        """Download a file from HDFS to the local filesystem.
+
+        The file is split into byte ranges of ``chunk_size`` that are
+        fetched concurrently and written in place into a preallocated
+        local file.
+
+        :param hdfs_path: path of the HDFS file
+        :param local_path: local destination path
+        :param workers: number of concurrent range downloads
+        :param chunk_size: size in bytes of each range
+        """
+        self.logger.info("Copying %s to local file %s", hdfs_path, local_path)
+        if workers < 1:
+            raise WebHDFSException("workers must be at least 1")
+        if chunk_size <= 0:
+            raise WebHDFSException("chunk_size must be a positive number")
+        length = self.status(hdfs_path)["length"]
+        with open(local_path, "wb") as writer:
+            writer.truncate(length)
+        ranges = [
+            (offset, min(chunk_size, length - offset))
+            for offset in range(0, length, chunk_size)
+        ]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(self._download_range, hdfs_path, local_path,
+                            offset, size)
+                for offset, size in ranges
+            ]
+            for future in futures:
+                future.result()
+        return True
+
+    def _download_range(self, hdfs_path: str, local_path: str, offset: int,
+                        length: int) -> None:
+        """Write ``length`` bytes at ``offset`` of an HDFS file to disk."""
+        received = 0
+        with open(local_path, "r+b") as writer:
+            writer.seek(offset)
+            for chunk in self.iter_bytes(hdfs_path, offset=offset,
+                                         length=length):
+                writer.write(chunk)
+                received += len(chunk)
+        if received != length:
+            raise WebHDFSException(
+                f"Short read of {hdfs_path} at offset {offset}: "
+                f"expected {length} bytes, got {received}"
+            )
+
+    def map_splits(
+        self,
+        path: str,
+        func: Callable[[Iterator[Any]], T],
+        workers: int | None = None,
+        split_size: int = SPLIT_SIZE,
+        encoding: str | None = "utf-8",
+        delimiter: bytes = b"\n",
+        probe_size: int = CHUNK_SIZE,
+    ) -> list[T]:
+        """Process a large text file in parallel worker processes.
+
+        The file is cut into splits of about ``split_size`` bytes whose
+        boundaries are moved forward to the next record start, found with
+        small ranged reads, as Hadoop's ``TextInputFormat`` does. Each
+        split is then streamed by a separate process with its own client
+        and passed to ``func`` as an iterator of records (see
+        :meth:`iter_lines`), so CPU-bound parsing uses every core.
+
+        ``func`` and its results must be picklable, e.g. ``func`` must be
+        a module-level function.
+
+        :param path: path of the file
+        :param func: called with the records of one split
+        :param workers: number of processes, the number of CPUs by default
+        :param split_size: approximate size in bytes of each split
+        :param encoding: encoding of the records, ``None`` passes ``bytes``;
+            it must be ASCII compatible, such as UTF-8
+        :param delimiter: bytes separating records
+        :param probe_size: bytes read by each probe for a record start
+        :returns: the results of ``func``, in the order of the splits
+        """
+        self.logger.info("Mapping splits of %s", path)
+        if workers is not None and workers < 1:
+            raise WebHDFSException("workers must be at least 1")
+        if split_size <= 0 or probe_size <= 0:
+            raise WebHDFSException("split_size and probe_size must be positive")
+        if not delimiter:
+            raise WebHDFSException("delimiter can't be empty")
+        if encoding is not None and not _ascii_compatible(encoding):
+            # Split boundaries are found by searching the delimiter bytes
+            raise WebHDFSException(
+                f"map_splits can't split {encoding} text, use an "
+                f"ASCII-compatible encoding"
+            )
+        splits = self._input_splits(path, split_size, delimiter, probe_size,
+                                    workers or os.cpu_count() or 1)
+        config = self._process_config()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_map_split, config, path, start, end, func,
+                            encoding, delimiter)
+                for start, end in splits
+            ]
+            return [future.result() for future in futures]
+
+    def _input_splits(self, path: str, split_size: int, delimiter: bytes,
+                      probe_size: int, workers: int) -> list[tuple[int, int]]:
+        """Cut a file into ``(start, end)`` ranges starting at records."""
+        length = self.status(path)["length"]
+        if not length:
+            return []
+        nominal = range(split_size, length, split_size)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            starts = pool.map(
+                lambda position: self._record_start(
+                    path, position, length, delimiter, probe_size
+                ),
+                nominal,
+            )
+            # A record longer than a split moves several boundaries to the
+            # same record start
+            bounds = sorted({0, *(s for s in starts if s < length)})
+        return list(zip(bounds, bounds[1:] + [length]))
+
+    def _record_start(self, path: str, position: int, length: int,
+                      delimiter: bytes, probe_size: int) -> int:
+        """Return where the first record at or after ``position`` starts."""
+        # A record starts right after a delimiter ending at or after position
+        offset = max(position - len(delimiter), 0)
+        tail = b""
+        while offset < length:
+            data = self.read_bytes(path, offset=offset,
+                                   length=min(probe_size, length - offset))
+            if not data:
+                break
+            probe = tail + data
+            index = probe.find(delimiter)
+            if index >= 0:
+                return offset - len(tail) + index + len(delimiter)
+            # Keep what could be the start of a delimiter cut by the probe
+            tail = probe[max(len(probe) - len(delimiter) + 1, 0):]
+            offset += len(data)
+        return length
+
+    def _process_config(self) -> dict[str, Any]:
+        """Return the arguments of an equivalent client in another process."""
+        namenodes = self.namenodes[self._active:] + self.namenodes[:self._active]
+        return {
+            "host": [f"{host}:{port}" for host, port in namenodes],
+            "port": self.port,
+            "username": self.username,
+            "timeout": self.timeout,
+            "scheme": self.scheme,
+            "retry": self.retry,
+        }
+
+    def _codec(self, path: str, compression: str | None,
+               offset: int | None = None,
+               length: int | None = None) -> Codec | None:
+        """Return the codec selected by ``compression`` for ``path``."""
+        if compression is None:
+            return None
+        # Imported here because the compression module depends on this one
+        from .compression import get_codec
+
+        codec = get_codec(path, compression)
+        if codec is not None and (offset is not None or length is not None):
+            raise WebHDFSException(
+                "offset and length can't be used with compression"
+            )
+        return codec
+
+    def _open_response(self, path: str, offset: int | None,
+                       length: int | None, buffersize: int | None,
+                       stream: bool = False) -> requests.Response:
+        """Send an OPEN request, following the DataNode redirect."""
         params: dict[str, Any] = {"op": "OPEN"}
         if offset is not None:
             params["offset"] = offset
@@ -247,10 +1420,8 @@ class WebHDFSClient:
             params["length"] = length
         if buffersize is not None:
             params["buffersize"] = buffersize
-        r = self._make_request(method="get", path=path, params=params,
-                               allow_redirects=True)
-        self._check_response(r)
-        return r.text
+        return self._request(method="get", path=path, params=params,
+                             allow_redirects=True, stream=stream)
 
     def status(self, path: str) -> dict[str, Any]:
         """Return the FileStatus of a file or directory.
@@ -258,15 +1429,22 @@ class WebHDFSClient:
         :param path: path of the file/dir
         :returns: a FileStatus dictionary
         """
+        if self._cache is not None:
+            cached = self._cache.get("status", path)
+            if cached is not None:
+                return dict(cached)
         self.logger.info("Getting status of %s", path)
         params: dict[str, Any] = {"op": "GETFILESTATUS"}
-        return self._query(
+        result = self._query(
             method="get",
             path=path,
             params=params,
             json_path=["FileStatus"],
             allow_redirects=True,
         )
+        if self._cache is not None:
+            self._cache.put("status", path, dict(result))
+        return result
 
     def get_checksum(self, path: str) -> dict[str, Any]:
         """Return the checksum of a file.
@@ -276,21 +1454,45 @@ class WebHDFSClient:
         """
         self.logger.info("Getting checksum of %s", path)
         params: dict[str, Any] = {"op": "GETFILECHECKSUM"}
-        r = self._make_request(method="get", path=path, params=params)
-        self._check_response(r, {307})
-        location = r.headers.get("location")
-        if not location:
-            raise WebHDFSException(
-                "NameNode did not return a redirect for GETFILECHECKSUM"
-            )
-        try:
-            r = self._session.get(location, timeout=self.timeout)
-        except requests.ConnectionError as exc:
-            raise WebHDFSConnectionError(
-                "Failed to connect to DataNode for checksum", cause=exc
-            ) from exc
-        self._check_response(r)
-        return r.json()["FileChecksum"]
+
+        def attempt() -> dict[str, Any]:
+            r = self._failover_request("get", path, params, False, {307},
+                                       False, True)
+            location = r.headers.get("location")
+            if not location:
+                raise WebHDFSException(
+                    "NameNode did not return a redirect for GETFILECHECKSUM"
+                )
+            r = self._datanode_request("GETFILECHECKSUM", path, "get",
+                                       location)
+            self._check_datanode_response("GETFILECHECKSUM", r)
+            return r.json()["FileChecksum"]
+
+        return self._retry("GETFILECHECKSUM", attempt)
+
+    def verify(self, local_path: str, hdfs_path: str, workers: int = 1) -> bool:
+        """Check that a local file has the same content as an HDFS file.
+
+        The HDFS checksum of the local file is computed locally and
+        compared with the one returned by the cluster, so the HDFS file is
+        never downloaded.
+
+        :param local_path: path of the local file
+        :param hdfs_path: path of the HDFS file
+        :param workers: number of processes hashing blocks in parallel
+        :returns: ``True`` if both files have the same content
+        """
+        # Imported here because the checksum module depends on this one
+        from .checksum import file_checksum
+
+        self.logger.info("Verifying %s against %s", local_path, hdfs_path)
+        if not os.path.exists(local_path):
+            raise WebHDFSException(f"The local file {local_path} doesn't exist")
+        if self.status(hdfs_path)["length"] != os.path.getsize(local_path):
+            return False
+        remote = self.get_checksum(hdfs_path)
+        local = file_checksum(local_path, remote["algorithm"], workers=workers)
+        return local["bytes"] == remote["bytes"]
 
     def get_content_summary(self, path: str) -> dict[str, Any]:
         """Return the content summary of a directory.
@@ -311,7 +1513,8 @@ class WebHDFSClient:
     # File write operations
     # ------------------------------------------------------------------
 
-    def create(self, path: str, file_data: Any, overwrite: bool | None = None) -> bool:
+    def create(self, path: str, file_data: Any, overwrite: bool | None = None,
+               compression: str | None = None) -> bool:
         """Create a new file in HDFS.
 
         Uses the two-step WebHDFS create protocol (NameNode redirect then
@@ -320,76 +1523,487 @@ class WebHDFSClient:
         :param path: the file path to create
         :param file_data: the data to write
         :param overwrite: whether to overwrite an existing file
+        :param compression: ``"gzip"``, ``"bz2"``, ``"zstd"`` or ``"lz4"``
+            to compress the data while it is uploaded, or ``"auto"`` to
+            pick the codec from the extension of ``path``
         """
         self.logger.info("Creating %s", path)
+        file_data = self._compress(path, file_data, compression)
+        location = self._create_location(path, overwrite)
+        self._upload_create(path, location, file_data)
+        return True
+
+    def create_many(
+        self,
+        files: Iterable[tuple[str, Any]],
+        overwrite: bool | None = None,
+        prefetch: int = 1,
+    ) -> dict[str, bool | Exception]:
+        """Create many files, overlapping NameNode and DataNode requests.
+
+        While a file is uploaded to its DataNode, the DataNode location of
+        the next ``prefetch`` files is already requested from the NameNode
+        (with ``noredirect=true`` where supported), which hides most of the
+        NameNode round-trip when writing many small files. Failures don't
+        abort the batch; they are reported in the result instead.
+
+        :param files: ``(path, file_data)`` pairs
+        :param overwrite: whether to overwrite existing files
+        :param prefetch: number of redirects requested ahead of the upload
+        :returns: a dict mapping each path to ``True`` or the exception
+            raised for it
+        """
+        if prefetch < 1:
+            raise WebHDFSException("prefetch must be at least 1")
+        self.logger.info("Creating files with %d prefetched redirects", prefetch)
+        items = iter(files)
+        queue: deque[tuple[str, Any, Future[str]]] = deque()
+        results: dict[str, bool | Exception] = {}
+        with ThreadPoolExecutor(max_workers=prefetch) as lookups:
+
+            def fill() -> None:
+                while len(queue) < prefetch:
+                    item = next(items, None)
+                    if item is None:
+                        return
+                    path, file_data = item
+                    future = lookups.submit(
+                        self._create_location, path, overwrite, True
+                    )
+                    queue.append((path, file_data, future))
+
+            fill()
+            while queue:
+                path, file_data, future = queue.popleft()
+                fill()
+                try:
+                    self._upload_create(path, future.result(), file_data)
+                    results[path] = True
+                except (WebHDFSException, OSError) as exc:
+                    results[path] = exc
+        return results
+
+    def _create_location(self, path: str, overwrite: bool | None,
+                         noredirect: bool = False) -> str:
+        """Ask the NameNode for the DataNode URL to upload a new file to."""
         params: dict[str, Any] = {"op": "CREATE"}
         if overwrite is not None:
             params["overwrite"] = overwrite
-        r = self._make_request(method="put", path=path, params=params,
-                               allow_redirects=False)
-        self._check_response(r, {307})
+        if noredirect:
+            params["noredirect"] = "true"
+        # The NameNode step only returns a redirect, so it is always safe
+        # to retry; the DataNode upload is not.
+        r = self._request(method="put", path=path, params=params,
+                          expected_status={200, 307} if noredirect else {307},
+                          idempotent=True)
         location = r.headers.get("location")
+        if not location and r.status_code == 200:
+            # Servers honouring noredirect return the location in the body
+            location = r.json().get("Location")
         if not location:
             raise WebHDFSException("NameNode did not return a redirect for CREATE")
+        return location
+
+    def _compress(self, path: str, file_data: Any,
+                  compression: str | None) -> Any:
+        """Wrap upload data in a compressing stream if a codec is selected."""
+        codec = self._codec(path, compression)
+        if codec is None:
+            return file_data
+        from .compression import compress_chunks, iter_source
+
+        # A generator body is sent with chunked transfer encoding
+        return compress_chunks(codec, iter_source(file_data))
+
+    def _upload_create(self, path: str, location: str, file_data: Any) -> None:
+        """Upload the content of a new file to its DataNode location."""
         try:
-            r = self._session.put(
-                location,
-                data=file_data,
+            r = self._datanode_request(
+                "CREATE", path, "put", location, data=file_data,
                 headers={"content-type": "application/octet-stream"},
-                timeout=self.timeout,
             )
-        except requests.ConnectionError as exc:
-            raise WebHDFSConnectionError(
-                "Failed to connect to DataNode for create", cause=exc
-            ) from exc
-        self._check_response(r, {201})
-        return True
+        finally:
+            self._invalidate(path, ancestors=True)
+        self._check_datanode_response("CREATE", r, {201})
 
     def copyfromlocal(
-        self, local_path: str, hdfs_path: str, overwrite: bool | None = None
+        self,
+        local_path: str,
+        hdfs_path: str,
+        overwrite: bool | None = None,
+        *,
+        resumable: bool = False,
+        chunk_size: int = TRANSFER_CHUNK_SIZE,
+        max_resumes: int = 3,
     ) -> bool:
         """Copy a file from the local filesystem to HDFS.
 
+        In resumable mode the file is written as a ``CREATE`` of the first
+        chunk followed by ``APPEND`` chunks. When a DataNode connection
+        fails, or the file is still held by the lease of the failed write,
+        the upload waits with the backoff of the client's retry policy,
+        reads the committed length back with :meth:`status` and continues
+        from there, so at most one chunk is resent.
+
         :param local_path: path of the local file
         :param hdfs_path: HDFS destination path
         :param overwrite: whether to overwrite an existing file
+        :param resumable: upload in chunks and resume after failures
+        :param chunk_size: size in bytes of each chunk in resumable mode
+        :param max_resumes: number of failures tolerated in resumable mode
         """
         self.logger.info("Copying local file %s to %s", local_path, hdfs_path)
         if not os.path.exists(local_path):
             raise WebHDFSException(f"The local file {local_path} doesn't exist")
         with open(local_path, "rb") as reader:
+            if resumable:
+                return self._upload_resumable(
+                    reader, os.path.getsize(local_path), hdfs_path,
+                    overwrite, chunk_size, max_resumes,
+                )
             return self.create(hdfs_path, reader, overwrite=overwrite)
 
+    def _upload_resumable(
+        self,
+        reader: Any,
+        size: int,
+        hdfs_path: str,
+        overwrite: bool | None,
+        chunk_size: int,
+        max_resumes: int,
+    ) -> bool:
+        """Upload a seekable file with CREATE + APPEND chunks."""
+        if chunk_size <= 0:
+            raise WebHDFSException("chunk_size must be a positive number")
+        retry = self.retry or RetryPolicy()
+        created = False
+        committed = 0
+        failures = 0
+        resumed = False
+        while not created or committed < size:
+            reader.seek(committed)
+            chunk = reader.read(chunk_size)
+            try:
+                if created:
+                    self.append(hdfs_path, chunk)
+                else:
+                    self.create(hdfs_path, chunk, overwrite=overwrite)
+                    created = True
+                committed += len(chunk)
+                if resumed:
+                    # A length read before the lease was recovered misses
+                    # the last partial block, which would now be duplicated
+                    length = self.status(hdfs_path)["length"]
+                    if length != committed:
+                        raise WebHDFSException(
+                            f"Upload of {hdfs_path} resumed at the wrong "
+                            f"offset: {length} bytes written, {committed} "
+                            f"expected"
+                        )
+                    resumed = False
+            except (WebHDFSConnectionError, WebHDFSRemoteException) as exc:
+                if (isinstance(exc, WebHDFSRemoteException)
+                        and exc.java_class_name not in LEASE_EXCEPTIONS):
+                    raise
+                failures += 1
+                if failures > max_resumes:
+                    raise
+                time.sleep(retry.delay(failures))
+                resumed = True
+                try:
+                    committed = self.status(hdfs_path)["length"]
+                    created = True
+                except WebHDFSRemoteException as exc:
+                    if exc.status_code != 404:
+                        raise
+                    created = False
+                    committed = 0
+                self.logger.warning(
+                    "Upload of %s interrupted, resuming at byte %d",
+                    hdfs_path, committed,
+                )
+        return True
+
+    def put_tree(
+        self,
+        local_dir: str,
+        hdfs_dir: str,
+        workers: int = 4,
+        overwrite: bool | None = None,
+    ) -> dict[str, bool | Exception]:
+        """Recursively upload a local directory to HDFS.
+
+        Directories are created first, with one ``MKDIRS`` per leaf
+        directory since ``MKDIRS`` also creates the missing parents. Files
+        are then uploaded concurrently. Failures don't abort the upload;
+        they are reported in the result instead.
+
+        :param local_dir: path of the local directory
+        :param hdfs_dir: HDFS destination directory
+        :param workers: number of concurrent requests
+        :param overwrite: whether to overwrite existing files
+        :returns: a dict mapping each HDFS path to ``True`` or the
+            exception raised for it
+        """
+        self.logger.info("Copying local tree %s to %s", local_dir, hdfs_dir)
+        if not os.path.isdir(local_dir):
+            raise WebHDFSException(f"The local directory {local_dir} doesn't exist")
+        if workers < 1:
+            raise WebHDFSException("workers must be at least 1")
+        leaf_dirs = []
+        files = []
+        for root, dirs, filenames in os.walk(local_dir):
+            rel = os.path.relpath(root, local_dir)
+            target = hdfs_dir if rel == os.curdir else posixpath.join(
+                hdfs_dir, *rel.split(os.sep)
+            )
+            if not dirs:
+                leaf_dirs.append(target)
+            for name in filenames:
+                files.append((os.path.join(root, name),
+                              posixpath.join(target, name)))
+
+        results: dict[str, bool | Exception] = {}
+
+        def run(func: Any, hdfs_path: str, *args: Any) -> None:
+            try:
+                results[hdfs_path] = func(*args)
+            except (WebHDFSException, OSError) as exc:
+                results[hdfs_path] = exc
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for future in [pool.submit(run, self.mkdir, d, d)
+                           for d in leaf_dirs]:
+                future.result()
+            for future in [pool.submit(run, self.copyfromlocal, dst, src, dst,
+                                       overwrite)
+                           for src, dst in files]:
+                future.result()
+        return results
+
+    def sync(
+        self,
+        local_dir: str,
+        hdfs_dir: str,
+        direction: str = "upload",
+        delete: bool = False,
+        workers: int = 4,
+        checksum: bool = False,
+    ) -> dict[str, str | Exception]:
+        """Incrementally synchronize a local directory with an HDFS directory.
+
+        Files are compared by size and modification time and only new or
+        changed files are transferred. The modification time of every
+        transferred file is copied to the destination so the next run sees
+        it as up to date.
+
+        :param local_dir: path of the local directory
+        :param hdfs_dir: path of the HDFS directory
+        :param direction: ``"upload"`` to make HDFS match the local
+            directory, ``"download"`` for the opposite
+        :param delete: delete destination entries missing from the source,
+            or of another type, before transferring
+        :param workers: number of concurrent transfers
+        :param checksum: when only the modification time differs, compare
+            checksums with :meth:`verify` and just copy the modification
+            time if the contents are identical
+        :returns: a dict mapping each relative path to the action taken
+            (``"upload"``, ``"download"``, ``"delete"``, ``"touch"`` or
+            ``"skip"``) or the exception raised for it
+        """
+        if direction not in ("upload", "download"):
+            raise WebHDFSException(f"Invalid sync direction {direction!r}")
+        if workers < 1:
+            raise WebHDFSException("workers must be at least 1")
+        self.logger.info("Syncing %s with %s (%s)", local_dir, hdfs_dir,
+                         direction)
+        if direction == "upload" and not os.path.isdir(local_dir):
+            raise WebHDFSException(f"The local directory {local_dir} doesn't exist")
+        if direction == "download":
+            # Fail early instead of treating a missing source as empty
+            self.status(hdfs_dir)
+        local_files, local_dirs = self._local_tree(local_dir)
+        remote_files, remote_dirs = self._remote_tree(hdfs_dir)
+        if direction == "upload":
+            source, target = local_files, remote_files
+            target_dirs, source_dirs = remote_dirs, local_dirs
+        else:
+            source, target = remote_files, local_files
+            target_dirs, source_dirs = local_dirs, remote_dirs
+
+        tasks: dict[str, tuple[str, Callable[[], Any] | None]] = {}
+        for rel, (size, mtime) in source.items():
+            local_path = os.path.join(local_dir, *rel.split("/"))
+            hdfs_path = posixpath.join(hdfs_dir, rel)
+            if target.get(rel) == (size, mtime):
+                tasks[rel] = ("skip", None)
+            elif checksum and target.get(rel, (None,))[0] == size:
+                tasks[rel] = (direction, functools.partial(
+                    self._sync_verified, direction, local_path, hdfs_path,
+                    mtime,
+                ))
+            elif direction == "upload":
+                tasks[rel] = ("upload", functools.partial(
+                    self._sync_upload, local_path, hdfs_path, mtime
+                ))
+            else:
+                tasks[rel] = ("download", functools.partial(
+                    self._sync_download, hdfs_path, local_path, mtime
+                ))
+        deletes: dict[str, Callable[[], Any]] = {}
+        if delete:
+            missing_dirs = target_dirs - source_dirs
+            # Only delete the topmost stale directories, recursively
+            stale_dirs = {d for d in missing_dirs
+                          if posixpath.dirname(d) not in missing_dirs}
+            stale_files = [
+                rel for rel in target if rel not in source
+                and posixpath.dirname(rel) not in missing_dirs
+            ]
+            for rel in sorted(stale_dirs) + stale_files:
+                if direction == "upload":
+                    remove = functools.partial(
+                        self.remove, posixpath.join(hdfs_dir, rel), True
+                    )
+                else:
+                    remove = functools.partial(
+                        _remove_local, os.path.join(local_dir, *rel.split("/"))
+                    )
+                deletes[rel] = remove
+
+        results: dict[str, str | Exception] = {}
+
+        def run(rel: str, action: str, task: Callable[[], Any] | None) -> None:
+            try:
+                outcome = task() if task is not None else None
+                # Checksum-verified tasks report whether they transferred
+                results[rel] = outcome if isinstance(outcome, str) else action
+            except (WebHDFSException, OSError) as exc:
+                results[rel] = exc
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # Deletions go first: a transferred entry may replace a
+            # deleted one, e.g. a file a directory of the same name
+            for future in [pool.submit(run, rel, "delete", remove)
+                           for rel, remove in deletes.items()]:
+                future.result()
+            for future in [pool.submit(run, rel, action, task)
+                           for rel, (action, task) in tasks.items()
+                           if not isinstance(results.get(rel), Exception)]:
+                future.result()
+        return results
+
+    def _sync_verified(self, direction: str, local_path: str, hdfs_path: str,
+                       mtime: int) -> str:
+        """Copy only the mtime if the checksums match, else transfer."""
+        if not self.verify(local_path, hdfs_path):
+            if direction == "upload":
+                self._sync_upload(local_path, hdfs_path, mtime)
+            else:
+                self._sync_download(hdfs_path, local_path, mtime)
+            return direction
+        if direction == "upload":
+            self.set_times(hdfs_path, modificationtime=mtime)
+        else:
+            os.utime(local_path, ns=(time.time_ns(), mtime * 1_000_000))
+        return "touch"
+
+    def _sync_upload(self, local_path: str, hdfs_path: str, mtime: int) -> None:
+        self.copyfromlocal(local_path, hdfs_path, overwrite=True)
+        self.set_times(hdfs_path, modificationtime=mtime)
+
+    def _sync_download(self, hdfs_path: str, local_path: str, mtime: int) -> None:
+        os.makedirs(os.path.dirname(local_path), exist_ok=True)
+        self.copytolocal(hdfs_path, local_path, workers=1)
+        os.utime(local_path, ns=(time.time_ns(), mtime * 1_000_000))
+
+    @staticmethod
+    def _local_tree(
+        local_dir: str,
+    ) -> tuple[dict[str, tuple[int, int]], set[str]]:
+        """Return ``{relpath: (size, mtime_ms)}`` and the relative dirs."""
+        files = {}
+        dirs = set()
+        for root, dirnames, filenames in os.walk(local_dir):
+            rel_root = os.path.relpath(root, local_dir)
+            parts = [] if rel_root == os.curdir else rel_root.split(os.sep)
+            for name in dirnames:
+                dirs.add("/".join(parts + [name]))
+            for name in filenames:
+                st = os.stat(os.path.join(root, name))
+                files["/".join(parts + [name])] = (
+                    st.st_size, st.st_mtime_ns // 1_000_000
+                )
+        return files, dirs
+
+    def _remote_tree(
+        self, hdfs_dir: str,
+    ) -> tuple[dict[str, tuple[int, int]], set[str]]:
+        """Return ``{relpath: (length, mtime_ms)}`` and the relative dirs."""
+        files = {}
+        dirs = set()
+
+        def onerror(exc: WebHDFSException) -> None:
+            if not isinstance(exc, WebHDFSRemoteException) or exc.status_code != 404:
+                raise exc
+
+        for dirpath, dirnames, filenames in self.walk(
+            hdfs_dir, detail=True, onerror=onerror
+        ):
+            rel_root = posixpath.relpath(dirpath, hdfs_dir)
+            prefix = "" if rel_root == posixpath.curdir else rel_root + "/"
+            for status in dirnames:
+                dirs.add(prefix + status["pathSuffix"])
+            for status in filenames:
+                files[prefix + status["pathSuffix"]] = (
+                    status["length"], status["modificationTime"]
+                )
+        return files, dirs
+
     def append(self, path: str, file_data: Any,
-               buffersize: int | None = None) -> bool:
+               buffersize: int | None = None,
+               compression: str | None = None) -> bool:
         """Append data to a file.
 
         :param path: path of the file
         :param file_data: data to append
         :param buffersize: size of the buffer used to transfer the data
+        :param compression: codec the data is compressed with, see
+            :meth:`create`; it is appended as a new compressed stream,
+            which readers decode after the previous ones
         """
         self.logger.info("Appending to file %s", path)
+        file_data = self._compress(path, file_data, compression)
         params: dict[str, Any] = {"op": "APPEND"}
         if buffersize is not None:
             params["buffersize"] = buffersize
-        r = self._make_request(method="post", path=path, params=params)
-        self._check_response(r, {307})
+        r = self._request(method="post", path=path, params=params,
+                          expected_status={307}, idempotent=True)
         location = r.headers.get("location")
         if not location:
             raise WebHDFSException("NameNode did not return a redirect for APPEND")
         try:
-            r = self._session.post(
-                location,
-                data=file_data,
-                timeout=self.timeout,
-            )
-        except requests.ConnectionError as exc:
-            raise WebHDFSConnectionError(
-                "Failed to connect to DataNode for append", cause=exc
-            ) from exc
-        self._check_response(r)
+            r = self._datanode_request("APPEND", path, "post", location,
+                                       data=file_data)
+        finally:
+            self._invalidate(path)
+        self._check_datanode_response("APPEND", r)
         return True
 
+    def concat(self, path: str, sources: Sequence[str]) -> bool:
+        """Concatenate files into a target file, deleting the sources.
+
+        :param path: path of the target file
+        :param sources: paths of the files appended to it, in order
+        """
+        self.logger.info("Concatenating %d files into %s", len(sources), path)
+        params: dict[str, Any] = {"op": "CONCAT", "sources": ",".join(sources)}
+        try:
+            return self._query(method="post", path=path, json_path=[],
+                               params=params)
+        finally:
+            self._invalidate(path, *sources)
+
     # ------------------------------------------------------------------
     # Permission / ownership operations
     # ------------------------------------------------------------------
@@ -402,7 +2016,11 @@ class WebHDFSClient:
         """
         self.logger.info("Setting permissions of %s to %s", path, permission)
         params: dict[str, Any] = {"op": "SETPERMISSION", "permission": permission}
-        return self._query(method="put", path=path, json_path=[], params=params)
+        try:
+            return self._query(method="put", path=path, json_path=[],
+                               params=params)
+        finally:
+            self._invalidate(path)
 
     def set_owner(
         self,
@@ -424,7 +2042,11 @@ class WebHDFSClient:
             params["owner"] = owner
         if group is not None:
             params["group"] = group
-        return self._query(method="put", path=path, json_path=[], params=params)
+        try:
+            return self._query(method="put", path=path, json_path=[],
+                               params=params)
+        finally:
+            self._invalidate(path)
 
     def set_replication(self, path: str, replication_factor: int) -> bool:
         """Set the replication factor of a file.
@@ -439,7 +2061,10 @@ class WebHDFSClient:
             "op": "SETREPLICATION",
             "replication": replication_factor,
         }
-        return self._query(method="put", path=path, params=params)
+        try:
+            return self._query(method="put", path=path, params=params)
+        finally:
+            self._invalidate(path)
 
     def set_times(
         self,
@@ -459,7 +2084,180 @@ class WebHDFSClient:
             params["modificationtime"] = modificationtime
         if accesstime is not None:
             params["accesstime"] = accesstime
-        return self._query(method="put", path=path, json_path=[], params=params)
+        try:
+            return self._query(method="put", path=path, json_path=[],
+                               params=params)
+        finally:
+            self._invalidate(path)
+
+    # ------------------------------------------------------------------
+    # Batch operations
+    # ------------------------------------------------------------------
+
+    def _map_paths(
+        self,
+        func: Callable[..., T],
+        items: Iterable[Any],
+        workers: int,
+    ) -> dict[str, T | Exception]:
+        """Apply ``func`` to many paths concurrently.
+
+        ``items`` are paths, or tuples whose first element is the path,
+        passed as the arguments of ``func``. At most ``2 * workers``
+        requests are queued at a time so very large, lazily produced
+        batches don't pile up in memory.
+        """
+        if workers < 1:
+            raise WebHDFSException("workers must be at least 1")
+        results: dict[str, T | Exception] = {}
+        pending: dict[Future[T], str] = {}
+
+        def collect(done: Iterable[Future[T]]) -> None:
+            for future in done:
+                path = pending.pop(future)
+                try:
+                    results[path] = future.result()
+                except WebHDFSException as exc:
+                    results[path] = exc
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for item in items:
+                args = item if isinstance(item, tuple) else (item,)
+                pending[pool.submit(func, *args)] = args[0]
+                if len(pending) >= 2 * workers:
+                    collect(wait(pending, return_when=FIRST_COMPLETED).done)
+            collect(list(pending))
+        return results
+
+    def remove_many(self, paths: Iterable[str], recursive: bool = False,
+                    workers: int = 8) -> dict[str, bool | Exception]:
+        """Delete many files or directories concurrently.
+
+        :param paths: paths of the files or dirs to delete
+        :param recursive: delete content in subdirectories
+        :param workers: number of concurrent requests
+        :returns: a dict mapping each path to the result of :meth:`remove`
+            or the exception raised for it
+        """
+        return self._map_paths(
+            lambda path: self.remove(path, recursive), paths, workers
+        )
+
+    def rename_many(self, renames: Iterable[tuple[str, str]],
+                    workers: int = 8) -> dict[str, bool | Exception]:
+        """Rename many files or directories concurrently.
+
+        :param renames: ``(src, dst)`` pairs
+        :param workers: number of concurrent requests
+        :returns: a dict mapping each source path to the result of
+            :meth:`rename` or the exception raised for it
+        """
+        return self._map_paths(self.rename, renames, workers)
+
+    def chmod_many(self, paths: Iterable[str], permission: str,
+                   workers: int = 8) -> dict[str, bool | Exception]:
+        """Set the permissions of many files or directories concurrently.
+
+        :param paths: paths of the files/dirs
+        :param permission: permissions in octal (e.g. ``"755"``)
+        :param workers: number of concurrent requests
+        :returns: a dict mapping each path to the result of :meth:`chmod`
+            or the exception raised for it
+        """
+        return self._map_paths(
+            lambda path: self.chmod(path, permission), paths, workers
+        )
+
+    def set_owner_many(
+        self,
+        paths: Iterable[str],
+        owner: str | None = None,
+        group: str | None = None,
+        workers: int = 8,
+    ) -> dict[str, bool | Exception]:
+        """Set the owner and/or group of many files or directories.
+
+        :param paths: paths of the files/dirs
+        :param owner: new owner name
+        :param group: new group name
+        :param workers: number of concurrent requests
+        :returns: a dict mapping each path to the result of
+            :meth:`set_owner` or the exception raised for it
+        """
+        if owner is None and group is None:
+            raise WebHDFSException("At least one of owner or group must be specified")
+        return self._map_paths(
+            lambda path: self.set_owner(path, owner, group), paths, workers
+        )
+
+    def set_replication_many(self, paths: Iterable[str],
+                             replication_factor: int,
+                             workers: int = 8) -> dict[str, bool | Exception]:
+        """Set the replication factor of many files concurrently.
+
+        :param paths: paths of the files
+        :param replication_factor: number of replications (>0)
+        :param workers: number of concurrent requests
+        :returns: a dict mapping each path to the result of
+            :meth:`set_replication` or the exception raised for it
+        """
+        return self._map_paths(
+            lambda path: self.set_replication(path, replication_factor),
+            paths, workers,
+        )
+
+    def set_times_many(
+        self,
+        paths: Iterable[str],
+        modificationtime: int | None = None,
+        accesstime: int | None = None,
+        workers: int = 8,
+    ) -> dict[str, bool | Exception]:
+        """Set modification and/or access time of many files concurrently.
+
+        :param paths: paths of the files
+        :param modificationtime: modification time in ms since epoch
+        :param accesstime: access time in ms since epoch
+        :param workers: number of concurrent requests
+        :returns: a dict mapping each path to the result of
+            :meth:`set_times` or the exception raised for it
+        """
+        return self._map_paths(
+            lambda path: self.set_times(path, modificationtime, accesstime),
+            paths, workers,
+        )
+
+    def status_many(self, paths: Iterable[str],
+                    workers: int = 8) -> dict[str, dict[str, Any] | Exception]:
+        """Get the status of many files or directories concurrently.
+
+        :param paths: paths of the files/dirs
+        :param workers: number of concurrent requests
+        :returns: a dict mapping each path to its FileStatus dict or the
+            exception raised for it
+        """
+        return self._map_paths(self.status, paths, workers)
+
+    def exists_many(self, paths: Iterable[str],
+                    workers: int = 8) -> dict[str, bool | Exception]:
+        """Check whether many paths exist, concurrently.
+
+        :param paths: paths to check
+        :param workers: number of concurrent requests
+        :returns: a dict mapping each path to ``True``, ``False`` when the
+            NameNode answered 404, or the exception raised for it
+        """
+
+        def exists(path: str) -> bool:
+            try:
+                self.status(path)
+            except WebHDFSRemoteException as exc:
+                if exc.status_code != 404:
+                    raise
+                return False
+            return True
+
+        return self._map_paths(exists, paths, workers)
 
     # ------------------------------------------------------------------
     # Delegation token operations
@@ -497,3 +2295,180 @@ class WebHDFSClient:
         self.logger.info("Cancelling delegation token")
         params: dict[str, Any] = {"op": "CANCELDELEGATIONTOKEN", "token": token}
         return self._query(method="put", path="/", json_path=[], params=params)
+
+
+@functools.lru_cache(maxsize=None)
+def _ascii_compatible(encoding: str) -> bool:
+    """Whether ``encoding`` encodes ASCII text as ASCII bytes."""
+    ascii_bytes = bytes(range(128))
+    try:
+        return ascii_bytes.decode(encoding) == ascii_bytes.decode("ascii")
+    except UnicodeDecodeError:
+        return False
+
+
+def _transcode(chunks: Iterable[bytes], encoding: str,
+               errors: str) -> Iterator[bytes]:
+    """Decode chunks incrementally and yield them encoded as UTF-8."""
+    decoder = codecs.getincrementaldecoder(encoding)(errors)
+    for chunk in chunks:
+        yield decoder.decode(chunk).encode("utf-8", "surrogatepass")
+    yield decoder.decode(b"", final=True).encode("utf-8", "surrogatepass")
+
+
+def _split_records(chunks: Iterable[bytes], delimiter: bytes) -> Iterator[bytes]:
+    """Yield the records of a stream of chunks, without their delimiter.
+
+    The incomplete record at the end of a chunk stays in a buffer that only
+    grows by the next chunk, so long records cost linear time.
+    """
+    buffer = bytearray()
+    for chunk in chunks:
+        # A delimiter may start in the bytes already buffered
+        search = max(len(buffer) - len(delimiter) + 1, 0)
+        buffer += chunk
+        start = 0
+        while True:
+            end = buffer.find(delimiter, search)
+            if end < 0:
+                break
+            yield bytes(buffer[start:end])
+            start = search = end + len(delimiter)
+        # Deleting from the front of a bytearray doesn't move the rest
+        del buffer[:start]
+    if buffer:
+        yield bytes(buffer)
+
+
+def _map_split(config: dict[str, Any], path: str, start: int, end: int,
+               func: Callable[[Iterator[Any]], T], encoding: str | None,
+               delimiter: bytes) -> T:
+    """Apply ``func`` to the records of one split, in a worker process."""
+    with WebHDFSClient(**config) as client:
+        return func(client.iter_lines(path, encoding, delimiter,
+                                      offset=start, length=end - start))
+
+
+def _remove_local(path: str) -> None:
+    """Delete a local file or directory tree."""
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path)
+    else:
+        os.remove(path)
+
+
+class WebHDFSFile(io.RawIOBase):
+    """Seekable read-only binary file object backed by ranged OPEN requests.
+
+    Use :meth:`WebHDFSClient.open_file` to create one::
+
+        with client.open_file("/data/part-0.parquet") as f:
+            f.seek(-8, os.SEEK_END)
+            footer = f.read(8)
+    """
+
+    def __init__(self, client: WebHDFSClient, path: str,
+                 read_ahead: int = READ_AHEAD_SIZE) -> None:
+        """Create a file object for an HDFS file.
+
+        :param client: the client used to issue requests
+        :param path: path of the file
+        :param read_ahead: size in bytes of each ranged request
+        """
+        super().__init__()
+        if read_ahead <= 0:
+            raise WebHDFSException("read_ahead must be a positive number")
+        self.client = client
+        self.path = path
+        self.read_ahead = read_ahead
+        self.length = client.status(path)["length"]
+        self._pos = 0
+        self._buffer = b""
+        self._buffer_start = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        self._checkClosed()
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        self._checkClosed()
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = self.length + offset
+        else:
+            raise ValueError(f"Invalid whence ({whence})")
+        if pos < 0:
+            raise ValueError(f"Negative seek position {pos}")
+        self._pos = pos
+        return pos
+
+    def read(self, size: int | None = -1) -> bytes:
+        self._checkClosed()
+        remaining = self.length - self._pos
+        if size is None or size < 0 or size > remaining:
+            size = max(remaining, 0)
+        if size == 0:
+            return b""
+        if not self._buffered(self._pos, size) and size >= self.read_ahead:
+            # Large reads bypass the buffer and fetch exactly what is needed
+            data = self._fetch(self._pos, size)
+        else:
+            if not self._buffered(self._pos, size):
+                self._fill(self._pos)
+            start = self._pos - self._buffer_start
+            data = self._buffer[start:start + size]
+        self._pos += len(data)
+        return data
+
+    def readall(self) -> bytes:
+        return self.read(-1)
+
+    def readinto(self, b: Any) -> int:
+        data = self.read(len(b))
+        n = len(data)
+        memoryview(b).cast("B")[:n] = data
+        return n
+
+    def readline(self, size: int | None = -1) -> bytes:
+        self._checkClosed()
+        if size is None or size < 0:
+            size = self.length - self._pos
+        parts = []
+        while size > 0 and self._pos < self.length:
+            if not self._buffered(self._pos, 1):
+                self._fill(self._pos)
+                if not self._buffer:
+                    break
+            start = self._pos - self._buffer_start
+            end = min(len(self._buffer), start + size)
+            newline = self._buffer.find(b"\n", start, end)
+            if newline != -1:
+                end = newline + 1
+            parts.append(self._buffer[start:end])
+            self._pos += end - start
+            size -= end - start
+            if newline != -1:
+                break
+        return b"".join(parts)
+
+    def _buffered(self, pos: int, size: int) -> bool:
+        """Return whether ``size`` bytes at ``pos`` are in the buffer."""
+        end = self._buffer_start + len(self._buffer)
+        return self._buffer_start <= pos and pos + size <= end
+
+    def _fill(self, pos: int) -> None:
+        """Replace the buffer with a read-ahead window starting at ``pos``."""
+        self._buffer = self._fetch(pos, min(self.read_ahead, self.length - pos))
+        self._buffer_start = pos
+
+    def _fetch(self, offset: int, length: int) -> bytes:
+        return self.client.read_bytes(self.path, offset=offset, length=length)